@@ -3,6 +3,12 @@ import os
 import re
 import sys
 
+try:
+    from common.validation_issue import ValidationIssue, Severity
+except ImportError:  # run as a script from inside apex_validator/
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common.validation_issue import ValidationIssue, Severity
+
 def load_notebook(file_path):
     """
     Loads and parses a Jupyter/Colab notebook file (.ipynb).
@@ -61,7 +67,7 @@ def validate_apex_code_block(cells):
 
     # Check only the second cell (index 1)
     if len(cells) < 2 or cells[1].get("cell_type") != "markdown":
-        validation_errors.append("❌ Second cell is missing or not a markdown cell.")
+        validation_errors.append(ValidationIssue("apex.code_block.missing_cell", "❌ Second cell is missing or not a markdown cell.", cell=2))
         return validation_errors
 
     cell_text = "".join(cells[1].get("source", [])).strip()
@@ -69,16 +75,16 @@ def validate_apex_code_block(cells):
     # 1️⃣ Check for **Apex Code** presence and bold formatting
     if "Apex Code" in cell_text:
         if "**Apex Code**" not in cell_text:
-            validation_errors.append(f"❌ 'Apex Code' in Cell 2 is not properly bolded.")
+            validation_errors.append(ValidationIssue("apex.code_block.header_not_bold", f"❌ 'Apex Code' in Cell 2 is not properly bolded.", cell=2))
     else:
-        validation_errors.append("❌ 'Apex Code' section is missing in Cell 2.")
+        validation_errors.append(ValidationIssue("apex.code_block.missing_header", "❌ 'Apex Code' section is missing in Cell 2.", cell=2))
 
     # 2️⃣ Check for the presence of the file name (enclosed in backticks)
     file_name_match = re.search(r"`([\w\s^\n]+)`", cell_text)
     file_name_match = re.search(r"`([^\n`]+)`", cell_text)
     # validation_errors.append(file_name_match)
     if not file_name_match:
-        validation_errors.append("❌ File name is missing or not enclosed in backticks (`) in Cell 2.")
+        validation_errors.append(ValidationIssue("apex.code_block.missing_file_name", "❌ File name is missing or not enclosed in backticks (`) in Cell 2.", cell=2))
 
     # 3️⃣ Check for Apex code block (```apex) and ensure no JSON block exists here
     apex_code_match = re.search(r"```apex[\s\S]*?```", cell_text, re.IGNORECASE)
@@ -86,27 +92,27 @@ def validate_apex_code_block(cells):
 
     if apex_code_match:
         if json_code_match and json_code_match.start() < apex_code_match.end():
-            validation_errors.append("❌ JSON code block found within Apex code section in Cell 2.")
+            validation_errors.append(ValidationIssue("apex.code_block.json_in_apex_section", "❌ JSON code block found within Apex code section in Cell 2.", cell=2))
     else:
         if "```json```":
-            validation_errors.append("❌ JSON code block found before Apex code block in Cell 2.")
-        validation_errors.append("❌ Apex code block (```apex) is missing in Cell 2.")
+            validation_errors.append(ValidationIssue("apex.code_block.json_before_apex", "❌ JSON code block found before Apex code block in Cell 2.", cell=2))
+        validation_errors.append(ValidationIssue("apex.code_block.missing_apex_block", "❌ Apex code block (```apex) is missing in Cell 2.", cell=2))
 
     # 4️⃣ Check for '**Issues Raised by PMD Code Analyzer**' (already partially handled)
     if "Issues Raised by PMD Code Analyzer" in cell_text:
         if "**Issues Raised by PMD Code Analyzer**" not in cell_text:
-            validation_errors.append("❌ 'Issues Raised by PMD Code Analyzer' in Cell 2 is not properly bolded.")
+            validation_errors.append(ValidationIssue("apex.code_block.pmd_header_not_bold", "❌ 'Issues Raised by PMD Code Analyzer' in Cell 2 is not properly bolded.", cell=2))
     else:
-        validation_errors.append("❌ 'Issues Raised by PMD Code Analyzer' section is missing in Cell 2.")
+        validation_errors.append(ValidationIssue("apex.code_block.missing_pmd_section", "❌ 'Issues Raised by PMD Code Analyzer' section is missing in Cell 2.", cell=2))
 
     # 5️⃣ Ensure JSON code block is present under the PMD section
     pmd_section_match = re.search(r"\*\*Issues Raised by PMD Code Analyzer\*\*([\s\S]*)", cell_text)
     if pmd_section_match:
         pmd_content = pmd_section_match.group(1)
         if "```json" not in pmd_content:
-            validation_errors.append("❌ JSON code block missing under 'Issues Raised by PMD Code Analyzer' in Cell 2.")
+            validation_errors.append(ValidationIssue("apex.code_block.missing_pmd_json", "❌ JSON code block missing under 'Issues Raised by PMD Code Analyzer' in Cell 2.", cell=2))
     else:
-        validation_errors.append("❌ PMD section not properly formatted in Cell 2.")
+        validation_errors.append(ValidationIssue("apex.code_block.pmd_section_format", "❌ PMD section not properly formatted in Cell 2.", cell=2))
 
     return validation_errors
 
@@ -149,62 +155,62 @@ def validate_dynamic_issues(cells):
 
                 # 1️⃣ Validate **Issue Header**
                 if "**Issue**" not in issue_header:
-                    validation_errors.append(f"❌ 'Issue' is not properly bolded in Issue {issue_number} (Cell {index + 1}).")
+                    validation_errors.append(ValidationIssue("apex.issue.header_not_bold", f"❌ 'Issue' is not properly bolded in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                 # 2️⃣ Validate **User Section**
                 if "**User**" not in issue_content:
-                    validation_errors.append(f"❌ 'User' section missing or not bolded in Issue {issue_number} (Cell {index + 1}).")
+                    validation_errors.append(ValidationIssue("apex.issue.missing_user", f"❌ 'User' section missing or not bolded in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                 # 3️⃣ Validate **Error Section** with JSON Block
                 error_section = re.search(r"\*\*Error\*\*([\s\S]*?)(\*\*Code\*\*|\*\*Assistant\*\*|$)", issue_content)
                 if error_section:
                     if "**Error**" not in error_section.group(0):
-                        validation_errors.append(f"❌ 'Error' is not properly bolded in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.error_not_bold", f"❌ 'Error' is not properly bolded in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     json_match = re.search(r"```json[\s\S]*?```", error_section.group(1))
                     if not json_match:
-                        validation_errors.append(f"❌ Missing JSON code block under 'Error' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.missing_error_json", f"❌ Missing JSON code block under 'Error' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     apex_match = re.search(r"```apex[\s\S]*?```", error_section.group(1))
                     if apex_match:
-                        validation_errors.append(f"❌ Apex code block found under 'Error' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.apex_under_error", f"❌ Apex code block found under 'Error' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
                 else:
-                    validation_errors.append(f"❌ 'Error' section missing in Issue {issue_number} (Cell {index + 1}).")
+                    validation_errors.append(ValidationIssue("apex.issue.missing_error", f"❌ 'Error' section missing in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                 # 4️⃣ Validate **Code Section** with Apex Block
                 code_section = re.search(r"\*\*Code\*\*([\s\S]*?)(\*\*Assistant\*\*|$)", issue_content)
                 if code_section:
                     if "**Code**" not in code_section.group(0):
-                        validation_errors.append(f"❌ 'Code' is not properly bolded in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.code_not_bold", f"❌ 'Code' is not properly bolded in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     apex_match = re.search(r"```apex[\s\S]*?```", code_section.group(1))
                     if not apex_match:
-                        validation_errors.append(f"❌ Missing Apex code block under 'Code' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.missing_code_apex", f"❌ Missing Apex code block under 'Code' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     json_match = re.search(r"```json[\s\S]*?```", code_section.group(1))
                     if json_match:
-                        validation_errors.append(f"❌ JSON code block found under 'Code' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.json_under_code", f"❌ JSON code block found under 'Code' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
                 else:
-                    validation_errors.append(f"❌ 'Code' section missing in Issue {issue_number} (Cell {index + 1}).")
+                    validation_errors.append(ValidationIssue("apex.issue.missing_code", f"❌ 'Code' section missing in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                 # 5️⃣ Validate **Assistant Section** with Apex Block
                 assistant_section = re.search(r"\*?\*?Assistant\*?\*?([\s\S]*?)($|\*?\*?Issue\*?\*?)", issue_content)
                 if assistant_section:
                     if "**Assistant**" not in assistant_section.group(0):
-                        validation_errors.append(f"❌ 'Assistant' is not properly bolded in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.assistant_not_bold", f"❌ 'Assistant' is not properly bolded in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     apex_match = re.search(r"```apex[\s\S]*?```", assistant_section.group(1))
                     if not apex_match:
-                        validation_errors.append(f"❌ Missing Apex code block under 'Assistant' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.missing_assistant_apex", f"❌ Missing Apex code block under 'Assistant' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
                     json_match = re.search(r"```json[\s\S]*?```", assistant_section.group(1))
                     if json_match:
-                        validation_errors.append(f"❌ JSON code block found under 'Assistant' in Issue {issue_number} (Cell {index + 1}).")
+                        validation_errors.append(ValidationIssue("apex.issue.json_under_assistant", f"❌ JSON code block found under 'Assistant' in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
                 else:
-                    validation_errors.append(f"❌ 'Assistant' section missing in Issue {issue_number} (Cell {index + 1}).")
+                    validation_errors.append(ValidationIssue("apex.issue.missing_assistant", f"❌ 'Assistant' section missing in Issue {issue_number} (Cell {index + 1}).", cell=index + 1, issue=issue_number))
 
             else:
-                validation_errors.append(f"❌ Issue header missing or incorrectly formatted in Cell {index + 1}.")
+                validation_errors.append(ValidationIssue("apex.issue.header_format", f"❌ Issue header missing or incorrectly formatted in Cell {index + 1}.", cell=index + 1))
 
     return validation_errors
 
@@ -307,30 +313,30 @@ def validate_issue_count(cells, notebook_type):
 
     # Report issues found
     if missing_users:
-        validation_errors.append(f"⚠️ Missing User response(s) in Issue(s): {', '.join(map(str, missing_users))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_user", f"⚠️ Missing User response(s) in Issue(s): {', '.join(map(str, missing_users))}", severity=Severity.WARNING))
     if missing_assistants:
-        validation_errors.append(f"⚠️ Missing Assistant response(s) in Issue(s): {', '.join(map(str, missing_assistants))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_assistant", f"⚠️ Missing Assistant response(s) in Issue(s): {', '.join(map(str, missing_assistants))}", severity=Severity.WARNING))
     if missing_error_labels:
-        validation_errors.append(f"⚠️ Missing **Error** label in Issue(s): {', '.join(map(str, missing_error_labels))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_error_label", f"⚠️ Missing **Error** label in Issue(s): {', '.join(map(str, missing_error_labels))}", severity=Severity.WARNING))
     if missing_error_blocks:
-        validation_errors.append(f"❌ Missing properly formatted Error block(s) in Issue(s): {', '.join(map(str, missing_error_blocks))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_error_block", f"❌ Missing properly formatted Error block(s) in Issue(s): {', '.join(map(str, missing_error_blocks))}"))
     if missing_code_labels:
-        validation_errors.append(f"⚠️ Missing **Code** label in Issue(s): {', '.join(map(str, missing_code_labels))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_code_label", f"⚠️ Missing **Code** label in Issue(s): {', '.join(map(str, missing_code_labels))}", severity=Severity.WARNING))
     if missing_code_blocks:
-        validation_errors.append(f"❌ Missing properly formatted Code block(s) in Issue(s): {', '.join(map(str, missing_code_blocks))}")
+        validation_errors.append(ValidationIssue("apex.issue_count.missing_code_block", f"❌ Missing properly formatted Code block(s) in Issue(s): {', '.join(map(str, missing_code_blocks))}"))
 
     # Validate overall issue count
     actual_issue_count = len(issues)
     
     if declared_issue_count is None:
-        validation_errors.append("⚠️ Warning: 'Number of Issues' not found or incorrectly formatted.")
+        validation_errors.append(ValidationIssue("apex.issue_count.declaration_missing", "⚠️ Warning: 'Number of Issues' not found or incorrectly formatted.", severity=Severity.WARNING))
     elif declared_issue_count != actual_issue_count:
         validation_errors.append(
-            f"❌ Mismatch: Declared issues ({declared_issue_count}) ≠ Actual user-assistant pairs ({actual_issue_count}) Please check cell number 1."
+            ValidationIssue("apex.issue_count.mismatch", f"❌ Mismatch: Declared issues ({declared_issue_count}) ≠ Actual user-assistant pairs ({actual_issue_count}) Please check cell number 1.", cell=1)
         )
     elif issue_count_cell and issue_count_cell > min(issues.keys()):
         validation_errors.append(
-            f"⚠️ Warning: 'Number of Issues' declaration should be placed before user-assistant conversations (Cell {issue_count_cell})."
+            ValidationIssue("apex.issue_count.declaration_order", f"⚠️ Warning: 'Number of Issues' declaration should be placed before user-assistant conversations (Cell {issue_count_cell}).", severity=Severity.WARNING, cell=issue_count_cell)
         )
 
     return validation_errors
@@ -357,7 +363,7 @@ def validate_notebook_structure(cells, notebook_type):
     # Validate section presence
     missing_sections = [section for section in expected_sections[notebook_type] if section not in found_sections]
     if missing_sections:
-        validation_errors.append(f"Missing required sections: {', '.join(missing_sections)}")
+        validation_errors.append(ValidationIssue("apex.structure.missing_sections", f"Missing required sections: {', '.join(missing_sections)}"))
 
     return validation_errors
 
@@ -376,7 +382,7 @@ def validate_apex_metadata_formatting(cells):
 
     # Check only the first cell (cell index 0)
     if not cells or cells[0].get("cell_type") != "markdown":
-        validation_errors.append("❌ First cell is missing or not a markdown cell.")
+        validation_errors.append(ValidationIssue("apex.metadata.missing_cell", "❌ First cell is missing or not a markdown cell.", cell=1))
         return validation_errors
 
     cell_text = "".join(cells[0].get("source", [])).strip()
@@ -384,21 +390,21 @@ def validate_apex_metadata_formatting(cells):
     # Check for **Apex Code Analysis**
     if "Apex Code Analysis" in cell_text:
         if "**Apex Code Analysis**" not in cell_text:
-            validation_errors.append(f"❌ 'Apex Code Analysis' in Cell 1 is not properly bolded.")
+            validation_errors.append(ValidationIssue("apex.metadata.header_not_bold", f"❌ 'Apex Code Analysis' in Cell 1 is not properly bolded.", cell=1))
     else:
-        validation_errors.append("❌ 'Apex Code Analysis' section is missing in Cell 1.")
+        validation_errors.append(ValidationIssue("apex.metadata.missing_header", "❌ 'Apex Code Analysis' section is missing in Cell 1.", cell=1))
 
     # Check for **File Name**
     if "File Name" in cell_text:
         if "**File Name**" not in cell_text:
-            validation_errors.append(f"❌ 'File Name' in Cell 1 is not properly bolded.")
+            validation_errors.append(ValidationIssue("apex.metadata.file_name_not_bold", f"❌ 'File Name' in Cell 1 is not properly bolded.", cell=1))
 
         # Check if a file name is provided after the dash
         file_name_match = re.search(r"\*\*File Name\*\*\s*[-:]?\s*(\w+)", cell_text)
         if not file_name_match:
-            validation_errors.append(f"⚠️ No file name provided after 'File Name' in Cell 1.")
+            validation_errors.append(ValidationIssue("apex.metadata.missing_file_name", f"⚠️ No file name provided after 'File Name' in Cell 1.", severity=Severity.WARNING, cell=1))
     else:
-        validation_errors.append(f"❌ 'File Name' section is missing in Cell 1.")
+        validation_errors.append(ValidationIssue("apex.metadata.missing_file_name_section", f"❌ 'File Name' section is missing in Cell 1.", cell=1))
 
     return validation_errors
 
@@ -430,19 +436,19 @@ def validate_content_formatting(cells, notebook_type):
                 if "**Issues Raised by PMD Code Analyzer**" in cell_text:
                     if not apex_patterns["pmd_json_block"].search(cell_text):
                         validation_errors.append(
-                            f"Invalid JSON formatting declaration (` ```json `) in cell #{i+1}"
+                            ValidationIssue("apex.content.pmd_json_declaration", f"Invalid JSON formatting declaration (` ```json `) in cell #{i+1}", cell=i + 1)
                         )
 
                 # If triple backticks appear but no ` ```json ` code block, warn
                 elif "```" in cell_text and not apex_patterns["pmd_json_block"].search(cell_text):
                     validation_errors.append(
-                        f"Expected ` ```json ` code block in cell #{i+1}"
+                        ValidationIssue("apex.content.expected_json_block", f"Expected ` ```json ` code block in cell #{i+1}", cell=i + 1)
                     )
 
                 # Check for Apex code blocks
                 if "```" in cell_text and not apex_patterns["code_blocks"].search(cell_text):
                     validation_errors.append(
-                        f"Apex code block missing correct declaration (` ```apex `) in cell #{i+1}"
+                        ValidationIssue("apex.content.apex_declaration", f"Apex code block missing correct declaration (` ```apex `) in cell #{i+1}", cell=i + 1)
                     )
 
             #-------------------------------------------
@@ -457,7 +463,7 @@ def validate_content_formatting(cells, notebook_type):
             # If the number of triple backticks is odd, it means an unbalanced code fence.
             if tick_count % 2 != 0:
                 validation_errors.append(
-                    f"Possible missing or unbalanced triple-backtick closure in cell #{i+1}"
+                    ValidationIssue("apex.content.unbalanced_backticks", f"Possible missing or unbalanced triple-backtick closure in cell #{i+1}", cell=i + 1)
                 )
 
     return validation_errors
@@ -529,7 +535,7 @@ def validate_static_bold_formatting(cells, notebook_type):
             if missing_headers:
                 headers_str = ", ".join(missing_headers)
                 validation_errors.append(
-                    f"❌ Incorrect bold formatting in Cell {index + 1}: {headers_str}"
+                    ValidationIssue("apex.static_bold.not_bold", f"❌ Incorrect bold formatting in Cell {index + 1}: {headers_str}", cell=index + 1)
                 )
 
     return validation_errors
@@ -584,7 +590,7 @@ def validate_issue_block_headers(cells):
             # Summarize them in one line
             headers_str = ", ".join(missing_bold_headers)
             validation_errors.append(
-                f"❌ In cell {index+1}, the following Issue-block headers are not bolded correctly: {headers_str}"
+                ValidationIssue("apex.issue_block.headers_not_bold", f"❌ In cell {index+1}, the following Issue-block headers are not bolded correctly: {headers_str}", cell=index + 1)
             )
 
     return validation_errors
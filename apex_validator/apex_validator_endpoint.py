@@ -1,11 +1,7 @@
 import re
-import io
-import os
 import json
 from io import StringIO
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaIoBaseDownload
+from typing import Callable, List, Optional, Tuple
 import nbformat
 from dotenv import load_dotenv
 load_dotenv()
@@ -22,109 +18,62 @@ from apex_validator.apex_validator import (  # Adjust the import based on your f
     validate_issue_block_headers,
     load_notebook,
 )
+import apex_validator.apex_validator as apex_validator_module
+from common.validation_cache import validation_cache, validator_version, content_hash
+from common.validation_issue import ValidationIssue
+from common.notebook_fetch import extract_file_id, get_drive_service, fetch_metadata, download_notebook
 
-def validate_apex_notebook(notebook_link: str) -> str:
-    """
-    Downloads a Jupyter Notebook from a Google Drive link, validates it as an Apex notebook,
-    and returns the validation output as a string.
+VALIDATOR_VERSION = "apex-" + validator_version(apex_validator_module)
 
-    Parameters:
-        notebook_link (str): The shareable Google Drive or Colab link to the notebook.
+def validate_apex_content(content: str, file_id: Optional[str] = None) -> Tuple[List[ValidationIssue], str]:
     """
-
-    output_buffer = StringIO()
-
+    Parses the raw notebook JSON and validates it as an Apex notebook.
+    Returns the errors and the content hash they are cached under. Kept at module
+    level so bulk validation can run it in a process pool; `file_id` is unused
+    but keeps the signature the same as validate_lwc_content.
+    """
+    # Parse the notebook content
     try:
-        # Step 1: Extract the file ID from the notebook link
-        file_id_match = re.search(r'/drive/([a-zA-Z0-9_-]+)', notebook_link) or \
-                        re.search(r'/file/d/([a-zA-Z0-9_-]+)', notebook_link) or \
-                        re.search(r'fileId=([a-zA-Z0-9_-]+)', notebook_link)
-        if not file_id_match:
-            raise ValueError("Invalid notebook link format. Could not extract file ID.")
-        file_id = file_id_match.group(1)
-
-        # Step 2: Set up credentials from environment variable
-        credentials_json = os.getenv("GOOGLE_CREDENTIALS")
-        if not credentials_json:
-            raise ValueError("Google credentials not found in environment variables")
-        try:
-            creds = service_account.Credentials.from_service_account_info(
-                json.loads(credentials_json),
-                scopes=['https://www.googleapis.com/auth/drive.readonly']
-            )
-            drive_service = build('drive', 'v3', credentials=creds)
-        except Exception as e:
-            raise Exception(f"Failed to set up Google Drive API credentials: {e}")
-
-        # Step 3: Verify file accessibility
+        # Ensure content is valid JSON before parsing
         try:
-            drive_service.files().get(fileId=file_id).execute()
-        except Exception as e:
-            if "403" in str(e):
-                raise PermissionError("Permission denied: Ensure the notebook is shared with the service account.")
-            elif "404" in str(e):
-                raise FileNotFoundError("Notebook not found. Check the link.")
+            json_data = json.loads(content)
+            # Handle Colab-specific or malformed JSON by extracting the 'cells' if nested
+            if isinstance(json_data, dict) and "cells" in json_data:
+                cells = json_data["cells"]
+            elif isinstance(json_data, list) and all(isinstance(item, dict) for item in json_data):
+                cells = json_data  # Assume direct list of cells
             else:
-                raise Exception(f"Failed to verify notebook accessibility: {e}")
+                raise ValueError("Unexpected JSON structure in notebook.")
+        except json.JSONDecodeError as je:
+            raise Exception(f"Invalid JSON in notebook: {str(je)}")
 
-        # Step 4: Download the file content into memory
-        try:
-            request = drive_service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                output_buffer.write(f"Download progress: {int(status.progress() * 100)}%\n")
-            fh.seek(0)
-            # Attempt to decode with UTF-8 first, fallback to binary if needed
-            try:
-                content = fh.read().decode("utf-8")
-            except UnicodeDecodeError:
-                # If UTF-8 fails, treat as binary and assume JSON structure
-                content = fh.read().decode("utf-8", errors="replace")
-                # Attempt to clean up potential Colab-specific formatting
-                content = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F-\x9F]', '', content)  # Remove control characters
-        except Exception as e:
-            raise Exception(f"Failed to download notebook content: {e}")
-
-        # Step 5: Parse the notebook content
-        try:
-            # Ensure content is valid JSON before parsing
-            try:
-                json_data = json.loads(content)
-                # Handle Colab-specific or malformed JSON by extracting the 'cells' if nested
-                if isinstance(json_data, dict) and "cells" in json_data:
-                    cells = json_data["cells"]
-                elif isinstance(json_data, list) and all(isinstance(item, dict) for item in json_data):
-                    cells = json_data  # Assume direct list of cells
-                else:
-                    raise ValueError("Unexpected JSON structure in notebook.")
-            except json.JSONDecodeError as je:
-                raise Exception(f"Invalid JSON in notebook: {str(je)}")
-
-            # Convert cells to nbformat structure if not already
-            if not isinstance(cells, list) or not all(isinstance(cell, dict) for cell in cells):
-                raise ValueError("Invalid cell structure in notebook.")
-            
-            notebook_data = {"cells": cells, "nbformat": 4, "nbformat_minor": 5}  # Minimal nbformat structure
-            cells = notebook_data["cells"]
-
-            # Preserve raw Markdown without normalization
-            for cell in cells:
-                if cell.get("cell_type") == "markdown":
-                    cell_source = cell.get("source", [])
-                    # Join lines as-is, preserving exact Markdown (including **)
-                    cell["source"] = [line.strip() for line in cell_source if line]  # Keep original lines, remove empty
-
-        except Exception as e:
-            raise Exception(f"Failed to parse the notebook content: {e}")
-        
-        # Step 6: Detect notebook type and validate
-        notebook_type = detect_notebook_type(cells)
-        if notebook_type != "apex":
-            raise ValueError("Notebook is not detected as an Apex notebook.")
+        # Convert cells to nbformat structure if not already
+        if not isinstance(cells, list) or not all(isinstance(cell, dict) for cell in cells):
+            raise ValueError("Invalid cell structure in notebook.")
+
+        notebook_data = {"cells": cells, "nbformat": 4, "nbformat_minor": 5}  # Minimal nbformat structure
+        cells = notebook_data["cells"]
+
+        # Preserve raw Markdown without normalization
+        for cell in cells:
+            if cell.get("cell_type") == "markdown":
+                cell_source = cell.get("source", [])
+                # Join lines as-is, preserving exact Markdown (including **)
+                cell["source"] = [line.strip() for line in cell_source if line]  # Keep original lines, remove empty
+
+    except Exception as e:
+        raise Exception(f"Failed to parse the notebook content: {e}")
+
+    # Detect notebook type and validate
+    notebook_type = detect_notebook_type(cells)
+    if notebook_type != "apex":
+        raise ValueError("Notebook is not detected as an Apex notebook.")
+
+    # The validators read the normalized cells, so that is what gets hashed
+    cells_hash = content_hash(json.dumps(cells, sort_keys=True))
 
+    validation_errors = validation_cache.get(VALIDATOR_VERSION, cells_hash)
+    if validation_errors is None:
         validation_errors = []
         metadata_errors = validate_apex_metadata_formatting(cells)
         apex_code_errors = validate_apex_code_block(cells)
@@ -144,8 +93,71 @@ def validate_apex_notebook(notebook_link: str) -> str:
         validation_errors.extend(content_errors)
         # validation_errors.extend(static_bold_errors)
         validation_errors.extend(issue_block_errors)
+    return validation_errors, cells_hash
+
+def validate_apex_link(notebook_link: str, progress: Optional[Callable[[int], None]] = None) -> Tuple[str, List[ValidationIssue], bool]:
+    """
+    Fetches the notebook behind a Colab/Drive link and validates it as an Apex notebook.
+    Returns (file_id, issues, cached). Raises ValueError, PermissionError or
+    FileNotFoundError when the link cannot be resolved or read.
+    """
+    # Step 1: Extract the file ID from the notebook link
+    file_id = extract_file_id(notebook_link)
+
+    # Step 2: Get the shared Drive client (credentials come from GOOGLE_CREDENTIALS)
+    drive_service = get_drive_service()
+
+    # Step 3: Single metadata request that also verifies accessibility
+    # (md5Checksum lets unchanged notebooks skip the download)
+    metadata = fetch_metadata(drive_service, file_id)
+    md5_checksum = metadata.get("md5Checksum")
 
-        # Step 7: Format and return the output
+    cells_hash = validation_cache.content_hash_for(VALIDATOR_VERSION, file_id, md5_checksum)
+    if cells_hash:
+        validation_errors = validation_cache.get(VALIDATOR_VERSION, cells_hash)
+        if validation_errors is not None:
+            return file_id, validation_errors, True
+
+    # Step 4: Download the file content into memory
+    try:
+        raw_content = download_notebook(drive_service, file_id, progress=progress)
+        # Attempt to decode with UTF-8 first, fallback to binary if needed
+        try:
+            content = raw_content.decode("utf-8")
+        except UnicodeDecodeError:
+            # If UTF-8 fails, treat as binary and assume JSON structure
+            content = raw_content.decode("utf-8", errors="replace")
+            # Attempt to clean up potential Colab-specific formatting
+            content = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F-\x9F]', '', content)  # Remove control characters
+    except Exception as e:
+        raise Exception(f"Failed to download notebook content: {e}")
+
+    # Step 5: Parse and validate the notebook
+    validation_errors, cells_hash = validate_apex_content(content)
+    validation_cache.remember_checksum(VALIDATOR_VERSION, file_id, md5_checksum, cells_hash)
+    validation_cache.put(VALIDATOR_VERSION, cells_hash, validation_errors)
+    return file_id, validation_errors, False
+
+def validate_apex_notebook(notebook_link: str) -> str:
+    """
+    Downloads a Jupyter Notebook from a Google Drive link, validates it as an Apex notebook,
+    and returns the validation output as a string.
+
+    Parameters:
+        notebook_link (str): The shareable Google Drive or Colab link to the notebook.
+    """
+
+    output_buffer = StringIO()
+
+    try:
+        file_id, validation_errors, cached = validate_apex_link(
+            notebook_link,
+            progress=lambda percent: output_buffer.write(f"Download progress: {percent}%\n")
+        )
+        if cached:
+            output_buffer.write("Notebook unchanged since last validation, using cached result.\n")
+
+        # Format and return the output
         if not validation_errors:
             output_buffer.write(f"✅ {file_id}.ipynb is a valid Apex notebook.\n")
             output_buffer.write('-' * 40 + "\n")
@@ -1,11 +1,15 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, redirect, url_for, abort, Response, jsonify
+import json
 import os
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-from lwc_validator.lwc_validator_endpoint import validate_lwc_notebook
-from apex_validator.apex_validator_endpoint import validate_apex_notebook
+from lwc_validator.lwc_validator_endpoint import validate_lwc_notebook, validate_lwc_content, validate_lwc_link, VALIDATOR_VERSION as LWC_VALIDATOR_VERSION
+from apex_validator.apex_validator_endpoint import validate_apex_notebook, validate_apex_content, validate_apex_link, VALIDATOR_VERSION as APEX_VALIDATOR_VERSION
+from common.bulk_validation import start_bulk_validation, get_report
+from common.validation_issue import Severity
 from delivery_workflow.delivery_workflow import deliver_notebook
+from delivery_workflow.tracing import METRICS
 
 @app.route('/')
 def index():
@@ -29,6 +33,118 @@ def apex_validation():
             output = validate_apex_notebook(notebook_link)
     return render_template('apex_validation.html', output=output)
 
+BULK_VALIDATORS = {
+    'lwc': (validate_lwc_content, LWC_VALIDATOR_VERSION),
+    'apex': (validate_apex_content, APEX_VALIDATOR_VERSION),
+}
+
+def bulk_validation(validator):
+    from delivery_workflow.config import settings
+
+    sheet_name = settings.LWC_INPUT_SHEET_NAME if validator == 'lwc' else settings.APEX_INPUT_SHEET_NAME
+    link_column = settings.LWC_TASK_LINK_COLUMN if validator == 'lwc' else settings.APEX_TASK_LINK_COLUMN
+    error = ""
+    if request.method == 'POST':
+        source_link = request.form.get('source_link', '').strip()
+        sheet_name = request.form.get('sheet_name') or sheet_name
+        link_column = request.form.get('link_column') or link_column
+        validate_content, version = BULK_VALIDATORS[validator]
+        try:
+            report = start_bulk_validation(validator, source_link, validate_content, version, sheet_name, link_column)
+            return redirect(url_for('bulk_validation_report', report_id=report.report_id))
+        except Exception as e:
+            error = f"❌ {str(e)}"
+    return render_template('bulk_validation.html', title=f"{validator.upper()} Bulk Validation", validator=validator,
+                           report=None, error=error, sheet_name=sheet_name, link_column=link_column)
+
+@app.route('/lwc-validation/bulk', methods=['GET', 'POST'])
+def lwc_bulk_validation():
+    return bulk_validation('lwc')
+
+@app.route('/apex-validation/bulk', methods=['GET', 'POST'])
+def apex_bulk_validation():
+    return bulk_validation('apex')
+
+@app.route('/bulk-validation/<report_id>')
+def bulk_validation_report(report_id):
+    report = get_report(report_id)
+    if report is None:
+        abort(404)
+    page_count = report.page_count()
+    page = min(max(request.args.get('page', 1, type=int), 1), page_count)
+    return render_template('bulk_validation.html', title=f"{report.validator.upper()} Bulk Validation", validator=report.validator,
+                           report=report, rows=report.page(page), page=page, page_count=page_count, error="",
+                           sheet_name="", link_column="")
+
+@app.route('/bulk-validation/<report_id>/download')
+def bulk_validation_download(report_id):
+    report = get_report(report_id)
+    if report is None:
+        abort(404)
+    return Response(
+        report.to_csv(),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={report.validator}_bulk_validation_{report.report_id}.csv'}
+    )
+
+API_VALIDATORS = {
+    'lwc': (validate_lwc_link, validate_lwc_content),
+    'apex': (validate_apex_link, validate_apex_content),
+}
+
+def api_error(message, status):
+    return jsonify({"error": message}), status
+
+@app.route('/api/<validator>-validation', methods=['POST'])
+def api_validation(validator):
+    """
+    Validates one notebook and returns its issues as JSON.
+    The body is {"notebook_link": "..."} to fetch from Drive, or
+    {"notebook": <ipynb JSON>} to validate content posted directly.
+    """
+    if validator not in API_VALIDATORS:
+        abort(404)
+    validate_link, validate_content = API_VALIDATORS[validator]
+    payload = request.get_json(silent=True) or {}
+    try:
+        if payload.get('notebook') is not None:
+            notebook = payload['notebook']
+            content = notebook if isinstance(notebook, str) else json.dumps(notebook)
+            file_id = payload.get('file_id', 'notebook')
+            errors, _ = validate_content(content, file_id)
+            cached = False
+        elif payload.get('notebook_link'):
+            file_id, errors, cached = validate_link(payload['notebook_link'])
+        else:
+            return api_error("Provide 'notebook_link' or 'notebook' in the JSON body.", 400)
+    except ValueError as ve:
+        return api_error(str(ve), 400)
+    except PermissionError as pe:
+        return api_error(str(pe), 403)
+    except FileNotFoundError as fnfe:
+        return api_error(str(fnfe), 404)
+    except Exception as e:
+        return api_error(f"Unexpected error: {str(e)}", 500)
+
+    issues = [error.to_dict() for error in errors]
+    return jsonify({
+        "validator": validator,
+        "file_id": file_id,
+        "valid": not issues,
+        "cached": cached,
+        "error_count": sum(1 for error in errors if error.severity == Severity.ERROR),
+        "warning_count": sum(1 for error in errors if error.severity == Severity.WARNING),
+        "issues": issues,
+    })
+
+@app.route('/api/bulk-validation/<report_id>')
+def api_bulk_validation_report(report_id):
+    report = get_report(report_id)
+    if report is None:
+        return api_error("Report not found.", 404)
+    page = request.args.get('page', type=int)
+    return jsonify(report.to_dict(page))
+
 @app.route('/delivery', methods=['GET', 'POST'])
 def delivery():
     module = request.form.get('module') if request.method == 'POST' else None
@@ -70,6 +186,11 @@ def delivery():
             output = deliver_notebook(module, input_data, delivery_type, emails, process_type, batch_name, validate, json_file)
     return render_template('delivery.html', module=module, output=output)
 
+@app.route('/metrics')
+def metrics():
+    """Delivery pipeline and Google API metrics in the Prometheus text format."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     port = int(os.getenv("PORT", 5000))
     app.run(debug=True, host='0.0.0.0', port=port)  # Keeping debug=True for development
\ No newline at end of file
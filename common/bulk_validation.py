@@ -0,0 +1,305 @@
+import os
+import re
+import csv
+import uuid
+import threading
+from io import StringIO
+from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+from common.validation_cache import validation_cache
+from common.validation_issue import issue_to_dict
+from common.notebook_fetch import (
+    METADATA_FIELDS,
+    extract_file_id,
+    get_drive_service,
+    get_sheets_service,
+    metadata_error,
+    download_notebook,
+)
+
+DOWNLOAD_WORKERS = int(os.getenv("BULK_DOWNLOAD_WORKERS", "16"))
+VALIDATION_PROCESSES = int(os.getenv("BULK_VALIDATION_PROCESSES", str(os.cpu_count() or 2)))
+MAX_REPORTS = int(os.getenv("BULK_MAX_REPORTS", "20"))
+# Bulk validations running at the same time; more requests wait for a free worker
+JOB_WORKERS = int(os.getenv("BULK_JOB_WORKERS", "2"))
+REPORT_PAGE_SIZE = 50
+
+_reports = OrderedDict()
+_reports_lock = threading.Lock()
+_process_pool = None
+_process_pool_lock = threading.Lock()
+_job_pool = None
+_job_pool_lock = threading.Lock()
+
+
+@dataclass
+class BulkReport:
+    """
+    Per-notebook results of one bulk validation request. `status` is 'running'
+    until the rows are filled in, then 'done', or 'failed' with the reason in
+    `failure` if the notebooks could not be collected.
+    """
+    report_id: str
+    validator: str
+    source: str
+    created_at: str
+    rows: List[dict] = field(default_factory=list)
+    status: str = "running"
+    failure: Optional[str] = None
+
+    @property
+    def counts(self) -> dict:
+        counts = {"valid": 0, "invalid": 0, "error": 0}
+        for row in self.rows:
+            counts[row["status"]] += 1
+        return counts
+
+    def page(self, page: int, page_size: int = REPORT_PAGE_SIZE) -> List[dict]:
+        start = (page - 1) * page_size
+        return self.rows[start:start + page_size]
+
+    def page_count(self, page_size: int = REPORT_PAGE_SIZE) -> int:
+        return max(1, -(-len(self.rows) // page_size))
+
+    def to_dict(self, page: Optional[int] = None) -> dict:
+        """JSON form of the report; with `page` only that page of rows is included."""
+        rows = self.rows if page is None else self.page(page)
+        return {
+            "report_id": self.report_id,
+            "validator": self.validator,
+            "source": self.source,
+            "created_at": self.created_at,
+            "status": self.status,
+            "failure": self.failure,
+            "counts": self.counts,
+            "page": page,
+            "page_count": self.page_count(),
+            "rows": [dict(row, errors=[issue_to_dict(error) for error in row["errors"]]) for row in rows],
+        }
+
+    def to_csv(self) -> str:
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["notebook_link", "file_id", "status", "error_count", "errors"])
+        for row in self.rows:
+            writer.writerow([row["link"], row["file_id"], row["status"], len(row["errors"]), "\n".join(row["errors"])])
+        return output.getvalue()
+
+
+def get_report(report_id: str) -> Optional[BulkReport]:
+    with _reports_lock:
+        return _reports.get(report_id)
+
+
+def _store_report(report: BulkReport):
+    with _reports_lock:
+        _reports[report.report_id] = report
+        while len(_reports) > MAX_REPORTS:
+            _reports.popitem(last=False)
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=VALIDATION_PROCESSES)
+        return _process_pool
+
+
+def _get_job_pool() -> ThreadPoolExecutor:
+    global _job_pool
+    with _job_pool_lock:
+        if _job_pool is None:
+            _job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="bulk-validation")
+        return _job_pool
+
+
+def _row(link, file_id, status, errors):
+    return {"link": link, "file_id": file_id, "status": status, "errors": list(errors)}
+
+
+def _cached_errors(version: str, file_id: str, md5_checksum: Optional[str]) -> Optional[list]:
+    """The errors cached for the notebook if its md5Checksum was validated before."""
+    digest = validation_cache.content_hash_for(version, file_id, md5_checksum)
+    return validation_cache.get(version, digest) if digest else None
+
+
+def collect_notebooks(links: List[str], version: str) -> List[dict]:
+    """
+    Fetches the notebooks behind `links` for bulk validation.
+
+    The metadata of all notebooks is fetched first in batched files.get calls.
+    A notebook whose md5Checksum shows it was validated before gets a dict with
+    the cached errors and is never downloaded; the others are downloaded
+    concurrently and get a dict with their content.
+    """
+    from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter, execute_batched
+
+    notebooks = [None] * len(links)
+    file_ids = {}
+    for position, link in enumerate(links):
+        try:
+            file_ids[position] = extract_file_id(link)
+        except ValueError as e:
+            notebooks[position] = {"link": link, "file_id": None, "failure": str(e)}
+
+    drive_service = get_drive_service()
+    positions = list(file_ids)
+    requests = [drive_service.files().get(fileId=file_ids[position], fields=METADATA_FIELDS) for position in positions]
+    to_download = []
+    for position, (metadata, exception) in zip(positions, execute_batched(drive_service, requests, RateLimiter())):
+        link, file_id = links[position], file_ids[position]
+        if exception is not None:
+            notebooks[position] = {"link": link, "file_id": file_id, "failure": str(metadata_error(exception))}
+            continue
+        md5_checksum = metadata.get("md5Checksum")
+        errors = _cached_errors(version, file_id, md5_checksum)
+        if errors is not None:
+            notebooks[position] = {"link": link, "file_id": file_id, "md5Checksum": md5_checksum, "errors": errors}
+        else:
+            notebooks[position] = {"link": link, "file_id": file_id, "md5Checksum": md5_checksum}
+            to_download.append(position)
+
+    def download(position):
+        # get_drive_service keeps one client per worker thread
+        content = download_notebook(get_drive_service(), file_ids[position])
+        return content.decode("utf-8", errors="replace")
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        futures = {position: executor.submit(download, position) for position in to_download}
+        for position, future in futures.items():
+            try:
+                notebooks[position]["content"] = future.result()
+            except Exception as e:
+                notebooks[position] = {"link": links[position], "file_id": file_ids[position], "failure": str(e)}
+    return notebooks
+
+
+def collect_folder_notebooks(folder_id: str, version: str) -> List[dict]:
+    """Fetches the Colab notebooks in a Drive folder, see collect_notebooks."""
+    from delivery_workflow.sheet_util import get_colab_links_from_folder
+
+    return collect_notebooks(get_colab_links_from_folder(get_drive_service(), folder_id), version)
+
+
+def read_sheet_links(sheet_id: str, sheet_name: str, link_column: str) -> List[str]:
+    """The non-empty values of the `link_column` column of a sheet tab; the first row is the header."""
+    from delivery_workflow.data_ingest.src.gdrive_utils.sheet_utils import a1_sheet_range
+
+    values = get_sheets_service().spreadsheets().values().get(
+        spreadsheetId=sheet_id, range=a1_sheet_range(sheet_name)
+    ).execute().get("values", [])
+    if not values or link_column not in values[0]:
+        raise ValueError(f"Column '{link_column}' not found in sheet '{sheet_name}'.")
+    column = values[0].index(link_column)
+    return [row[column].strip() for row in values[1:] if len(row) > column and row[column].strip()]
+
+
+def collect_sheet_notebooks(sheet_id: str, sheet_name: str, link_column: str, version: str) -> List[dict]:
+    """Fetches the notebooks linked from a sheet tab, see collect_notebooks."""
+    return collect_notebooks(read_sheet_links(sheet_id, sheet_name, link_column), version)
+
+
+def _collector(source_link: str, version: str, sheet_name: Optional[str], link_column: Optional[str]) -> Callable:
+    """The collect function for a folder or sheet link; raises ValueError for any other link."""
+    folder_match = re.search(r'/folders/([a-zA-Z0-9_-]+)', source_link)
+    sheet_match = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', source_link)
+    if folder_match:
+        return lambda: collect_folder_notebooks(folder_match.group(1), version)
+    if sheet_match:
+        if not sheet_name or not link_column:
+            raise ValueError("Sheet name and link column are required for a sheet link.")
+        return lambda: collect_sheet_notebooks(sheet_match.group(1), sheet_name, link_column, version)
+    raise ValueError("Invalid link. Provide a Google Drive folder link or a Google Sheets link.")
+
+
+def _validate_notebooks(notebooks: List[dict], validate_content: Callable, version: str) -> List[dict]:
+    rows = [None] * len(notebooks)
+    pending = {}
+    pool = _get_process_pool()
+    for position, notebook in enumerate(notebooks):
+        if "failure" in notebook:
+            rows[position] = _row(notebook["link"], notebook["file_id"], "error", [notebook["failure"]])
+        elif "errors" in notebook:
+            rows[position] = _row(notebook["link"], notebook["file_id"], "invalid" if notebook["errors"] else "valid", notebook["errors"])
+        else:
+            pending[position] = pool.submit(validate_content, notebook["content"], notebook["file_id"])
+
+    for position, future in pending.items():
+        notebook = notebooks[position]
+        try:
+            errors, digest = future.result()
+        except Exception as e:
+            rows[position] = _row(notebook["link"], notebook["file_id"], "error", [str(e)])
+            continue
+        validation_cache.remember_checksum(version, notebook["file_id"], notebook.get("md5Checksum"), digest)
+        validation_cache.put(version, digest, errors)
+        rows[position] = _row(notebook["link"], notebook["file_id"], "invalid" if errors else "valid", errors)
+    return rows
+
+
+def _run(report: BulkReport, collect: Callable, validate_content: Callable, version: str):
+    try:
+        report.rows = _validate_notebooks(collect(), validate_content, version)
+        report.status = "done"
+    except Exception as e:
+        print(f"Bulk validation {report.report_id} failed: {e}")
+        report.failure = str(e)
+        report.status = "failed"
+
+
+def _new_report(validator: str, source_link: str) -> BulkReport:
+    report = BulkReport(
+        report_id=uuid.uuid4().hex,
+        validator=validator,
+        source=source_link,
+        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    _store_report(report)
+    return report
+
+
+def run_bulk_validation(
+    validator: str,
+    source_link: str,
+    validate_content: Callable,
+    version: str,
+    sheet_name: Optional[str] = None,
+    link_column: Optional[str] = None,
+) -> BulkReport:
+    """
+    Validates every notebook in a Drive folder or linked from a Google Sheet.
+
+    Notebooks are fetched with collect_notebooks, then `validate_content(content, file_id)`
+    runs in a process pool. It must be a module-level function returning
+    (errors, content_hash), like validate_lwc_content. Results are stored so the
+    report can be paged through and downloaded later.
+    """
+    collect = _collector(source_link, version, sheet_name, link_column)
+    report = _new_report(validator, source_link)
+    _run(report, collect, validate_content, version)
+    return report
+
+
+def start_bulk_validation(
+    validator: str,
+    source_link: str,
+    validate_content: Callable,
+    version: str,
+    sheet_name: Optional[str] = None,
+    link_column: Optional[str] = None,
+) -> BulkReport:
+    """
+    Like run_bulk_validation, but returns the stored report while it is still
+    running and validates in a background worker, so a web request never waits
+    for a large folder. Poll get_report until its status is no longer 'running'.
+    An invalid link still raises ValueError right away.
+    """
+    collect = _collector(source_link, version, sheet_name, link_column)
+    report = _new_report(validator, source_link)
+    _get_job_pool().submit(_run, report, collect, validate_content, version)
+    return report
@@ -0,0 +1,89 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+
+class CellIndex:
+    """
+    Maps character offsets of a joined markdown document back to notebook cells.
+
+    The validators work on all markdown cells joined with a separator into one
+    string. The index keeps the start offset of every markdown cell in that
+    string (a prefix sum of cell lengths plus separators) together with the
+    cell's position in the notebook, so any regex match position can be
+    resolved to its cell with a binary search.
+    """
+
+    def __init__(self, starts: List[int], lengths: List[int], cell_numbers: List[int]):
+        self.starts = starts
+        self.lengths = lengths
+        self.cell_numbers = cell_numbers
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _position(self, offset: int) -> int:
+        # Offsets inside a separator belong to the cell before it.
+        return max(bisect_right(self.starts, offset) - 1, 0)
+
+    def cell_at(self, offset: int) -> Optional[int]:
+        """Returns the 1-based notebook cell number containing `offset`."""
+        if not self.starts:
+            return None
+        return self.cell_numbers[self._position(offset)]
+
+    def is_separator(self, offset: int) -> bool:
+        """True if `offset` falls between two cells rather than inside one."""
+        if not self.starts:
+            return False
+        position = self._position(offset)
+        return offset >= self.starts[position] + self.lengths[position]
+
+    def shifted(self, delta: int) -> "CellIndex":
+        """Returns a copy of the index for a document whose offsets moved by `delta`."""
+        return CellIndex(
+            [start + delta for start in self.starts],
+            list(self.lengths),
+            list(self.cell_numbers),
+        )
+
+
+def _cell_source(cell) -> str:
+    source = cell.get("source", "")
+    if isinstance(source, list):
+        return "".join(source)
+    return source
+
+
+def join_markdown_cells(cells, separator: str = "\n\n", strip: bool = False) -> Tuple[str, CellIndex]:
+    """
+    Joins the markdown cells of a notebook into a single document.
+
+    Returns the document and a CellIndex for it. Cell numbers are counted over
+    all notebook cells (markdown and code), the same way Colab shows them.
+    If `strip` is True, surrounding whitespace is removed from the document and
+    the index is adjusted to match.
+    """
+    sources = []
+    starts = []
+    lengths = []
+    cell_numbers = []
+    offset = 0
+    for cell_number, cell in enumerate(cells, start=1):
+        if cell.get("cell_type") != "markdown":
+            continue
+        source = _cell_source(cell)
+        if sources:
+            offset += len(separator)
+        starts.append(offset)
+        lengths.append(len(source))
+        cell_numbers.append(cell_number)
+        sources.append(source)
+        offset += len(source)
+
+    document = separator.join(sources)
+    cell_index = CellIndex(starts, lengths, cell_numbers)
+    if strip:
+        leading = len(document) - len(document.lstrip())
+        document = document.strip()
+        cell_index = cell_index.shifted(-leading)
+    return document, cell_index
@@ -0,0 +1,117 @@
+import re
+import io
+import os
+import json
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload
+from google.oauth2 import service_account
+
+DRIVE_READONLY_SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+METADATA_FIELDS = "id,name,md5Checksum,size,modifiedTime"
+
+_local = threading.local()
+
+
+def extract_file_id(notebook_link: str) -> str:
+    """
+    Extracts the Drive file ID from a Colab or Drive notebook link.
+    Raises ValueError if the link does not contain one.
+    """
+    file_id_match = re.search(r'/drive/([a-zA-Z0-9_-]+)', notebook_link) or \
+                    re.search(r'/file/d/([a-zA-Z0-9_-]+)', notebook_link) or \
+                    re.search(r'fileId=([a-zA-Z0-9_-]+)', notebook_link)
+    if not file_id_match:
+        raise ValueError("Invalid notebook link format. Could not extract file ID.")
+    return file_id_match.group(1)
+
+
+@lru_cache(maxsize=4)
+def _load_credentials(credentials_json: str):
+    return service_account.Credentials.from_service_account_info(
+        json.loads(credentials_json),
+        scopes=DRIVE_READONLY_SCOPES
+    )
+
+
+def get_drive_service():
+    """
+    Returns a Drive v3 client built from the GOOGLE_CREDENTIALS environment variable.
+
+    Credentials are parsed once per distinct value and reused (the token is
+    refreshed by the library when it expires). The underlying httplib2 client
+    is not thread-safe, so each worker thread keeps its own service object.
+    """
+    credentials_json = os.getenv("GOOGLE_CREDENTIALS")
+    if not credentials_json:
+        raise ValueError("Google credentials not found in environment variables")
+    try:
+        creds = _load_credentials(credentials_json)
+    except Exception as e:
+        raise Exception(f"Failed to set up Google Drive API credentials: {e}")
+
+    cached = getattr(_local, "drive_service", None)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    drive_service = build('drive', 'v3', credentials=creds, cache_discovery=False)
+    _local.drive_service = (creds, drive_service)
+    return drive_service
+
+
+def get_sheets_service():
+    """
+    Returns a Sheets v4 client with the same credentials as get_drive_service.
+    The read-only Drive scope is enough to read the values of a sheet.
+    """
+    credentials_json = os.getenv("GOOGLE_CREDENTIALS")
+    if not credentials_json:
+        raise ValueError("Google credentials not found in environment variables")
+    try:
+        creds = _load_credentials(credentials_json)
+    except Exception as e:
+        raise Exception(f"Failed to set up Google Drive API credentials: {e}")
+    return build('sheets', 'v4', credentials=creds, cache_discovery=False)
+
+
+def metadata_error(error: Exception) -> Exception:
+    """
+    The exception to raise for a failed metadata request: a 403 becomes a
+    PermissionError and a 404 a FileNotFoundError, based on the HTTP status.
+    """
+    if isinstance(error, HttpError):
+        if error.resp.status == 403:
+            return PermissionError("Permission denied: Ensure the notebook is shared with the service account.")
+        elif error.resp.status == 404:
+            return FileNotFoundError("Notebook not found. Check the link.")
+    return Exception(f"Failed to verify notebook accessibility: {error}")
+
+
+def fetch_metadata(drive_service, file_id: str) -> dict:
+    """
+    Fetches id, name, md5Checksum, size and modifiedTime in a single request.
+
+    This also serves as the access check, see metadata_error.
+    """
+    try:
+        return drive_service.files().get(fileId=file_id, fields=METADATA_FIELDS).execute()
+    except HttpError as e:
+        raise metadata_error(e)
+
+
+def download_notebook(drive_service, file_id: str, progress: Optional[Callable[[int], None]] = None) -> bytes:
+    """
+    Downloads the raw notebook bytes.
+    `progress`, if given, is called with the completed percentage after each chunk.
+    """
+    request = drive_service.files().get_media(fileId=file_id)
+    fh = io.BytesIO()
+    downloader = MediaIoBaseDownload(fh, request)
+    done = False
+    while not done:
+        status, done = downloader.next_chunk()
+        if progress:
+            progress(int(status.progress() * 100))
+    return fh.getvalue()
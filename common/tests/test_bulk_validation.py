@@ -0,0 +1,261 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+import common.bulk_validation as bulk_validation
+from common.bulk_validation import BulkReport, get_report, run_bulk_validation, start_bulk_validation
+from common.validation_cache import ValidationCache
+from common.validation_issue import ValidationIssue
+
+FOLDER_LINK = "https://drive.google.com/drive/folders/folder-id"
+SHEET_LINK = "https://docs.google.com/spreadsheets/d/sheet-id/edit"
+
+
+def validate_content(content, file_id):
+    """Stands in for validate_lwc_content; runs in the process pool."""
+    if content == "boom":
+        raise RuntimeError("Validator crashed.")
+    errors = [f"{content} is invalid (pid {os.getpid()})"] if content.startswith("bad") else []
+    return errors, f"hash-{content}"
+
+
+def notebook(name, **fields):
+    return dict({"link": f"https://colab.research.google.com/drive/{name}", "file_id": name}, **fields)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ValidationCache()
+    monkeypatch.setattr(bulk_validation, "validation_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def process_pool(monkeypatch):
+    monkeypatch.setattr(bulk_validation, "VALIDATION_PROCESSES", 2)
+    monkeypatch.setattr(bulk_validation, "_process_pool", None)
+    monkeypatch.setattr(bulk_validation, "_job_pool", None)
+    monkeypatch.setattr(bulk_validation, "_reports", OrderedDict())
+    yield
+    if bulk_validation._job_pool is not None:
+        bulk_validation._job_pool.shutdown()
+    if bulk_validation._process_pool is not None:
+        bulk_validation._process_pool.shutdown()
+
+
+def test_notebooks_are_validated_in_the_process_pool(monkeypatch, cache):
+    notebooks = [
+        notebook("good", md5Checksum="md5-good", content="good"),
+        notebook("bad", md5Checksum="md5-bad", content="bad"),
+        notebook("missing", failure="Notebook not found. Check the link."),
+        notebook("crash", md5Checksum="md5-crash", content="boom"),
+        notebook("cached", md5Checksum="md5-cached", errors=["Cached error."]),
+    ]
+    monkeypatch.setattr(bulk_validation, "collect_folder_notebooks", lambda folder_id, version: notebooks)
+
+    report = run_bulk_validation("lwc", FOLDER_LINK, validate_content, "v1")
+
+    # Rows keep the order of the notebooks, whatever order the pool finished in
+    assert [(row["file_id"], row["status"]) for row in report.rows] == [
+        ("good", "valid"),
+        ("bad", "invalid"),
+        ("missing", "error"),
+        ("crash", "error"),
+        ("cached", "invalid"),
+    ]
+    assert report.counts == {"valid": 1, "invalid": 2, "error": 2}
+    [error] = report.rows[1]["errors"]
+    assert f"(pid {os.getpid()})" not in error
+    assert report.rows[3]["errors"] == ["Validator crashed."]
+    assert get_report(report.report_id) is report
+
+
+def test_results_are_cached_by_checksum(monkeypatch, cache):
+    notebooks = [notebook("bad", md5Checksum="md5-bad", content="bad"), notebook("sheet", md5Checksum=None, content="good")]
+    monkeypatch.setattr(bulk_validation, "collect_folder_notebooks", lambda folder_id, version: notebooks)
+
+    run_bulk_validation("lwc", FOLDER_LINK, validate_content, "v1")
+
+    assert cache.content_hash_for("v1", "bad", "md5-bad") == "hash-bad"
+    assert len(cache.get("v1", "hash-bad")) == 1
+    assert cache.get("v1", "hash-good") == []
+    assert cache._checksums.keys() == {("v1", "bad")}
+
+
+def test_invalid_links_are_rejected():
+    with pytest.raises(ValueError, match="Invalid link"):
+        run_bulk_validation("lwc", "https://example.com", validate_content, "v1")
+    with pytest.raises(ValueError, match="Sheet name and link column"):
+        run_bulk_validation("lwc", SHEET_LINK, validate_content, "v1", sheet_name="Tasks")
+
+
+def test_sheet_links_are_collected_with_the_validator_version(monkeypatch, cache):
+    calls = []
+
+    def collect(sheet_id, sheet_name, link_column, version):
+        calls.append((sheet_id, sheet_name, link_column, version))
+        return [notebook("good", md5Checksum="md5-good", content="good")]
+
+    monkeypatch.setattr(bulk_validation, "collect_sheet_notebooks", collect)
+
+    report = run_bulk_validation("apex", SHEET_LINK, validate_content, "v1", "Tasks", "colab_task_link")
+
+    assert calls == [("sheet-id", "Tasks", "colab_task_link", "v1")]
+    assert report.counts == {"valid": 1, "invalid": 0, "error": 0}
+
+
+@pytest.fixture
+def drive(monkeypatch, fake_google, google_services):
+    """The fake Drive, with bulk_validation's clients and downloads pointed at it."""
+    downloads = []
+
+    def download_notebook(service, file_id):
+        downloads.append(file_id)
+        return fake_google.drive.content(file_id)
+
+    monkeypatch.setattr(bulk_validation, "get_drive_service", lambda: google_services["drive"])
+    monkeypatch.setattr(bulk_validation, "get_sheets_service", lambda: google_services["sheets"])
+    monkeypatch.setattr(bulk_validation, "download_notebook", download_notebook)
+    fake_google.drive.downloads = downloads
+    return fake_google.drive
+
+
+def colab_link(file_id):
+    return f"https://colab.research.google.com/drive/{file_id}"
+
+
+def test_only_notebooks_missing_from_the_cache_are_downloaded(drive, cache):
+    seen = drive.add_file("seen.ipynb", "seen")
+    changed = drive.add_file("changed.ipynb", "changed")
+    cache.remember_checksum("v1", seen, drive.get(seen)["md5Checksum"], "hash-seen")
+    cache.put("v1", "hash-seen", ["Cached error."])
+    cache.remember_checksum("v1", changed, "md5-of-an-older-revision", "hash-old")
+    cache.put("v1", "hash-old", [])
+    links = [colab_link(seen), colab_link(changed), colab_link("missing"), "https://example.com/notebook"]
+
+    notebooks = bulk_validation.collect_notebooks(links, "v1")
+
+    assert drive.downloads == [changed]
+    assert notebooks[0] == {"link": links[0], "file_id": seen, "md5Checksum": drive.get(seen)["md5Checksum"], "errors": ["Cached error."]}
+    assert notebooks[1] == {"link": links[1], "file_id": changed, "md5Checksum": drive.get(changed)["md5Checksum"], "content": "changed"}
+    assert notebooks[2] == {"link": links[2], "file_id": "missing", "failure": "Notebook not found. Check the link."}
+    assert notebooks[3]["failure"] == "Invalid notebook link format. Could not extract file ID."
+
+
+def test_sheet_links_are_read_from_the_link_column(drive, cache, fake_google):
+    seen = drive.add_file("seen.ipynb", "seen")
+    fresh = drive.add_file("fresh.ipynb", "fresh")
+    cache.remember_checksum("v1", seen, drive.get(seen)["md5Checksum"], "hash-seen")
+    cache.put("v1", "hash-seen", [])
+    sheet_id = fake_google.sheets.add_spreadsheet(sheets={"Tasks": [
+        ["task", "colab_task_link"],
+        ["1", f" {colab_link(seen)} "],
+        ["2", ""],
+        ["3", colab_link(fresh)],
+    ]})
+
+    notebooks = bulk_validation.collect_sheet_notebooks(sheet_id, "Tasks", "colab_task_link", "v1")
+
+    assert [notebook["file_id"] for notebook in notebooks] == [seen, fresh]
+    assert drive.downloads == [fresh]
+    with pytest.raises(ValueError, match="Column 'link' not found"):
+        bulk_validation.read_sheet_links(sheet_id, "Tasks", "link")
+
+
+def wait_for(report, timeout=10):
+    deadline = time.monotonic() + timeout
+    while report.status == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return report
+
+
+def test_started_validation_runs_in_the_background(monkeypatch, cache):
+    release = threading.Event()
+
+    def collect(folder_id, version):
+        release.wait(10)
+        return [notebook("good", md5Checksum="md5-good", content="good")]
+
+    monkeypatch.setattr(bulk_validation, "collect_folder_notebooks", collect)
+
+    report = start_bulk_validation("lwc", FOLDER_LINK, validate_content, "v1")
+
+    assert report.status == "running"
+    assert get_report(report.report_id) is report
+    assert report.to_dict()["status"] == "running"
+    release.set()
+    assert wait_for(report).status == "done"
+    assert report.counts == {"valid": 1, "invalid": 0, "error": 0}
+
+
+def test_started_validation_reports_a_failed_collection(monkeypatch, cache):
+    def collect(folder_id, version):
+        raise PermissionError("Permission denied")
+
+    monkeypatch.setattr(bulk_validation, "collect_folder_notebooks", collect)
+
+    report = wait_for(start_bulk_validation("lwc", FOLDER_LINK, validate_content, "v1"))
+
+    assert (report.status, report.failure, report.rows) == ("failed", "Permission denied", [])
+    with pytest.raises(ValueError, match="Invalid link"):
+        start_bulk_validation("lwc", "https://example.com", validate_content, "v1")
+
+
+def report_with(row_count):
+    rows = [
+        {"link": f"link-{n}", "file_id": f"file-{n}", "status": "invalid" if n % 2 else "valid", "errors": ["Missing section."] if n % 2 else []}
+        for n in range(row_count)
+    ]
+    return BulkReport("report", "lwc", FOLDER_LINK, "2024-01-01 00:00:00", rows)
+
+
+def test_report_pages():
+    report = report_with(120)
+
+    assert report.page_count() == 3
+    assert [row["file_id"] for row in report.page(1)][:2] == ["file-0", "file-1"]
+    assert len(report.page(2)) == 50
+    assert [row["file_id"] for row in report.page(3)] == [f"file-{n}" for n in range(100, 120)]
+    assert report.page(4) == []
+    assert report.page_count(page_size=40) == 3
+    assert report_with(0).page_count() == 1
+    assert report_with(50).page_count() == 1
+
+
+def test_report_to_dict_pages_the_rows():
+    report = report_with(120)
+    report.rows[1]["errors"] = [ValidationIssue("lwc.metadata.missing_section", "Missing section.", cell=2)]
+
+    first = report.to_dict(page=1)
+    last = report.to_dict(page=3)
+    full = report.to_dict()
+
+    assert (first["page"], first["page_count"], len(first["rows"])) == (1, 3, 50)
+    assert (last["page"], len(last["rows"])) == (3, 20)
+    assert (full["page"], len(full["rows"])) == (None, 120)
+    assert first["counts"] == {"valid": 60, "invalid": 60, "error": 0}
+    assert first["rows"][1]["errors"][0]["rule_id"] == "lwc.metadata.missing_section"
+    assert first["rows"][3]["errors"][0]["rule_id"] == "unclassified"
+    # Serializing never changes the stored rows
+    assert isinstance(report.rows[1]["errors"][0], ValidationIssue)
+
+
+def test_report_csv_has_every_row():
+    lines = report_with(3).to_csv().splitlines()
+
+    assert lines[0] == "notebook_link,file_id,status,error_count,errors"
+    assert lines[1:] == ["link-0,file-0,valid,0,", "link-1,file-1,invalid,1,Missing section.", "link-2,file-2,valid,0,"]
+
+
+def test_oldest_reports_are_dropped(monkeypatch):
+    monkeypatch.setattr(bulk_validation, "MAX_REPORTS", 2)
+    reports = [BulkReport(f"report-{n}", "lwc", FOLDER_LINK, "2024-01-01 00:00:00") for n in range(3)]
+    for report in reports:
+        bulk_validation._store_report(report)
+
+    assert get_report("report-0") is None
+    assert get_report("report-1") is reports[1]
+    assert get_report("report-2") is reports[2]
@@ -0,0 +1,86 @@
+from common.cell_index import CellIndex, join_markdown_cells
+
+
+def markdown(source):
+    return {"cell_type": "markdown", "source": source}
+
+
+def code(source):
+    return {"cell_type": "code", "source": source}
+
+
+def test_offsets_map_to_notebook_cell_numbers():
+    cells = [markdown("# Metadata"), code("print(1)"), markdown(["**User**\n", "Hi"]), markdown("Bye")]
+
+    document, cell_index = join_markdown_cells(cells)
+
+    assert document == "# Metadata\n\n**User**\nHi\n\nBye"
+    # Cell numbers count code cells too, as Colab does
+    assert cell_index.cell_numbers == [1, 3, 4]
+    assert cell_index.cell_at(document.index("Metadata")) == 1
+    assert cell_index.cell_at(document.index("Hi")) == 3
+    assert cell_index.cell_at(document.index("Bye")) == 4
+
+
+def test_cell_boundaries():
+    document, cell_index = join_markdown_cells([markdown("ab"), markdown("cd")])
+
+    assert document == "ab\n\ncd"
+    # Last character of the first cell, then the separator, then the first of the next cell
+    assert cell_index.cell_at(1) == 1
+    assert not cell_index.is_separator(1)
+    assert cell_index.cell_at(2) == 1
+    assert cell_index.is_separator(2)
+    assert cell_index.is_separator(3)
+    assert cell_index.cell_at(4) == 2
+    assert not cell_index.is_separator(4)
+    # Offsets before the document or past its end belong to the first and last cells
+    assert cell_index.cell_at(-1) == 1
+    assert cell_index.cell_at(len(document)) == 2
+
+
+def test_empty_cells_keep_their_number():
+    document, cell_index = join_markdown_cells([markdown("a"), markdown(""), markdown("b")])
+
+    assert document == "a\n\n\n\nb"
+    assert cell_index.cell_numbers == [1, 2, 3]
+    assert cell_index.lengths == [1, 0, 1]
+    # An empty cell has no characters of its own, its offset falls between the separators
+    assert cell_index.cell_at(3) == 2
+    assert cell_index.is_separator(3)
+    assert cell_index.cell_at(document.index("b")) == 3
+
+
+def test_notebook_without_markdown_cells():
+    document, cell_index = join_markdown_cells([code("x = 1")])
+
+    assert document == ""
+    assert len(cell_index) == 0
+    assert cell_index.cell_at(0) is None
+    assert not cell_index.is_separator(0)
+
+
+def test_strip_shifts_the_index():
+    document, cell_index = join_markdown_cells([markdown("\n  # Title"), markdown("text  \n")], strip=True)
+
+    assert document == "# Title\n\ntext"
+    assert cell_index.cell_at(0) == 1
+    assert cell_index.cell_at(document.index("text")) == 2
+
+
+def test_custom_separator():
+    document, cell_index = join_markdown_cells([markdown("a"), markdown("b")], separator="\n")
+
+    assert document == "a\nb"
+    assert cell_index.is_separator(1)
+    assert cell_index.cell_at(2) == 2
+
+
+def test_shifted_copy():
+    cell_index = CellIndex([0, 5], [3, 2], [1, 4])
+
+    shifted = cell_index.shifted(10)
+
+    assert shifted.starts == [10, 15]
+    assert shifted.cell_at(15) == 4
+    assert cell_index.starts == [0, 5]
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+from common.validation_cache import ValidationCache, content_hash, validator_version
+from common.validation_issue import Severity, ValidationIssue
+
+
+def issues(*rule_ids):
+    return [ValidationIssue(rule_id, f"{rule_id} failed", cell=index) for index, rule_id in enumerate(rule_ids, start=1)]
+
+
+def test_round_trip_keeps_issue_fields():
+    cache = ValidationCache()
+    stored = [ValidationIssue("lwc.metadata.missing_section", "Missing section.", Severity.WARNING, cell=3, issue=2)]
+
+    cache.put("v1", "digest", stored)
+    [issue] = cache.get("v1", "digest")
+
+    assert issue == "Missing section."
+    assert (issue.rule_id, issue.severity, issue.cell, issue.issue) == ("lwc.metadata.missing_section", Severity.WARNING, 3, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ValidationCache(max_entries=2)
+    cache.put("v1", "a", issues("a"))
+    cache.put("v1", "b", issues("b"))
+    # Reading `a` makes `b` the least recently used
+    assert cache.get("v1", "a") is not None
+
+    cache.put("v1", "c", issues("c"))
+
+    assert cache.get("v1", "b") is None
+    assert cache.get("v1", "a") == ["a failed"]
+    assert cache.get("v1", "c") == ["c failed"]
+
+
+def test_results_are_keyed_by_validator_version():
+    cache = ValidationCache()
+    cache.put("v1", "digest", issues("old"))
+
+    assert cache.get("v2", "digest") is None
+    cache.put("v2", "digest", issues("new"))
+    assert cache.get("v1", "digest") == ["old failed"]
+    assert cache.get("v2", "digest") == ["new failed"]
+
+
+def test_validator_version_changes_with_the_validator_source(tmp_path):
+    validator = tmp_path / "validator.py"
+    helper = tmp_path / "helper.py"
+    validator.write_text("RULES = 1\n")
+    helper.write_text("SEPARATOR = '\\n\\n'\n")
+    modules = (SimpleNamespace(__file__=str(validator)), SimpleNamespace(__file__=str(helper)))
+
+    version = validator_version(*modules)
+    assert validator_version(*modules) == version
+    helper.write_text("SEPARATOR = '\\n'\n")
+
+    assert validator_version(*modules) != version
+
+
+def test_content_hash_includes_cell_numbers():
+    assert content_hash("# Metadata") == content_hash("# Metadata", [])
+    assert content_hash("# Metadata", [1]) != content_hash("# Metadata", [2])
+    assert content_hash("# Metadata", [1]) != content_hash("# Conversation", [1])
+
+
+def test_checksum_maps_to_the_content_hash_of_its_revision():
+    cache = ValidationCache()
+    cache.remember_checksum("v1", "file", "md5-a", "hash-a")
+
+    assert cache.content_hash_for("v1", "file", "md5-a") == "hash-a"
+    # A new revision, another validator version or no checksum at all are misses
+    assert cache.content_hash_for("v1", "file", "md5-b") is None
+    assert cache.content_hash_for("v2", "file", "md5-a") is None
+    assert cache.content_hash_for("v1", "other", "md5-a") is None
+    assert cache.content_hash_for("v1", "file", None) is None
+
+    cache.remember_checksum("v1", "file", "md5-b", "hash-b")
+    assert cache.content_hash_for("v1", "file", "md5-a") is None
+    assert cache.content_hash_for("v1", "file", "md5-b") == "hash-b"
+
+
+def test_files_without_checksum_are_not_remembered():
+    cache = ValidationCache()
+    cache.remember_checksum("v1", "file", None, "hash")
+
+    assert cache._checksums == {}
+
+
+def test_cache_dir_survives_a_restart(tmp_path):
+    cache = ValidationCache(max_entries=1, cache_dir=str(tmp_path))
+    cache.put("v1", "a", issues("a"))
+    cache.put("v1", "b", issues("b"))
+    cache.remember_checksum("v1", "file", "md5", "a")
+
+    restarted = ValidationCache(max_entries=1, cache_dir=str(tmp_path))
+
+    # Evicted from memory, still read back from disk
+    assert cache.get("v1", "a") == ["a failed"]
+    assert restarted.get("v1", "b") == ["b failed"]
+    assert restarted.content_hash_for("v1", "file", "md5") == "a"
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("VALIDATION_CACHE_SIZE", "3")
+    monkeypatch.setenv("VALIDATION_CACHE_DIR", str(tmp_path))
+
+    cache = ValidationCache.from_env()
+
+    assert cache.max_entries == 3
+    assert cache.cache_dir == str(tmp_path)
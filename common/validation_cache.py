@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from common.validation_issue import ValidationIssue, issue_to_dict, issue_from_dict
+
+
+def validator_version(*modules) -> str:
+    """
+    Returns a short hash of the source files of the given validator modules.
+    Any edit to a validator changes the version, so stale results are never reused.
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def content_hash(text: str, cell_numbers: Optional[List[int]] = None) -> str:
+    """
+    Returns the sha256 hex digest of the text that is fed to the validator.
+    Errors quote notebook cell numbers, so those are hashed in as well when given.
+    """
+    digest = hashlib.sha256(text.encode("utf-8"))
+    if cell_numbers:
+        digest.update(json.dumps(cell_numbers).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """
+    Bounded LRU cache of validation results.
+
+    Results are keyed by (validator version, content hash) and stored as the
+    list of issues in their to_dict() form. A second map remembers the content
+    hash seen for a Drive (file_id, md5Checksum) pair so an unchanged notebook can be answered from
+    its metadata alone, without downloading it again.
+
+    If `cache_dir` is set, entries are also written there as JSON files and
+    read back after a restart.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._results = OrderedDict()
+        self._checksums = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(os.path.join(cache_dir, "checksums"), exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ValidationCache":
+        """Builds a cache from VALIDATION_CACHE_SIZE and VALIDATION_CACHE_DIR."""
+        max_entries = int(os.getenv("VALIDATION_CACHE_SIZE", "256"))
+        cache_dir = os.getenv("VALIDATION_CACHE_DIR") or None
+        return cls(max_entries=max_entries, cache_dir=cache_dir)
+
+    def _remember(self, store: OrderedDict, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+
+    def _lookup(self, store: OrderedDict, key, path: Optional[str]):
+        with self._lock:
+            if key in store:
+                store.move_to_end(key)
+                return store[key]
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._remember(store, key, value)
+        return value
+
+    def _persist(self, path: Optional[str], value):
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not persist validation cache entry {path}: {e}")
+
+    def _result_path(self, key: Tuple[str, str]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        version, digest = key
+        return os.path.join(self.cache_dir, f"{version}-{digest}.json")
+
+    def _checksum_path(self, version: str, file_id: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, "checksums", f"{version}-{file_id}.json")
+
+    def get(self, version: str, digest: str) -> Optional[List[ValidationIssue]]:
+        """Returns the cached issues for the content, or None on a miss."""
+        entry = self._lookup(self._results, (version, digest), self._result_path((version, digest)))
+        return None if entry is None else [issue_from_dict(d) for d in entry["errors"]]
+
+    def put(self, version: str, digest: str, errors: List[ValidationIssue]):
+        """Stores the issues produced for the content."""
+        entry = {"errors": [issue_to_dict(error) for error in errors]}
+        with self._lock:
+            self._remember(self._results, (version, digest), entry)
+        self._persist(self._result_path((version, digest)), entry)
+
+    def content_hash_for(self, version: str, file_id: str, md5_checksum: Optional[str]) -> Optional[str]:
+        """Returns the content hash last seen for this Drive revision, if known."""
+        if not md5_checksum:
+            return None
+        entry = self._lookup(self._checksums, (version, file_id), self._checksum_path(version, file_id))
+        if entry is None or entry["md5Checksum"] != md5_checksum:
+            return None
+        return entry["content_hash"]
+
+    def remember_checksum(self, version: str, file_id: str, md5_checksum: Optional[str], digest: str):
+        """Links a Drive file's md5Checksum to the hash of its validated content."""
+        if not md5_checksum:
+            return
+        entry = {"md5Checksum": md5_checksum, "content_hash": digest}
+        with self._lock:
+            self._remember(self._checksums, (version, file_id), entry)
+        self._persist(self._checksum_path(version, file_id), entry)
+
+
+validation_cache = ValidationCache.from_env()
@@ -0,0 +1,88 @@
+from enum import Enum
+from typing import Optional
+
+
+class Severity(Enum):
+    ERROR = "error"
+    WARNING = "warning"
+
+
+class ValidationIssue(str):
+    """
+    A validation message with machine-readable fields attached.
+
+    It subclasses str and its text is the same human message the validators
+    always produced, so printing it, joining it for Sheets or writing it to an
+    error file keeps working. Tools that need structure use the attributes or
+    to_dict() instead of parsing the text.
+
+    rule_id: stable identifier of the check, e.g. 'lwc.conversation.consecutive_user'
+    severity: Severity.ERROR or Severity.WARNING
+    cell: 1-based notebook cell number the issue points at, if known
+    issue: Apex issue number the message refers to, if any
+    """
+
+    def __new__(
+        cls,
+        rule_id: str,
+        message: str,
+        severity: Severity = Severity.ERROR,
+        cell: Optional[int] = None,
+        issue: Optional[int] = None,
+    ):
+        obj = super().__new__(cls, message)
+        obj.rule_id = rule_id
+        obj.severity = severity
+        obj.cell = cell
+        obj.issue = issue
+        return obj
+
+    def __getnewargs__(self):
+        # Keeps the structured fields when issues are pickled across a process pool
+        return (self.rule_id, str(self), self.severity, self.cell, self.issue)
+
+    @property
+    def message(self) -> str:
+        return str(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "rule_id": self.rule_id,
+            "severity": self.severity.value,
+            "cell": self.cell,
+            "issue": self.issue,
+            "message": str(self),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ValidationIssue":
+        return cls(
+            rule_id=d["rule_id"],
+            message=d["message"],
+            severity=Severity(d["severity"]),
+            cell=d.get("cell"),
+            issue=d.get("issue"),
+        )
+
+
+def issue_to_dict(error) -> dict:
+    """Serializes an issue; plain strings from older code get a generic rule id."""
+    if isinstance(error, ValidationIssue):
+        return error.to_dict()
+    return ValidationIssue("unclassified", error).to_dict()
+
+
+def issue_from_dict(d) -> ValidationIssue:
+    if isinstance(d, str):
+        return ValidationIssue("unclassified", d)
+    return ValidationIssue.from_dict(d)
+
+
+# Columns of an issue in the validation issue sheets, one row per issue
+ISSUE_SHEET_COLUMNS = ["Rule ID", "Severity", "Cell", "Issue No.", "Message"]
+
+
+def issue_sheet_row(error) -> list:
+    """The ISSUE_SHEET_COLUMNS values of an issue; unknown cells and issue numbers are left blank."""
+    d = issue_to_dict(error)
+    return [d["rule_id"], d["severity"], d["cell"] or "", d["issue"] or "", d["message"]]
@@ -0,0 +1,151 @@
+import re
+import time
+import threading
+from typing import Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from delivery_workflow import tracing
+
+# Path segments that name an action on a resource rather than a sub-collection
+RESOURCE_ACTIONS = {"copy", "watch", "emptyTrash", "generateIds", "stop"}
+VERSION_SEGMENT = re.compile(r"^v\d+(beta\d*)?$")
+HTTP_VERBS = {"PUT": "update", "PATCH": "update", "DELETE": "delete"}
+
+
+def describe_request(http_method: str, uri: str) -> Tuple[str, str]:
+    """
+    Names the Google API method of an HTTP request from its URL, e.g.
+    GET .../drive/v3/files -> ('drive', 'files.list') and
+    PUT .../v4/spreadsheets/<id>/values/<range> -> ('sheets', 'spreadsheets.values.update').
+    """
+    parts = urlsplit(uri)
+    host = parts.netloc
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if host.startswith("oauth2.") or segments[-1:] == ["token"]:
+        return "oauth2", "token"
+
+    prefix = segments.pop(0) if segments and segments[0] in ("upload", "batch") else None
+    version = next((i for i, segment in enumerate(segments) if VERSION_SEGMENT.match(segment)), None)
+    if host.startswith("sheets."):
+        api = "sheets"
+    elif version:
+        api = segments[version - 1]
+    else:
+        api = host.split(".")[0] or "unknown"
+    if prefix == "batch":
+        return api, "batch"
+
+    rest = segments[version + 1:] if version is not None else segments
+    action = None
+    if rest and ":" in rest[-1]:
+        rest[-1], action = rest[-1].split(":", 1)
+    elif len(rest) >= 3 and len(rest) % 2 == 1 and rest[-1] in RESOURCE_ACTIONS:
+        action = rest.pop()
+    collections = rest[0::2] or ["unknown"]
+    if api == "drive":
+        # Drive methods are named after the innermost resource (revisions.list, not files.revisions.list)
+        collections = collections[-1:]
+
+    if action:
+        verb = action
+    elif http_method == "GET":
+        if len(rest) % 2 == 1:
+            verb = "list"
+        else:
+            verb = "get_media" if parse_qs(parts.query).get("alt") == ["media"] else "get"
+    elif http_method == "POST":
+        verb = "create"
+    else:
+        verb = HTTP_VERBS.get(http_method, http_method.lower())
+    return api, ".".join(collections + [verb])
+
+
+def method_from_id(method_id: Optional[str]) -> Tuple[str, str]:
+    """'drive.files.list' -> ('drive', 'files.list')"""
+    api, _, method = (method_id or "unknown.unknown").partition(".")
+    return api, method
+
+
+def _timed_request(http_method: str, uri: str, send):
+    api, method = describe_request(http_method, uri)
+    start = time.perf_counter()
+    status = None
+    try:
+        response = send()
+        status = response[1]
+        return response[0]
+    finally:
+        tracing.record_api_call(api, method, time.perf_counter() - start, status)
+
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def install():
+    """
+    Hooks the authorized transports of the Google client libraries, so every
+    HTTP request to a Google API is counted by method, timed and classified
+    by response status (see tracing.record_api_call):
+
+    - google_auth_httplib2.AuthorizedHttp, used by googleapiclient services
+      built from credentials (Drive, Sheets).
+    - google.auth.transport.requests.AuthorizedSession, used by gspread.
+
+    Calls sent inside a batch request are counted separately, per method, on
+    top of the single batch HTTP request. Safe to call more than once.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _install_httplib2()
+        _install_requests()
+        _install_batch()
+        _installed = True
+
+
+def _install_httplib2():
+    try:
+        from google_auth_httplib2 import AuthorizedHttp
+    except ImportError:
+        return
+    request = AuthorizedHttp.request
+
+    def accounted_request(self, uri, method="GET", *args, **kwargs):
+        def send():
+            response, content = request(self, uri, method, *args, **kwargs)
+            return (response, content), response.status
+        return _timed_request(method, uri, send)
+
+    AuthorizedHttp.request = accounted_request
+
+
+def _install_requests():
+    try:
+        from google.auth.transport.requests import AuthorizedSession
+    except ImportError:
+        return
+    request = AuthorizedSession.request
+
+    def accounted_request(self, method, url, *args, **kwargs):
+        def send():
+            response = request(self, method, url, *args, **kwargs)
+            return response, response.status_code
+        return _timed_request(method, url, send)
+
+    AuthorizedSession.request = accounted_request
+
+
+def _install_batch():
+    from googleapiclient.http import BatchHttpRequest
+
+    execute = BatchHttpRequest.execute
+
+    def accounted_execute(self, *args, **kwargs):
+        for request in self._requests.values():
+            tracing.record_batched_call(*method_from_id(getattr(request, "methodId", None)))
+        return execute(self, *args, **kwargs)
+
+    BatchHttpRequest.execute = accounted_execute
+
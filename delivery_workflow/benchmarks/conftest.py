@@ -0,0 +1,75 @@
+"""
+Fixtures of the offline benchmark suite.
+
+Run from the repository root, with the test requirements installed:
+
+    pip install -r requirements-dev.txt
+    python -m pytest delivery_workflow/benchmarks --benchmark-only
+
+test_regex_gate.py checks the validators' per-rule times against
+regex_baseline.json (see regex_gate.py) and runs without pytest-benchmark.
+
+Environment variables:
+    BENCHMARK_NOTEBOOKS: notebooks per corpus (default 40).
+    BENCHMARK_LATENCY: seconds the fake Google server adds to each request (default 0.01).
+    BENCHMARK_RATE_LIMIT: API calls per second the fake server accepts before answering 429 (default unlimited).
+"""
+import os
+
+import pytest
+
+from delivery_workflow.benchmarks.corpus import generate_notebooks, input_batch
+from delivery_workflow.benchmarks.fake_google import FakeGoogleServer
+from delivery_workflow.data_ingest.src.gdrive_utils import auth, folder_upload
+from delivery_workflow.data_ingest.src.input_connectors import gsheets
+
+NOTEBOOKS = int(os.getenv("BENCHMARK_NOTEBOOKS", "40"))
+LATENCY = float(os.getenv("BENCHMARK_LATENCY", "0.01"))
+RATE_LIMIT = float(os.getenv("BENCHMARK_RATE_LIMIT", "0")) or None
+
+
+@pytest.fixture(scope="session")
+def apex_notebooks():
+    return generate_notebooks("apex", NOTEBOOKS)
+
+
+@pytest.fixture(scope="session")
+def lwc_notebooks():
+    return generate_notebooks("lwc", NOTEBOOKS)
+
+
+@pytest.fixture(scope="session")
+def apex_batch(apex_notebooks):
+    return input_batch(apex_notebooks)
+
+
+@pytest.fixture(scope="session")
+def lwc_batch(lwc_notebooks):
+    return input_batch(lwc_notebooks)
+
+
+@pytest.fixture(scope="session")
+def fake_google():
+    with FakeGoogleServer(latency=LATENCY, requests_per_second=RATE_LIMIT) as server:
+        yield server
+
+
+@pytest.fixture
+def google_credentials(fake_google, tmp_path, monkeypatch):
+    """
+    Path of a service account key for the fake server. While the test runs,
+    Google API requests go to the fake server and the modules that read the
+    key path from GOOGLE_CREDENTIALS at import time use this key.
+    """
+    path = fake_google.write_service_account_file(str(tmp_path))
+    for module in (auth, folder_upload, gsheets):
+        monkeypatch.setattr(module, "GOOGLE_API_CREDENTIALS_PATH", path)
+    with fake_google.redirect():
+        yield path
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Runs the test in an empty directory; validators and parsers write scratch files to the working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,188 @@
+"""
+Synthetic Apex and LWC notebooks for benchmarks.
+
+The notebooks follow the formats the validators and parsers expect, and
+their sizes (issues per Apex notebook, turns per LWC conversation, code
+lines per block) are drawn from log-normal distributions with the medians
+and long tails of the delivered batches. Generation is deterministic for a
+given seed.
+"""
+import json
+import math
+import random
+from typing import Optional
+
+# name: (median, sigma, minimum, maximum)
+APEX_SIZES = {
+    "issues": (3, 0.6, 1, 25),
+    "class_lines": (80, 0.8, 10, 1500),
+    "snippet_lines": (12, 0.6, 3, 120),
+}
+LWC_SIZES = {
+    "turns": (1.5, 0.5, 1, 6),
+    "components": (2, 0.4, 1, 6),
+    "file_lines": (40, 0.7, 5, 600),
+}
+
+APEX_STATEMENTS = [
+    "List<Account> accounts = [SELECT Id, Name FROM Account WHERE OwnerId = :userId LIMIT 200];",
+    "Map<Id, Contact> contactsById = new Map<Id, Contact>(contacts);",
+    "if (opportunity.StageName == 'Closed Won') { wonCount++; }",
+    "for (Case record : cases) { record.Status = 'Escalated'; }",
+    "System.debug('Processing ' + records.size() + ' records');",
+    "Database.SaveResult[] results = Database.update(records, false);",
+    "String key = String.valueOf(record.Id).left(15);",
+    "insert new Task(Subject = 'Follow up', WhatId = record.Id);",
+]
+PMD_RULES = ["ApexCRUDViolation", "AvoidDebugStatements", "ApexDoc", "OperationWithLimitsInLoop", "ApexSOQLInjection", "UnusedLocalVariable"]
+JS_STATEMENTS = [
+    "const rows = this.records.map((record) => ({ ...record, url: `/${record.Id}` }));",
+    "this.dispatchEvent(new CustomEvent('select', { detail: this.selectedId }));",
+    "if (!this.recordId) { return; }",
+    "this.isLoading = false;",
+    "this.error = reduceErrors(error).join(', ');",
+]
+HTML_LINES = [
+    '<lightning-card title="Records" icon-name="standard:account">',
+    '<template if:true={records}>',
+    '<lightning-datatable key-field="Id" data={records} columns={columns}></lightning-datatable>',
+    '</template>',
+    '</lightning-card>',
+]
+WORDS = ("account contact opportunity record component data table filter search update "
+         "validation layout event handler user field list view page error state").split()
+
+
+def draw(rng: random.Random, median: float, sigma: float, minimum: int, maximum: int) -> int:
+    """An integer from a log-normal distribution with the given median, clipped to [minimum, maximum]."""
+    return max(minimum, min(maximum, int(round(rng.lognormvariate(math.log(median), sigma)))))
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _markdown_cell(text: str) -> dict:
+    lines = text.split("\n")
+    return {
+        "cell_type": "markdown",
+        "metadata": {},
+        "source": [line + "\n" for line in lines[:-1]] + [lines[-1]],
+    }
+
+
+def _notebook(cells: list) -> str:
+    return json.dumps({
+        "nbformat": 4,
+        "nbformat_minor": 0,
+        "metadata": {"colab": {"provenance": []}, "kernelspec": {"name": "python3", "display_name": "Python 3"}},
+        "cells": cells,
+    }, indent=1)
+
+
+def _apex_lines(rng: random.Random, count: int, indent: str = "        ") -> str:
+    return "\n".join(indent + rng.choice(APEX_STATEMENTS) for _ in range(count))
+
+
+def apex_notebook(rng: random.Random, index: int, sizes: Optional[dict] = None) -> str:
+    """
+    An Apex code analysis notebook: the class, its PMD issues and one
+    User/Assistant fix per issue. `sizes` overrides entries of APEX_SIZES.
+    """
+    sizes = {**APEX_SIZES, **(sizes or {})}
+    class_name = f"Synthetic{index}Service"
+    issues = draw(rng, *sizes["issues"])
+    pmd_issues = [
+        {"line": rng.randint(1, 500), "rule": rng.choice(PMD_RULES), "message": _sentence(rng, 8)}
+        for _ in range(issues)
+    ]
+    cells = [
+        _markdown_cell(f"**Apex Code Analysis**\n\n**File Name** - {class_name}\n\n**Number of Issues** - {issues}"),
+        _markdown_cell(
+            f"**Apex Code**\n\n`{class_name}.cls`\n\n```apex\npublic with sharing class {class_name} {{\n"
+            f"    public void run(Id userId) {{\n{_apex_lines(rng, draw(rng, *sizes['class_lines']))}\n    }}\n}}\n```\n\n"
+            f"**Issues Raised by PMD Code Analyzer**\n\n```json\n{json.dumps(pmd_issues, indent=2)}\n```"
+        ),
+    ]
+    for number, pmd_issue in enumerate(pmd_issues, start=1):
+        snippet = _apex_lines(rng, draw(rng, *sizes["snippet_lines"]), "    ")
+        fixed = _apex_lines(rng, draw(rng, *sizes["snippet_lines"]), "    ")
+        cells.append(_markdown_cell(
+            f"**Issue** - {number}\n\n**User**\n\n**Error**\n```json\n{json.dumps([pmd_issue], indent=2)}\n```\n"
+            f"**Code**\n```apex\n{snippet}\n```\n**Assistant**\n{_sentence(rng)}\n```apex\n{fixed}\n```"
+        ))
+    return _notebook(cells)
+
+
+def _name_what_why(rng: random.Random, fields=("What", "Why")) -> str:
+    name = "".join(word.capitalize() for word in rng.sample(WORDS, 2))
+    return "\n".join([f"- **Name**: {name}"] + [f"  - **{field}**: {_sentence(rng, 8)}" for field in fields])
+
+
+def _lwc_files(rng: random.Random, component: str, file_lines: tuple, suffix: str = "") -> str:
+    js = "\n".join("    " + rng.choice(JS_STATEMENTS) for _ in range(draw(rng, *file_lines)))
+    html = "\n".join("    " + rng.choice(HTML_LINES) for _ in range(draw(rng, *file_lines) // 3 + 1))
+    return (
+        f"`{component}.js{suffix}`\n```javascript\nimport {{ LightningElement, api }} from 'lwc';\n"
+        f"export default class {component[0].upper() + component[1:]} extends LightningElement {{\n{js}\n}}\n```\n"
+        f"`{component}.html{suffix}`\n```html\n<template>\n{html}\n</template>\n```"
+    )
+
+
+def lwc_notebook(rng: random.Random, index: int, sizes: Optional[dict] = None) -> str:
+    """
+    An LWC conversation notebook: metadata, then User turns answered by Blueprint,
+    Implementation plan, Scaffolding code and Code. `sizes` overrides entries of LWC_SIZES.
+    """
+    sizes = {**LWC_SIZES, **(sizes or {})}
+    cells = [
+        _markdown_cell(
+            f"# Metadata\n**Category** - Lightning Web Components\n**Subcategory** - {rng.choice(WORDS).capitalize()}\n"
+            f"**Tags Category**\n- lwc\n- {rng.choice(WORDS)}\n**Complexity Category**\n- {rng.choice(['Low', 'Medium', 'High'])}\n"
+            f"**Message** - {_sentence(rng, 6)}\n**Problem Statement**\n{_sentence(rng, 40)}\n**manualSetupRequired** - False"
+        ),
+        _markdown_cell("# Conversation"),
+    ]
+    for turn in range(draw(rng, *sizes["turns"])):
+        components = [f"synthetic{index}Part{turn}{n}" for n in range(draw(rng, *sizes["components"]))]
+        blueprint = "\n".join(f"**{rng.choice(WORDS).capitalize()} Layer**\n{_name_what_why(rng)}" for _ in components)
+        plan = "\n".join(f"**{component}**\n{_name_what_why(rng, ('What', 'Why', 'Step'))}" for component in components)
+        cells += [
+            _markdown_cell(f"**User**\n\n{_sentence(rng, 30)}"),
+            _markdown_cell(f"**Assistant**\n\n**Blueprint**\n\n{blueprint}"),
+            _markdown_cell(f"**Assistant**\n\n**Implementation plan**\n\n{plan}"),
+            _markdown_cell("**Assistant**\n\n**Scaffolding code**\n\n" + "\n".join(_lwc_files(rng, c, sizes["file_lines"], ".scaf") for c in components)),
+            _markdown_cell("**Assistant**\n\n**Code**\n\n" + "\n".join(_lwc_files(rng, c, sizes["file_lines"]) for c in components)),
+        ]
+    return _notebook(cells)
+
+
+GENERATORS = {"apex": apex_notebook, "lwc": lwc_notebook}
+
+
+def generate_notebooks(kind: str, count: int, seed: int = 0) -> list[str]:
+    """`count` notebooks of a project ('apex' or 'lwc') as .ipynb JSON strings."""
+    rng = random.Random(f"{kind}-{seed}")
+    return [GENERATORS[kind](rng, index) for index in range(count)]
+
+
+def input_batch(notebooks: list[str], file_ids: Optional[list[str]] = None, batch: str = "benchmark") -> dict:
+    """The serialized InputBatch a connector produces for the notebooks."""
+    file_ids = file_ids or [f"synthetic{index:05d}" for index in range(len(notebooks))]
+    return {
+        "items": [
+            {
+                "content": content,
+                "metadata": {"status": "OK", "data": {
+                    "original_uri": f"https://colab.research.google.com/drive/{file_id}",
+                    "file_id": file_id,
+                    "requested_revision_id": None,
+                    "revision_id": "rev1",
+                    "colab_task_link": f"https://colab.research.google.com/drive/{file_id}",
+                    "__src_sheet_name": batch,
+                }},
+            }
+            for file_id, content in zip(file_ids, notebooks)
+        ],
+        "metadata": {"batch": batch},
+    }
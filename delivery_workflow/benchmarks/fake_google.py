@@ -0,0 +1,809 @@
+"""
+A local fake of the Google Drive v3 and Sheets v4 REST APIs, for benchmarks.
+
+FakeGoogleServer serves an in-memory Drive (files, folders, revisions,
+uploads, batch requests) and in-memory spreadsheets over HTTP, so the real
+client code paths (googleapiclient, gspread, google-auth token refresh) run
+unchanged against it. Latency and Drive-style rate limiting can be injected:
+
+    with FakeGoogleServer(latency=0.05, requests_per_second=50) as server:
+        folder_id = server.drive.add_folder("deliveries")
+        creds_path = server.write_service_account_file(tmp_dir)
+        with server.redirect():
+            ...  # code that talks to *.googleapis.com now talks to the server
+"""
+import json
+import os
+import re
+import time
+import uuid
+import random
+import hashlib
+import threading
+import itertools
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit, urlunsplit
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+DEFAULT_FILE_FIELDS = ("kind", "id", "name", "mimeType")
+HTTP_REASONS = {200: "OK", 204: "No Content", 308: "Resume Incomplete", 400: "Bad Request",
+                404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+ERROR_STATUS = {400: ("badRequest", "INVALID_ARGUMENT"), 404: ("notFound", "NOT_FOUND"),
+                429: ("rateLimitExceeded", "RESOURCE_EXHAUSTED")}
+
+
+class ApiError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def body(self) -> dict:
+        reason, status = ERROR_STATUS.get(self.code, ("backendError", "INTERNAL"))
+        return {"error": {
+            "code": self.code,
+            "message": self.message,
+            "errors": [{"domain": "usageLimits" if self.code == 429 else "global", "reason": reason, "message": self.message}],
+            "status": status,
+        }}
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """'nextPageToken, files(id, name)' -> {'nextPageToken': None, 'files': {'id': None, 'name': None}}; None selects everything."""
+    if not fields or fields.strip() == "*":
+        return None
+    spec, stack, name = {}, [], ""
+    current = spec
+    for char in fields + ",":
+        if char == "(":
+            current[name.strip()] = {}
+            stack.append(current)
+            current = current[name.strip()]
+            name = ""
+        elif char in ",)":
+            if name.strip():
+                current[name.strip()] = None
+            name = ""
+            if char == ")":
+                current = stack.pop()
+        else:
+            name += char
+    return spec
+
+
+def project(value, spec: Optional[dict]):
+    if spec is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+
+
+class FakeDrive:
+    """In-memory Drive: files with content and revisions, folders via `parents`."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+        self.contents = {}
+        # file id -> list of (revision metadata, content)
+        self.revisions = {}
+        self.ids = itertools.count(1)
+        self.clock = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self.ids):06d}{uuid.uuid4().hex[:12]}"
+
+    def _tick(self) -> str:
+        self.clock += timedelta(seconds=1)
+        return _timestamp(self.clock)
+
+    def add_folder(self, name: str, parent: Optional[str] = None) -> str:
+        return self.add_file(name, None, parent, FOLDER_MIME_TYPE)
+
+    def add_file(self, name: str, content, parent: Optional[str] = None,
+                 mime_type: str = "application/json", file_id: Optional[str] = None) -> str:
+        """Adds a file (its content is its first revision) and returns its ID."""
+        with self.lock:
+            file_id = file_id or self._next_id("fake")
+            self.files[file_id] = {
+                "kind": "drive#file", "id": file_id, "name": name, "mimeType": mime_type,
+                "parents": [parent] if parent else [], "trashed": False,
+            }
+            self.revisions[file_id] = []
+            if mime_type != FOLDER_MIME_TYPE:
+                self._set_content(file_id, content or b"")
+            else:
+                self.files[file_id]["modifiedTime"] = self._tick()
+            return file_id
+
+    def add_revision(self, file_id: str, content) -> str:
+        with self.lock:
+            return self._set_content(file_id, content)
+
+    def _set_content(self, file_id: str, content) -> str:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        modified = self._tick()
+        revision_id = f"rev{len(self.revisions[file_id]) + 1}"
+        self.revisions[file_id].append((
+            {"kind": "drive#revision", "id": revision_id, "modifiedTime": modified, "size": str(len(content))},
+            content,
+        ))
+        self.contents[file_id] = content
+        self.files[file_id].update({
+            "modifiedTime": modified,
+            "md5Checksum": hashlib.md5(content).hexdigest(),
+            "size": str(len(content)),
+            "headRevisionId": revision_id,
+        })
+        return revision_id
+
+    def get(self, file_id: str) -> dict:
+        file = self.files.get(file_id)
+        if file is None:
+            raise ApiError(404, f"File not found: {file_id}.")
+        return file
+
+    def content(self, file_id: str, revision_id: Optional[str] = None) -> bytes:
+        self.get(file_id)
+        if revision_id is None:
+            return self.contents.get(file_id, b"")
+        for revision, content in self.revisions[file_id]:
+            if revision["id"] == revision_id:
+                return content
+        raise ApiError(404, f"Revision not found: {revision_id}.")
+
+    def list_revisions(self, file_id: str) -> list:
+        self.get(file_id)
+        return [revision for revision, _ in self.revisions[file_id]]
+
+    def create(self, metadata: dict, content=None) -> dict:
+        file_id = self.add_file(
+            metadata.get("name", "Untitled"), content, (metadata.get("parents") or [None])[0],
+            metadata.get("mimeType", "application/octet-stream"),
+        )
+        return self.get(file_id)
+
+    def update(self, file_id: str, metadata: dict, content=None, add_parents=None, remove_parents=None) -> dict:
+        with self.lock:
+            file = self.get(file_id)
+            for key in ("name", "mimeType", "trashed", "description"):
+                if key in metadata:
+                    file[key] = metadata[key]
+            parents = [parent for parent in file["parents"] if parent not in (remove_parents or "").split(",")]
+            file["parents"] = parents + [parent for parent in (add_parents or "").split(",") if parent and parent not in parents]
+            if content is not None:
+                self._set_content(file_id, content)
+            return file
+
+    def copy(self, file_id: str, metadata: dict) -> dict:
+        source = self.get(file_id)
+        parent = (metadata.get("parents") or source["parents"] or [None])[0]
+        new_id = self.add_file(metadata.get("name", f"Copy of {source['name']}"), self.content(file_id), parent, source["mimeType"])
+        return self.get(new_id)
+
+    def delete(self, file_id: str):
+        with self.lock:
+            self.get(file_id)
+            # Deleting a folder deletes its tree
+            doomed = [file_id]
+            while doomed:
+                current = doomed.pop()
+                doomed.extend(child for child, file in self.files.items() if current in file["parents"])
+                self.files.pop(current, None)
+                self.contents.pop(current, None)
+                self.revisions.pop(current, None)
+
+    def query(self, q: Optional[str]) -> list:
+        """Files matching a Drive search query; supports the `and` of name/mimeType/parents/trashed clauses."""
+        predicates = []
+        clauses = re.split(r"\s+and\s+(?=(?:[^']*'[^']*')*[^']*$)", q.strip()) if q and q.strip() else []
+        for clause in clauses:
+            clause = clause.strip()
+            if match := re.fullmatch(r"'((?:[^'\\]|\\.)*)'\s+in\s+parents", clause):
+                parent = match.group(1)
+                predicates.append(lambda f, parent=parent: parent in f["parents"])
+            elif match := re.fullmatch(r"(name|mimeType)\s*(=|!=)\s*'((?:[^'\\]|\\.)*)'", clause):
+                key, op, value = match.group(1), match.group(2), match.group(3).replace("\\'", "'")
+                predicates.append(lambda f, key=key, op=op, value=value: (f[key] == value) == (op == "="))
+            elif match := re.fullmatch(r"name\s+contains\s+'((?:[^'\\]|\\.)*)'", clause):
+                value = match.group(1).replace("\\'", "'")
+                predicates.append(lambda f, value=value: value in f["name"])
+            elif match := re.fullmatch(r"trashed\s*=\s*(true|false)", clause):
+                trashed = match.group(1) == "true"
+                predicates.append(lambda f, trashed=trashed: f["trashed"] == trashed)
+            else:
+                raise ApiError(400, f"Invalid Value: unsupported query clause {clause!r}")
+        with self.lock:
+            return [file for file in self.files.values() if all(predicate(file) for predicate in predicates)]
+
+
+A1_CELLS = re.compile(r"[A-Z]*\d*(?::[A-Z]*\d*)?")
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _column_letters(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _cell_value(value) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return "" if value is None else str(value)
+
+
+class FakeSheets:
+    """In-memory spreadsheets; every sheet is a list of rows of string cells."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spreadsheets = {}
+        self.sheet_ids = itertools.count(1)
+
+    def add_spreadsheet(self, title: str = "Untitled spreadsheet", sheets: Optional[dict] = None,
+                        spreadsheet_id: Optional[str] = None) -> str:
+        """Adds a spreadsheet with `sheets` ({sheet name: rows}) and returns its ID."""
+        spreadsheet_id = spreadsheet_id or uuid.uuid4().hex
+        with self.lock:
+            self.spreadsheets[spreadsheet_id] = {"title": title, "sheets": {}}
+        for name, rows in (sheets or {"Sheet1": []}).items():
+            self.add_sheet(spreadsheet_id, name, rows)
+        return spreadsheet_id
+
+    def add_sheet(self, spreadsheet_id: str, name: str, rows=None) -> int:
+        with self.lock:
+            sheets = self._spreadsheet(spreadsheet_id)["sheets"]
+            if name in sheets:
+                raise ApiError(400, f'A sheet with the name "{name}" already exists.')
+            sheet_id = next(self.sheet_ids)
+            sheets[name] = {"sheetId": sheet_id, "rows": [[_cell_value(v) for v in row] for row in rows or []]}
+            return sheet_id
+
+    def rows(self, spreadsheet_id: str, sheet_name: str) -> list:
+        return self._sheet(spreadsheet_id, sheet_name)["rows"]
+
+    def _spreadsheet(self, spreadsheet_id: str) -> dict:
+        spreadsheet = self.spreadsheets.get(spreadsheet_id)
+        if spreadsheet is None:
+            raise ApiError(404, "Requested entity was not found.")
+        return spreadsheet
+
+    def _sheet(self, spreadsheet_id: str, name: str) -> dict:
+        sheet = self._spreadsheet(spreadsheet_id)["sheets"].get(name)
+        if sheet is None:
+            raise ApiError(400, f"Unable to parse range: {name}")
+        return sheet
+
+    def _parse_range(self, spreadsheet_id: str, a1: str):
+        """(sheet name, first row, first column, end row, end column); ends are exclusive, None if open."""
+        sheet, _, cells = a1.rpartition("!")
+        if not sheet:
+            # A bare name is a sheet name; a bare cell range is on the first sheet
+            names = list(self._spreadsheet(spreadsheet_id)["sheets"])
+            if a1 in names or not A1_CELLS.fullmatch(a1):
+                sheet, cells = a1, ""
+            else:
+                sheet = names[0]
+        if not A1_CELLS.fullmatch(cells):
+            raise ApiError(400, f"Unable to parse range: {a1}")
+        sheet = sheet[1:-1].replace("''", "'") if sheet.startswith("'") else sheet
+        start, _, end = cells.partition(":")
+        start_col, start_row = re.fullmatch(r"([A-Z]*)(\d*)", start).groups()
+        end_col, end_row = re.fullmatch(r"([A-Z]*)(\d*)", end).groups() if end else (start_col, start_row)
+        return (
+            sheet,
+            int(start_row) - 1 if start_row else 0,
+            _column_index(start_col) if start_col else 0,
+            int(end_row) if end_row else None,
+            _column_index(end_col) + 1 if end_col else None,
+        )
+
+    def get_values(self, spreadsheet_id: str, a1: str) -> dict:
+        with self.lock:
+            name, row0, col0, row1, col1 = self._parse_range(spreadsheet_id, a1)
+            rows = self._sheet(spreadsheet_id, name)["rows"][row0:row1]
+            values = [row[col0:col1] for row in rows]
+        for row in values:
+            while row and row[-1] == "":
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        result = {"range": a1, "majorDimension": "ROWS"}
+        if values:
+            result["values"] = values
+        return result
+
+    def _write(self, sheet: dict, row0: int, col0: int, values: list):
+        rows = sheet["rows"]
+        for offset, row_values in enumerate(values):
+            while len(rows) <= row0 + offset:
+                rows.append([])
+            row = rows[row0 + offset]
+            while len(row) < col0 + len(row_values):
+                row.append("")
+            for column, value in enumerate(row_values):
+                row[col0 + column] = _cell_value(value)
+
+    def update_values(self, spreadsheet_id: str, a1: str, values: list) -> dict:
+        with self.lock:
+            name, row0, col0, _, _ = self._parse_range(spreadsheet_id, a1)
+            self._write(self._sheet(spreadsheet_id, name), row0, col0, values)
+        width = max((len(row) for row in values), default=0)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "updatedRange": f"{name}!{_column_letters(col0)}{row0 + 1}:{_column_letters(col0 + max(width, 1) - 1)}{row0 + max(len(values), 1)}",
+            "updatedRows": len(values),
+            "updatedColumns": width,
+            "updatedCells": sum(len(row) for row in values),
+        }
+
+    def append_values(self, spreadsheet_id: str, a1: str, values: list) -> dict:
+        with self.lock:
+            name, _, col0, _, _ = self._parse_range(spreadsheet_id, a1)
+            sheet = self._sheet(spreadsheet_id, name)
+            last = len(sheet["rows"])
+            while last and not any(sheet["rows"][last - 1]):
+                last -= 1
+            self._write(sheet, last, col0, values)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "tableRange": f"{name}!A1:{_column_letters(max(col0, 0))}{max(last, 1)}",
+            "updates": {
+                "spreadsheetId": spreadsheet_id,
+                "updatedRange": f"{name}!{_column_letters(col0)}{last + 1}",
+                "updatedRows": len(values),
+                "updatedCells": sum(len(row) for row in values),
+            },
+        }
+
+    def clear_values(self, spreadsheet_id: str, a1: str) -> dict:
+        with self.lock:
+            name, row0, col0, row1, col1 = self._parse_range(spreadsheet_id, a1)
+            for row in self._sheet(spreadsheet_id, name)["rows"][row0:row1]:
+                for column in range(col0, len(row) if col1 is None else min(col1, len(row))):
+                    row[column] = ""
+        return {"spreadsheetId": spreadsheet_id, "clearedRange": a1}
+
+    def metadata(self, spreadsheet_id: str) -> dict:
+        with self.lock:
+            spreadsheet = self._spreadsheet(spreadsheet_id)
+            sheets = [
+                {"properties": {
+                    "sheetId": sheet["sheetId"], "title": name, "index": index, "sheetType": "GRID",
+                    "gridProperties": {
+                        "rowCount": max(len(sheet["rows"]), 1000),
+                        "columnCount": max([len(row) for row in sheet["rows"]] + [26]),
+                    },
+                }}
+                for index, (name, sheet) in enumerate(spreadsheet["sheets"].items())
+            ]
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "properties": {"title": spreadsheet["title"], "locale": "en_US", "timeZone": "Etc/GMT"},
+            "sheets": sheets,
+            "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit",
+        }
+
+    def batch_update(self, spreadsheet_id: str, requests: list) -> dict:
+        """Applies addSheet/deleteSheet/updateSheetProperties; formatting requests are accepted and ignored."""
+        replies = []
+        for request in requests:
+            if "addSheet" in request:
+                title = request["addSheet"].get("properties", {}).get("title") or f"Sheet{next(self.sheet_ids)}"
+                sheet_id = self.add_sheet(spreadsheet_id, title)
+                replies.append({"addSheet": {"properties": {"sheetId": sheet_id, "title": title}}})
+                continue
+            with self.lock:
+                sheets = self._spreadsheet(spreadsheet_id)["sheets"]
+                if "deleteSheet" in request:
+                    sheet_id = request["deleteSheet"]["sheetId"]
+                    for name, sheet in list(sheets.items()):
+                        if sheet["sheetId"] == sheet_id:
+                            del sheets[name]
+                elif "updateSheetProperties" in request:
+                    properties = request["updateSheetProperties"]["properties"]
+                    for name, sheet in list(sheets.items()):
+                        if sheet["sheetId"] == properties.get("sheetId") and properties.get("title"):
+                            sheets[properties["title"]] = sheets.pop(name)
+            replies.append({})
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+
+class TokenBucket:
+    """Per-call quota of the fake server: calls beyond it get a 429 response."""
+
+    def __init__(self, requests_per_second: float, burst: Optional[int] = None):
+        self.rate = requests_per_second
+        self.capacity = burst or max(1, int(requests_per_second))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Response:
+    def __init__(self, status: int = 200, body=b"", headers: Optional[dict] = None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+            headers = {"Content-Type": "application/json; charset=UTF-8", **(headers or {})}
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class FakeGoogleServer:
+    """
+    Serves FakeDrive and FakeSheets over HTTP on localhost, plus an OAuth2
+    token endpoint for service account credentials.
+
+    Args:
+        latency: Seconds added to every HTTP request.
+        latency_jitter: Up to this many extra seconds, drawn uniformly per request.
+        requests_per_second: Sustained API calls allowed before calls are rejected
+            with 429 rateLimitExceeded; calls inside a batch request count one each.
+            None disables rate limiting.
+        burst: Calls allowed at once; defaults to one second worth of calls.
+    """
+
+    def __init__(self, latency: float = 0.0, latency_jitter: float = 0.0,
+                 requests_per_second: Optional[float] = None, burst: Optional[int] = None, seed: int = 0):
+        self.drive = FakeDrive()
+        self.sheets = FakeSheets()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_limit = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+        self.uploads = {}
+        self.httpd = None
+        self.thread = None
+
+    # Lifecycle
+
+    def start(self) -> "FakeGoogleServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                response = server.handle_http(self.command, self.path, dict(self.headers.items()), body)
+                self.send_response(response.status, HTTP_REASONS.get(response.status))
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> "FakeGoogleServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    # Client setup
+
+    def service_account_info(self) -> dict:
+        """A service account key whose token_uri is this server; it signs real JWTs with a throwaway RSA key."""
+        return {
+            "type": "service_account",
+            "project_id": "fake-project",
+            "private_key_id": "fake-key",
+            "private_key": _private_key_pem(),
+            "client_email": "benchmark@fake-project.iam.gserviceaccount.com",
+            "client_id": "1",
+            "token_uri": f"{self.url}/token",
+        }
+
+    def write_service_account_file(self, directory: str) -> str:
+        path = os.path.join(directory, "fake_service_account.json")
+        with open(path, "w") as f:
+            json.dump(self.service_account_info(), f)
+        return path
+
+    def rewrite(self, uri: str) -> str:
+        parts = urlsplit(uri)
+        if not parts.netloc.endswith("googleapis.com"):
+            return uri
+        base = urlsplit(self.url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+    @contextmanager
+    def redirect(self):
+        """Sends the requests of httplib2 and requests sessions for *.googleapis.com to this server."""
+        import httplib2
+        import requests
+
+        http_request = httplib2.Http.request
+        session_request = requests.Session.request
+
+        def redirected_http_request(http, uri, *args, **kwargs):
+            return http_request(http, self.rewrite(uri), *args, **kwargs)
+
+        def redirected_session_request(session, method, url, *args, **kwargs):
+            return session_request(session, method, self.rewrite(url), *args, **kwargs)
+
+        httplib2.Http.request = redirected_http_request
+        requests.Session.request = redirected_session_request
+        try:
+            yield self
+        finally:
+            httplib2.Http.request = http_request
+            requests.Session.request = session_request
+
+    # Request handling
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def handle_http(self, method: str, path: str, headers: dict, body: bytes) -> Response:
+        delay = self.latency + (self.random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay:
+            time.sleep(delay)
+        self.count("http_requests")
+        if path.startswith("/batch"):
+            return self.handle_batch(headers, body)
+        return self.handle_call(method, path, headers, body)
+
+    def handle_call(self, method: str, path: str, headers: dict, body: bytes) -> Response:
+        self.count("calls")
+        if self.rate_limit is not None and not path.startswith("/token") and not self.rate_limit.take():
+            self.count("throttled")
+            return Response(429, ApiError(429, "Rate Limit Exceeded").body())
+        try:
+            return self.route(method, path, {key.lower(): value for key, value in headers.items()}, body)
+        except ApiError as e:
+            self.count(f"errors_{e.code}")
+            return Response(e.code, e.body())
+
+    def route(self, method: str, path: str, headers: dict, body: bytes) -> Response:
+        parts = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+
+        if segments == ["token"]:
+            return Response(200, {"access_token": f"fake-token-{uuid.uuid4().hex}", "expires_in": 3600, "token_type": "Bearer"})
+        if segments[:3] == ["upload", "drive", "v3"]:
+            return self.drive_upload(method, segments[3:], query, headers, body)
+        if segments[:2] == ["drive", "v3"]:
+            return self.drive_call(method, segments[2:], query, body)
+        if segments[:1] == ["v4"]:
+            return self.sheets_call(method, segments[1:], parts.query, query, body)
+        raise ApiError(404, f"Unknown API path {parts.path}")
+
+    def drive_call(self, method: str, segments: list, query: dict, body: bytes) -> Response:
+        fields = parse_fields(query.get("fields"))
+        metadata = json.loads(body) if body else {}
+        if segments == ["files"]:
+            if method == "GET":
+                files = self.drive.query(query.get("q"))
+                offset = int(query.get("pageToken") or 0)
+                size = min(int(query.get("pageSize") or 100), 1000)
+                page = files[offset:offset + size]
+                result = {"kind": "drive#fileList", "files": [dict(file) for file in page]}
+                if offset + size < len(files):
+                    result["nextPageToken"] = str(offset + size)
+                if fields is None:
+                    result["files"] = project(result["files"], dict.fromkeys(DEFAULT_FILE_FIELDS))
+                return Response(200, project(result, fields))
+            if method == "POST":
+                return self.file_response(self.drive.create(metadata), fields)
+        elif len(segments) == 2 and segments[0] == "files":
+            file_id = segments[1]
+            if method == "GET":
+                if query.get("alt") == "media":
+                    return self.media_response(self.drive.content(file_id))
+                return self.file_response(self.drive.get(file_id), fields)
+            if method == "PATCH":
+                file = self.drive.update(file_id, metadata, add_parents=query.get("addParents"), remove_parents=query.get("removeParents"))
+                return self.file_response(file, fields)
+            if method == "DELETE":
+                self.drive.delete(file_id)
+                return Response(204)
+        elif len(segments) == 3 and segments[0] == "files" and segments[2] == "copy" and method == "POST":
+            return self.file_response(self.drive.copy(segments[1], metadata), fields)
+        elif len(segments) == 3 and segments[0] == "files" and segments[2] == "revisions" and method == "GET":
+            result = {"kind": "drive#revisionList", "revisions": self.drive.list_revisions(segments[1])}
+            return Response(200, project(result, fields))
+        elif len(segments) == 4 and segments[0] == "files" and segments[2] == "revisions" and method == "GET":
+            if query.get("alt") == "media":
+                return self.media_response(self.drive.content(segments[1], segments[3]))
+            for revision in self.drive.list_revisions(segments[1]):
+                if revision["id"] == segments[3]:
+                    return Response(200, project(revision, fields))
+            raise ApiError(404, f"Revision not found: {segments[3]}.")
+        raise ApiError(404, f"Unknown Drive method {method} /{'/'.join(segments)}")
+
+    def file_response(self, file: dict, fields: Optional[dict]) -> Response:
+        file = dict(file)
+        return Response(200, project(file, fields) if fields else {key: file[key] for key in DEFAULT_FILE_FIELDS})
+
+    def media_response(self, content: bytes) -> Response:
+        return Response(200, content, {"Content-Type": "application/octet-stream"})
+
+    def drive_upload(self, method: str, segments: list, query: dict, headers: dict, body: bytes) -> Response:
+        file_id = segments[1] if len(segments) == 2 else None
+        fields = parse_fields(query.get("fields"))
+
+        if "upload_id" in query:
+            return self.resumable_chunk(query["upload_id"], headers, body, fields)
+
+        upload_type = query.get("uploadType", "media")
+        if upload_type == "resumable":
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {"file_id": file_id, "metadata": json.loads(body) if body else {}, "content": bytearray()}
+            location = f"{self.url}/upload/drive/v3/files{'/' + file_id if file_id else ''}?uploadType=resumable&upload_id={upload_id}"
+            if query.get("fields"):
+                location += f"&fields={quote(query['fields'])}"
+            return Response(200, b"", {"Location": location})
+        if upload_type == "multipart":
+            metadata, content = _parse_multipart_related(headers.get("content-type", ""), body)
+        else:
+            metadata, content = {}, body
+        return self.finish_upload(file_id, metadata, content, fields)
+
+    def resumable_chunk(self, upload_id: str, headers: dict, body: bytes, fields: Optional[dict]) -> Response:
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            raise ApiError(404, "Upload session not found.")
+        upload["content"].extend(body)
+        total = (headers.get("content-range") or "").rpartition("/")[2]
+        if total not in ("", "*") and len(upload["content"]) < int(total):
+            return Response(308, b"", {"Range": f"bytes=0-{len(upload['content']) - 1}"})
+        del self.uploads[upload_id]
+        return self.finish_upload(upload["file_id"], upload["metadata"], bytes(upload["content"]), fields)
+
+    def finish_upload(self, file_id: Optional[str], metadata: dict, content: bytes, fields: Optional[dict]) -> Response:
+        if file_id is None:
+            file = self.drive.create(metadata, content)
+        else:
+            file = self.drive.update(file_id, metadata, content)
+        return self.file_response(file, fields)
+
+    def sheets_call(self, method: str, segments: list, raw_query: str, query: dict, body: bytes) -> Response:
+        payload = json.loads(body) if body else {}
+        if segments == ["spreadsheets"] and method == "POST":
+            title = payload.get("properties", {}).get("title", "Untitled spreadsheet")
+            names = [sheet["properties"]["title"] for sheet in payload.get("sheets", [])] or ["Sheet1"]
+            return Response(200, self.sheets.metadata(self.sheets.add_spreadsheet(title, dict.fromkeys(names))))
+        if len(segments) < 2 or segments[0] != "spreadsheets":
+            raise ApiError(404, f"Unknown Sheets method {method} /{'/'.join(segments)}")
+
+        spreadsheet_id, _, action = segments[1].partition(":")
+        rest = segments[2:]
+        if not rest:
+            if action == "batchUpdate":
+                return Response(200, self.sheets.batch_update(spreadsheet_id, payload.get("requests", [])))
+            if method == "GET":
+                return Response(200, self.sheets.metadata(spreadsheet_id))
+        elif rest == ["values:batchGet"]:
+            ranges = parse_qs(raw_query).get("ranges", [])
+            value_ranges = [self.sheets.get_values(spreadsheet_id, a1) for a1 in ranges]
+            return Response(200, {"spreadsheetId": spreadsheet_id, "valueRanges": value_ranges})
+        elif rest == ["values:batchUpdate"]:
+            responses = [self.sheets.update_values(spreadsheet_id, data["range"], data.get("values", [])) for data in payload.get("data", [])]
+            return Response(200, {"spreadsheetId": spreadsheet_id, "totalUpdatedRows": sum(r["updatedRows"] for r in responses), "responses": responses})
+        elif rest == ["values:batchClear"]:
+            cleared = [self.sheets.clear_values(spreadsheet_id, a1)["clearedRange"] for a1 in payload.get("ranges", [])]
+            return Response(200, {"spreadsheetId": spreadsheet_id, "clearedRanges": cleared})
+        elif len(rest) == 2 and rest[0] == "values":
+            # The action follows the last colon; a range like A:C has its own
+            a1, _, value_action = rest[1].rpartition(":")
+            if value_action not in ("append", "clear"):
+                a1, value_action = rest[1], ""
+            if value_action == "append":
+                return Response(200, self.sheets.append_values(spreadsheet_id, a1, payload.get("values", [])))
+            if value_action == "clear":
+                return Response(200, self.sheets.clear_values(spreadsheet_id, a1))
+            if method == "GET":
+                return Response(200, self.sheets.get_values(spreadsheet_id, a1))
+            if method == "PUT":
+                return Response(200, self.sheets.update_values(spreadsheet_id, a1, payload.get("values", [])))
+        raise ApiError(404, f"Unknown Sheets method {method} /{'/'.join(segments)}")
+
+    def handle_batch(self, headers: dict, body: bytes) -> Response:
+        """Answers a multipart/mixed batch request; every part is handled (and rate limited) as one call."""
+        content_type = {key.lower(): value for key, value in headers.items()}.get("content-type", "")
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        chunks = []
+        for part in message.get_payload():
+            content_id = part.get("Content-ID", "")
+            method, path, sub_headers, sub_body = _parse_http_request(part.get_payload(decode=True))
+            response = self.handle_call(method, path, sub_headers, sub_body)
+            head = [f"HTTP/1.1 {response.status} {HTTP_REASONS.get(response.status, '')}"]
+            head += [f"{name}: {value}" for name, value in response.headers.items()]
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n".encode()
+                + "\r\n".join(head).encode() + b"\r\n\r\n" + response.body + b"\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n".encode())
+        return Response(200, b"".join(chunks), {"Content-Type": f"multipart/mixed; boundary={boundary}"})
+
+
+def _parse_http_request(raw: bytes):
+    head, _, body = raw.replace(b"\r\n", b"\n").partition(b"\n\n")
+    lines = head.decode("utf-8").split("\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+    return method, path, headers, body.rstrip(b"\n")
+
+
+def _parse_multipart_related(content_type: str, body: bytes):
+    message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    parts = message.get_payload()
+    metadata = json.loads(parts[0].get_payload(decode=True) or b"{}")
+    content = parts[1].get_payload(decode=True) if len(parts) > 1 else b""
+    return metadata, content
+
+
+_key_lock = threading.Lock()
+_key_pem = None
+
+
+def _private_key_pem() -> str:
+    """A throwaway RSA key, generated once per process with the pure Python rsa package google-auth depends on."""
+    global _key_pem
+    with _key_lock:
+        if _key_pem is None:
+            import rsa
+
+            _, private_key = rsa.newkeys(1024)
+            _key_pem = private_key.save_pkcs1().decode("ascii")
+        return _key_pem
@@ -0,0 +1,340 @@
+"""
+Per-rule timing and complexity gate for the notebook validators.
+
+Each rule of the Apex and LWC validators (both the standalone validators and
+the copies the delivery pipelines use) is timed on two workloads, each at a
+base size and at SCALE times that size:
+
+    large        corpus notebooks with many issues, turns and code lines
+    adversarial  notebooks shaped to hit the rules' worst cases: long lines,
+                 many bold segments, headers without their fields, unclosed
+                 code fences
+
+Times are divided by a fixed calibration workload so they compare across
+machines, and the growth exponent log(t_large / t_base) / log(SCALE) tells a
+linear rule (~1) from a quadratic one (~2). The results are compared against
+regex_baseline.json; a rule fails the gate when its time grows beyond the
+time tolerance or its exponent beyond the exponent tolerance.
+
+    python -m delivery_workflow.benchmarks.regex_gate                    # check
+    python -m delivery_workflow.benchmarks.regex_gate --update-baseline  # record
+
+The exit status is 1 when a rule regressed.
+"""
+import io
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import importlib
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from collections import defaultdict
+from typing import Optional
+
+from delivery_workflow.benchmarks.corpus import apex_notebook, lwc_notebook, _markdown_cell, _notebook
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regex_baseline.json")
+SCALE = 4
+# Rules faster than this are too noisy to compare, and to estimate their growth from
+MIN_SECONDS = 0.002
+MIN_EXPONENT_SECONDS = 0.005
+TIME_TOLERANCE = 1.0
+EXPONENT_TOLERANCE = 0.4
+
+# validator name: (module, project)
+VALIDATORS = {
+    "apex_validator": ("apex_validator.apex_validator", "apex"),
+    "apex_delivery": ("delivery_workflow.validation.apex_validation", "apex"),
+    "lwc_validator": ("lwc_validator.lwc_validator", "lwc"),
+    "lwc_delivery": ("delivery_workflow.validation.lwc_validator_reviewer", "lwc"),
+}
+# Apex rules are module functions: (name, takes the notebook type)
+APEX_RULES = (
+    ("validate_apex_code_block", False),
+    ("validate_dynamic_issues", False),
+    ("validate_issue_count", True),
+    ("validate_notebook_structure", True),
+    ("validate_apex_metadata_formatting", False),
+    ("validate_content_formatting", True),
+    ("validate_static_bold_formatting", True),
+    ("validate_issue_block_headers", False),
+)
+# LWC rules are NotebookValidator methods run by validate_structure()
+LWC_RULES = (
+    "parse_sections",
+    "validate_metadata",
+    "validate_conversation",
+    "check_blank_line_before_header",
+    "validate_blueprint",
+    "validate_implementation_plan",
+    "validate_scaffolding_code",
+    "validate_code",
+    "_validate_code_lines",
+)
+
+
+def _exact(size: int) -> tuple:
+    """A corpus size spec that always draws `size`."""
+    return (size, 0, size, size)
+
+
+def large_apex_notebook(size: int) -> str:
+    return apex_notebook(random.Random(size), 0, {
+        "issues": _exact(size),
+        "class_lines": _exact(size * 20),
+        "snippet_lines": _exact(12),
+    })
+
+
+def adversarial_apex_notebook(size: int) -> str:
+    """
+    Header words outside bold text next to many bold segments, unclosed
+    **Error** markers, code fences that never close and long runs of spaces.
+    """
+    return _notebook([
+        _markdown_cell(f"**Apex Code Analysis**\n\n**File Name** - Adversarial\n\n**Number of Issues** - 2"),
+        _markdown_cell(
+            "**Apex Code**\n\n`Adversarial.cls`\n\n```apex\n" + "    System.debug('Code');\n" * size
+            + "```\n\n**Issues Raised by PMD Code Analyzer**\n\n```json\n[]\n```"
+        ),
+        _markdown_cell(
+            "**Issue** - 1\n\n**User**\n\n**Error**\n" + "**note** " * size + "Code Error User " * size
+            + "\n**Code**\n" + "```apex\n" * size
+        ),
+        _markdown_cell("**Issue** - 2\n\n**User**\n\n" + "**Error " * size + "Assistant " * size + "**Assistant**"),
+        _markdown_cell(" " * (size * 20) + "**Issue** -" + " " * (size * 20) + "x"),
+    ])
+
+
+def large_lwc_notebook(size: int) -> str:
+    return lwc_notebook(random.Random(size), 0, {
+        "turns": _exact(size),
+        "components": _exact(2),
+        "file_lines": _exact(40),
+    })
+
+
+def adversarial_lwc_notebook(size: int) -> str:
+    """
+    Blueprint and plan entries without their fields, long prose lines, code
+    fences that never close and file names that run across the line.
+    """
+    blueprint = "".join(f"**Layer {i}**\n- **Name**: Part{i}\n" for i in range(size))
+    plan = "**Plan**\n" + "- **Name**: Part\n" * size + "  - **What**:\n" * size
+    return _notebook([
+        _markdown_cell(
+            "# Metadata\n**Category** - Lightning Web Components\n**Subcategory** - Stress\n"
+            "**Tags Category**\n- lwc\n**Complexity Category**\n- High\n**Message** - x\n"
+            "**Problem Statement**\n" + "word " * (size * 20) + "\n**manualSetupRequired** - False"
+        ),
+        _markdown_cell("# Conversation"),
+        _markdown_cell("**User**\n\n" + "word " * (size * 20)),
+        _markdown_cell("**Assistant**\n\n**Blueprint**\n\n" + blueprint),
+        _markdown_cell("**Assistant**\n\n**Implementation plan**\n\n" + plan),
+        _markdown_cell("**Assistant**\n\n**Scaffolding code**\n\n" + "`a.js.scaf`\n```javascript\n" * size),
+        _markdown_cell(
+            "**Assistant**\n\n**Code**\n\n`" + "a" * (size * 20) + "`\n```javascript\n"
+            + "const x = 1;\n" * size + "**" * size
+        ),
+    ])
+
+
+# project: {workload: (generator, base size)}
+WORKLOADS = {
+    "apex": {"large": (large_apex_notebook, 20), "adversarial": (adversarial_apex_notebook, 150)},
+    "lwc": {"large": (large_lwc_notebook, 5), "adversarial": (adversarial_lwc_notebook, 100)},
+}
+
+
+class RuleTimer:
+    """Accumulates the exclusive time of wrapped functions: time spent in a nested wrapped call is not counted twice."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.stack = []
+
+    def wrap(self, name, function):
+        def timed(*args, **kwargs):
+            self.stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = self.stack.pop()
+                self.seconds[name] += elapsed - nested
+                if self.stack:
+                    self.stack[-1] += elapsed
+        return timed
+
+
+@contextmanager
+def _scratch_directory():
+    """Runs the block in an empty working directory with stdout discarded; some validators write and print as they go."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, redirect_stdout(io.StringIO()):
+        os.chdir(directory)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def time_apex_rules(module, content: str, repeats: int) -> dict:
+    cells = json.loads(content)["cells"]
+    seconds = {}
+    for name, takes_type in APEX_RULES:
+        rule = getattr(module, name, None)
+        if rule is None:
+            continue
+        args = (cells, "apex") if takes_type else (cells,)
+        best = math.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            rule(*args)
+            best = min(best, time.perf_counter() - start)
+        seconds[name] = best
+    return seconds
+
+
+def time_lwc_rules(module, content: str, repeats: int) -> dict:
+    import nbformat
+    from common.cell_index import join_markdown_cells
+
+    text, cell_index = join_markdown_cells(nbformat.reads(content, as_version=4).cells)
+    best = {}
+    with _scratch_directory():
+        for _ in range(repeats):
+            validator = module.NotebookValidator(text, "benchmark.ipynb", cell_index)
+            timer = RuleTimer()
+            for name in LWC_RULES:
+                if hasattr(validator, name):
+                    setattr(validator, name, timer.wrap(name, getattr(validator, name)))
+            validator.validate_structure()
+            for name, seconds in timer.seconds.items():
+                best[name] = min(best.get(name, math.inf), seconds)
+    return best
+
+
+def calibrate(repeats: int = 5) -> float:
+    """Seconds of a fixed regex and string workload on this machine; rule times are reported in multiples of it."""
+    text = "**Issue** - 1\n**User**\nplain words between bold **Code** segments\n" * 2000
+    best = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        re.findall(r"\*\*(.*?)\*\*", text)
+        sum(1 for line in text.splitlines() if line.strip().startswith("**"))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(repeats: int = 3, validators: Optional[list] = None) -> dict:
+    """
+    Times every rule of the validators on every workload at the base size and
+    SCALE times it. Returns {"validator/workload/rule": {"seconds", "units", "exponent"}}
+    where seconds and units are at the larger size and exponent is None when
+    the rule is too fast to measure its growth.
+    """
+    unit = calibrate()
+    results = {}
+    for validator in validators or VALIDATORS:
+        module_name, project = VALIDATORS[validator]
+        module = importlib.import_module(module_name)
+        time_rules = time_apex_rules if project == "apex" else time_lwc_rules
+        for workload, (generate, size) in WORKLOADS[project].items():
+            base = time_rules(module, generate(size), repeats)
+            scaled = time_rules(module, generate(size * SCALE), repeats)
+            for rule, seconds in scaled.items():
+                exponent = None
+                if seconds >= MIN_EXPONENT_SECONDS and base.get(rule):
+                    exponent = round(math.log(seconds / base[rule]) / math.log(SCALE), 2)
+                results[f"{validator}/{workload}/{rule}"] = {
+                    "seconds": seconds,
+                    "units": round(seconds / unit, 2),
+                    "exponent": exponent,
+                }
+    return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)["rules"]
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH):
+    rules = {key: {"units": value["units"], "exponent": value["exponent"]} for key, value in sorted(results.items())}
+    with open(path, "w") as f:
+        json.dump({"scale": SCALE, "rules": rules}, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float = TIME_TOLERANCE,
+            exponent_tolerance: float = EXPONENT_TOLERANCE) -> list:
+    """Descriptions of the rules whose time or growth exponent regressed against the baseline."""
+    regressions = []
+    for key, result in sorted(results.items()):
+        expected = baseline.get(key)
+        if expected is None or result["seconds"] < MIN_SECONDS:
+            continue
+        limit = expected["units"] * (1 + time_tolerance)
+        if result["units"] > limit:
+            regressions.append(f"{key}: {result['units']} units, baseline {expected['units']} (limit {limit:.2f})")
+        if result["exponent"] is not None:
+            allowed = max(expected["exponent"] or 1.0, 1.0) + exponent_tolerance
+            if result["exponent"] > allowed:
+                regressions.append(
+                    f"{key}: grows as n^{result['exponent']}, baseline n^{expected['exponent'] or '1'} (limit n^{allowed:.2f})"
+                )
+    return regressions
+
+
+def report(results: dict, baseline: dict) -> str:
+    lines = [f"{'rule':<72} {'ms':>9} {'units':>8} {'base':>8} {'n^k':>6}"]
+    for key, result in sorted(results.items(), key=lambda item: -item[1]["seconds"]):
+        expected = baseline.get(key, {})
+        exponent = "-" if result["exponent"] is None else f"{result['exponent']:.2f}"
+        lines.append(
+            f"{key:<72} {result['seconds'] * 1000:9.2f} {result['units']:8.2f} "
+            f"{expected.get('units', '-'):>8} {exponent:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true", help="Record the results as the new baseline.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per rule; the fastest counts.")
+    parser.add_argument("--validator", action="append", choices=sorted(VALIDATORS), help="Only time these validators.")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="Allowed relative slowdown of a rule (1.0 = twice as slow).")
+    parser.add_argument("--exponent-tolerance", type=float, default=EXPONENT_TOLERANCE,
+                        help="Allowed growth of a rule's complexity exponent.")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeats, args.validator)
+    baseline = load_baseline()
+    print(report(results, baseline))
+    if args.update_baseline:
+        save_baseline({**{key: value for key, value in baseline.items() if key not in results}, **results})
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baseline, args.time_tolerance, args.exponent_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from datetime import timedelta
+
+import pandas as pd
+
+from delivery_workflow.data_ingest.src.input_connectors.df_conn import DFConnector
+
+ROWS = 10000
+
+
+@pytest.fixture(scope="module")
+def tasks_df():
+    links = [f"https://colab.research.google.com/drive/synthetic{index:05d}" for index in range(ROWS)]
+    # Every third link pins the revision it was delivered at
+    links = [link + f"#revisionId=rev{index}" if index % 3 == 0 else link for index, link in enumerate(links)]
+    return pd.DataFrame({
+        "colab_task_link": links,
+        "ts": pd.date_range("2024-01-01", periods=ROWS, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+        "batch": [f"batch{index % 7}" for index in range(ROWS)],
+        "annotator": [f"annotator{index % 50}@example.com" for index in range(ROWS)],
+    })
+
+
+def test_df_items(benchmark, tasks_df):
+    connector = DFConnector(tasks_df, "colab_task_link", fetch_latest_revision_or_skip_if_url_contains_same_rev=True)
+    items = benchmark(connector.df_to_file_items_with_metadata, tasks_df)
+    assert len(items) == ROWS
+
+
+def test_revision_map_from_ts_column(benchmark, tasks_df):
+    connector = DFConnector(
+        tasks_df,
+        "colab_task_link",
+        find_revision_by_timestamp_column_name="ts",
+        timestamp_column_timezone_delta=timedelta(hours=4),
+    )
+    revision_instructions_map = benchmark(connector.generate_revision_instructions_map_from_ts_column, tasks_df)
+    assert len(revision_instructions_map) == ROWS
+
+
+def test_revision_map_from_urls(benchmark, tasks_df):
+    connector = DFConnector(tasks_df, "colab_task_link", fetch_latest_revision_or_skip_if_url_contains_same_rev=True)
+    revision_instructions_map = benchmark(connector.generate_revision_instructions_map_from_revisions_in_urls, tasks_df)
+    assert len(revision_instructions_map) == ROWS
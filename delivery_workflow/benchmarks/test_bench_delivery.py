@@ -0,0 +1,42 @@
+import os
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from delivery_workflow.data_ingest.src.gdrive_utils import upload_folder
+from delivery_workflow.parsers.src.apex_parser import process_notebook_batch_concurrently
+from delivery_workflow.parsers.src.utils import split_jsonl_to_json
+
+
+@pytest.fixture(scope="module")
+def parsed_jsonl(apex_batch, tmp_path_factory):
+    """The parsed Apex corpus as the JSONL file the delivery splits."""
+    path = tmp_path_factory.mktemp("parsed") / "client_parsed_batch.jsonl"
+    with open(path, "w") as f:
+        for item, result in zip(apex_batch["items"], process_notebook_batch_concurrently(apex_batch)):
+            json.dump({"metadata": item["metadata"], "data": result["parsed_data"]["data"]}, f)
+            f.write("\n")
+    return str(path)
+
+
+def test_split_jsonl(benchmark, parsed_jsonl, tmp_path):
+    output_dir = str(tmp_path / "json_files")
+    assert benchmark(split_jsonl_to_json, parsed_jsonl, output_dir) == "success"
+    with open(parsed_jsonl) as f:
+        assert len(os.listdir(output_dir)) == sum(1 for _ in f)
+
+
+def test_upload_json_folder(benchmark, fake_google, google_credentials, parsed_jsonl, tmp_path):
+    output_dir = str(tmp_path / "json_files")
+    split_jsonl_to_json(parsed_jsonl, output_dir)
+
+    def new_destination():
+        return (google_credentials, output_dir, fake_google.drive.add_folder("delivery")), {"is_url": False}
+
+    calls = fake_google.stats["calls"]
+    uploaded_files = benchmark.pedantic(upload_folder, setup=new_destination, rounds=3)
+    benchmark.extra_info["api_calls_per_round"] = (fake_google.stats["calls"] - calls) / 3
+    assert len(uploaded_files) == len(os.listdir(output_dir))
+    assert "ERROR" not in uploaded_files.values()
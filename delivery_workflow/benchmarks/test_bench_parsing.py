@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from delivery_workflow.parsers.src.apex_parser import process_notebook_batch_concurrently
+from delivery_workflow.parsers.src.parser import Parser
+
+
+def test_apex_parser(benchmark, apex_batch):
+    results = benchmark(process_notebook_batch_concurrently, apex_batch)
+    assert len(results) == len(apex_batch["items"])
+    assert all(result["status"] == "OK" for result in results)
+
+
+def test_lwc_parser(benchmark, lwc_batch):
+    parsed_batch = benchmark(Parser().parse_notebooks, lwc_batch)
+    assert all(item["parsed"]["status"] == "OK" for item in parsed_batch["items"])
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from delivery_workflow.benchmarks.fake_google import FakeGoogleServer
+from delivery_workflow.data_ingest.src.gdrive_utils.auth import build_services
+from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter
+from delivery_workflow.data_ingest.src.gdrive_utils.sheet_utils import download_sheets_as_df
+from delivery_workflow.data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
+from delivery_workflow.data_ingest.src.input_connectors import GSheetsConnector
+
+
+def task_sheet(server, notebooks):
+    """Uploads the notebooks (the even ones with a second revision) and returns a task sheet listing them."""
+    folder_id = server.drive.add_folder("notebooks")
+    rows = [["colab_task_link", "Status"]]
+    for index, content in enumerate(notebooks):
+        file_id = server.drive.add_file(f"notebook_{index}.ipynb", content, folder_id)
+        if index % 2 == 0:
+            server.drive.add_revision(file_id, content)
+        rows.append([f"https://colab.research.google.com/drive/{file_id}", "Done"])
+    return server.sheets.add_spreadsheet("tasks", {"batch": rows})
+
+
+def test_retrieve_notebooks_from_sheet(benchmark, fake_google, google_credentials, lwc_notebooks):
+    sheet_id = task_sheet(fake_google, lwc_notebooks)
+
+    def retrieve():
+        connector = GSheetsConnector(
+            sheet_id=sheet_id,
+            sheet_names=["batch"],
+            gdrive_file_link_column_name="colab_task_link",
+            max_workers=24,
+        )
+        connector.load_data()
+        return connector.get_data(as_json=True)
+
+    calls = fake_google.stats["calls"]
+    data = benchmark.pedantic(retrieve, rounds=3)
+    benchmark.extra_info["api_calls_per_round"] = (fake_google.stats["calls"] - calls) / 3
+    assert [item["content"] for item in data["items"]] == lwc_notebooks
+
+
+def test_index_drive_tree_rate_limited(benchmark, tmp_path):
+    # A server of its own with a quota below the client's limiter, so part of
+    # every listing batch is rejected with 429 and retried
+    with FakeGoogleServer(latency=0.01, requests_per_second=10, burst=20) as server:
+        root_id = server.drive.add_folder("root")
+        for folder in range(30):
+            folder_id = server.drive.add_folder(f"folder_{folder}", root_id)
+            for file in range(20):
+                server.drive.add_file(f"file_{file}.json", "{}", folder_id)
+        credentials = server.write_service_account_file(str(tmp_path))
+        with server.redirect():
+            drive = build_services(credentials, services=["drive"])["drive"]
+            index = benchmark.pedantic(DriveTreeIndex.build, args=(drive, root_id, RateLimiter(100)), rounds=3)
+        benchmark.extra_info["throttled_calls"] = server.stats["throttled"]
+    assert server.stats["throttled"]
+    assert len(index.items) == 1 + 30 + 30 * 20
+
+
+def test_load_task_sheets(benchmark, fake_google, google_credentials):
+    tabs = {
+        f"batch_{tab}": [["colab_task_link", "Status"]] + [[f"https://colab.research.google.com/drive/t{tab}n{row}", "Done"] for row in range(500)]
+        for tab in range(8)
+    }
+    sheet_id = fake_google.sheets.add_spreadsheet("tasks", tabs)
+
+    calls = fake_google.stats["calls"]
+    df = benchmark.pedantic(download_sheets_as_df, args=(google_credentials, sheet_id, list(tabs), "__src_sheet_name"), rounds=3)
+    benchmark.extra_info["api_calls_per_round"] = (fake_google.stats["calls"] - calls) / 3
+    assert len(df) == 8 * 500
+    assert df["__src_sheet_name"].tolist() == [name for name in tabs for _ in range(500)]
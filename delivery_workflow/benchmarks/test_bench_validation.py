@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import nbformat
+
+from delivery_workflow.validation.apex_validation import generate_validation_report
+from delivery_workflow.validation.lwc_validator_reviewer import NotebookValidator
+
+
+def test_apex_validator(benchmark, workdir, apex_notebooks):
+    def validate():
+        return [generate_validation_report(content) for content in apex_notebooks]
+
+    reports = benchmark(validate)
+    assert all(errors == [] for _, errors in reports)
+
+
+def test_lwc_validator(benchmark, workdir, lwc_notebooks):
+    def validate():
+        errors = []
+        for index, content in enumerate(lwc_notebooks):
+            notebook = nbformat.reads(content, as_version=4)
+            markdown = "\n\n".join(cell["source"] for cell in notebook.cells if cell["cell_type"] == "markdown")
+            validator = NotebookValidator(markdown, f"notebook_{index}")
+            validator.validate_structure()
+            errors.append(validator.errors)
+        return errors
+
+    errors = benchmark(validate)
+    assert all(notebook_errors == [] for notebook_errors in errors)
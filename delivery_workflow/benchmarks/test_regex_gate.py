@@ -0,0 +1,16 @@
+from delivery_workflow.benchmarks import regex_gate
+
+
+def test_validator_rules_do_not_regress():
+    results = regex_gate.run(repeats=3)
+    regressions = regex_gate.compare(results, regex_gate.load_baseline())
+    assert not regressions, "\n".join(regressions)
+
+
+def test_rule_timer_counts_exclusive_time():
+    timer = regex_gate.RuleTimer()
+    inner = timer.wrap("inner", lambda: sum(range(200000)))
+    outer = timer.wrap("outer", lambda: inner())
+    outer()
+    assert timer.seconds["inner"] > 0
+    assert timer.seconds["outer"] < timer.seconds["inner"]
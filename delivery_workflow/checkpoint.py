@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import shutil
+import threading
+import hashlib
+from collections.abc import Mapping
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+CHECKPOINT_DIR = os.getenv("DELIVERY_CHECKPOINT_DIR", "output/checkpoints")
+# Checkpoints older than this are discarded instead of resumed; a delivery retried days
+# later starts over rather than resuming from notebooks that were ingested back then
+CHECKPOINT_MAX_AGE = timedelta(hours=float(os.getenv("DELIVERY_CHECKPOINT_MAX_AGE_HOURS", "24")))
+
+
+def make_run_id(*parts) -> str:
+    """
+    Derives a run ID from the parameters that identify a delivery, so retrying
+    the same delivery finds the checkpoints of the failed attempt.
+    """
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _json_default(value):
+    # Dict-style views, such as the items of a connector batch, are stored as the dicts they present;
+    # anything else would not load back as what the stage returned, so it fails the save
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Stage result of type {type(value).__name__} cannot be checkpointed as JSON")
+
+
+class RunCheckpoint:
+    """
+    Persists the result of each completed pipeline stage of a delivery run.
+
+    Every stage result is written as JSON under `<base_dir>/<run_id>/`. When a
+    run fails and is started again with the same run ID, completed stages are
+    loaded instead of executed, so the retry resumes at the first incomplete
+    stage. Stages that handle many items one by one can also record each
+    completed item with `mark_item_done()`, so a retry of the stage skips the
+    `completed_items()` of the failed attempt. Checkpoints older than `max_age`
+    (None keeps them for good) are discarded when the run starts. Call `clear()`
+    once the run has finished.
+    """
+
+    def __init__(self, run_id: str, base_dir: str = CHECKPOINT_DIR, max_age: Optional[timedelta] = CHECKPOINT_MAX_AGE):
+        self.run_id = run_id
+        self.run_dir = os.path.join(base_dir, run_id)
+        self._lock = threading.Lock()
+        os.makedirs(self.run_dir, exist_ok=True)
+        age = self._age()
+        if age is not None and max_age is not None and age > max_age.total_seconds():
+            print(f"🗑️ Discarding the checkpoints of delivery run {run_id}, saved {age / 3600:.1f} hours ago")
+            self.clear()
+            os.makedirs(self.run_dir, exist_ok=True)
+        self.resumed = bool(os.listdir(self.run_dir))
+        if self.resumed:
+            print(f"⏩ Resuming delivery run {run_id}")
+
+    def _age(self) -> Optional[float]:
+        """Seconds since the oldest checkpoint of the run was saved, None if there is none."""
+        saved_at = [entry.stat().st_mtime for entry in os.scandir(self.run_dir) if entry.is_file()]
+        return time.time() - min(saved_at) if saved_at else None
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.run_dir, f"{stage}.json")
+
+    def _items_path(self, stage: str) -> str:
+        return os.path.join(self.run_dir, f"{stage}.items")
+
+    def is_done(self, stage: str) -> bool:
+        return os.path.exists(self._path(stage))
+
+    def load(self, stage: str) -> Any:
+        with open(self._path(stage), "r", encoding="utf-8") as f:
+            return json.load(f)["result"]
+
+    def save(self, stage: str, result: Any):
+        # Written to a temporary file first so a crash never leaves a half-written checkpoint
+        tmp_path = self._path(stage) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"result": result}, f, default=_json_default)
+        os.replace(tmp_path, self._path(stage))
+
+    def completed_items(self, stage: str) -> set[str]:
+        """IDs of the items the stage completed in earlier attempts."""
+        try:
+            with open(self._items_path(stage), "r", encoding="utf-8") as f:
+                return {line.rstrip("\n") for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def mark_item_done(self, stage: str, item_id: str):
+        """Records that the stage completed one item, written at once so it survives a crash."""
+        with self._lock, open(self._items_path(stage), "a", encoding="utf-8") as f:
+            f.write(f"{item_id}\n")
+
+    def discard(self, stage: str):
+        """Removes the checkpoint of a stage and its completed items, so it runs again from scratch."""
+        for path in (self._path(stage), self._items_path(stage)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stage(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Runs `fn` unless the stage already completed in an earlier attempt, then returns its result."""
+        if self.is_done(name):
+            print(f"⏩ Stage '{name}' already completed, skipping")
+            return self.load(name)
+        result = fn()
+        self.save(name, result)
+        return result
+
+    def clear(self):
+        """Removes the checkpoints of a finished run."""
+        shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -3,6 +3,7 @@ from typing import List
 from googleapiclient.discovery import Resource
 
 from delivery_workflow.data_ingest.src.gdrive_utils.folder_clone import clone_drive_folder
+from delivery_workflow.data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
 from delivery_workflow.data_ingest.src.gdrive_utils.utils import create_folder_path, extract_folder_id
 
 
@@ -12,7 +13,9 @@ def backup_folder(
     destination_parent: str,
     subfolder_name: str,
     is_url: bool = True,
-):
+    resume: bool = False,
+    requests_per_second: float = 10.0,
+) -> dict:
     """Backup a Google Drive folder to a subfolder in another folder.
 
     Args:
@@ -21,16 +24,32 @@ def backup_folder(
         destination_parent: The ID or URL of the parent folder in Google Drive where the backup will be created.
         subfolder_name: The name of the subfolder to be created in the destination folder.
         is_url: A flag indicating whether the provided source and destination are URLs. Default is True.
+        resume: If True, continue an interrupted backup into the same subfolder, skipping
+            folders and files that were already copied.
+        requests_per_second: Maximum rate of Drive API calls made by the backup.
+
+    Returns:
+        The clone summary, see `clone_contents`.
     """
     # Extract the folder IDs
     source_folder_id = extract_folder_id(source_folder, is_url)
     destination_parent_id = extract_folder_id(destination_parent, is_url)
 
-    # Create a new subfolder in the destination folder
-    subfolder_id = create_folder_path(service, subfolder_name, destination_parent_id)
+    # Create a new subfolder in the destination folder, or reuse it if it exists. The destination
+    # parent may hold many earlier backups, so it is not listed; the index only memoizes the path
+    index = DriveTreeIndex(destination_parent_id, indexed=False)
+    subfolder_id = create_folder_path(service, subfolder_name, destination_parent_id, index=index)
 
     # Clone the source folder to the new subfolder
-    clone_drive_folder(service, source_folder_id, subfolder_id, is_url=False)
+    summary = clone_drive_folder(
+        service,
+        source_folder_id,
+        subfolder_id,
+        is_url=False,
+        resume=resume,
+        requests_per_second=requests_per_second,
+    )
     print(
         f"Backup of folder '{source_folder}' to subfolder '{subfolder_name}' in folder '{destination_parent}' completed."
     )
+    return summary
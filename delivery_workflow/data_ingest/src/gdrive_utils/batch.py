@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import httplib2
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+# Drive accepts at most 100 calls in one batch request
+MAX_BATCH_SIZE = 100
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Drive answers 403 to both quota and permission errors; only these reasons are worth a retry
+RETRYABLE_403_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+
+class RateLimiter:
+    """Token bucket that spaces out Drive API calls to stay under the per-user quota.
+
+    Args:
+        requests_per_second: Sustained number of API calls allowed per second.
+        burst: Maximum number of calls that can be made at once. Defaults to one second worth of calls.
+    """
+
+    def __init__(self, requests_per_second: float = 10.0, burst: Optional[int] = None):
+        self.rate = requests_per_second
+        self.capacity = burst or max(1, int(requests_per_second))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count: int = 1) -> None:
+        """Block until `count` calls may be made. A batch of n calls costs n tokens.
+
+        A batch larger than the available tokens takes them on credit: the
+        bucket goes negative and the caller waits until the debt is repaid,
+        so callers after it wait for the refill as well.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _error_reasons(exception: HttpError) -> List[str]:
+    """The `reason` of each error in the JSON body of an API error response."""
+    try:
+        error = json.loads(exception.content.decode("utf-8"))["error"]
+        return [detail.get("reason") for detail in error.get("errors", [])]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return []
+
+
+def _is_retryable(exception: Exception) -> bool:
+    # Transport errors (connection resets, timeouts) never reached Drive
+    if isinstance(exception, (httplib2.HttpLib2Error, OSError)):
+        return True
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status == 403:
+        return any(reason in RETRYABLE_403_REASONS for reason in _error_reasons(exception))
+    return exception.resp.status in RETRYABLE_STATUSES
+
+
+def execute_batched(
+    service: Resource,
+    requests: List[HttpRequest],
+    rate_limiter: Optional[RateLimiter] = None,
+    batch_size: int = MAX_BATCH_SIZE,
+    max_retries: int = 5,
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """Execute Drive API requests through batch HTTP requests.
+
+    Requests that fail with a rate limit or server error are retried with
+    exponential backoff; other failures, including 403s other than the rate
+    limit ones, are returned without retrying. A batch request that fails as a
+    whole, with a transport error or an error status of its own, is retried
+    the same way, and once the retries run out its error is returned for each
+    of its requests.
+
+    Args:
+        service: The Google Drive service resource.
+        requests: The requests to execute, e.g. `service.files().copy(...)`.
+        rate_limiter: Optional limiter applied before each batch is sent.
+        batch_size: Number of calls per batch request, at most 100.
+        max_retries: Number of times a retryable failure is retried.
+
+    Returns:
+        A list of (response, exception) tuples in the same order as `requests`.
+    """
+    batch_size = min(batch_size, MAX_BATCH_SIZE)
+    results: List[Tuple[Any, Optional[Exception]]] = [(None, None)] * len(requests)
+    pending = list(range(len(requests)))
+    attempt = 0
+
+    while pending:
+        retry = []
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            answered = set()
+
+            def callback(request_id, response, exception):
+                index = int(request_id)
+                answered.add(index)
+                if exception is not None and _is_retryable(exception) and attempt < max_retries:
+                    retry.append(index)
+                results[index] = (response, exception)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for index in chunk:
+                batch.add(requests[index], request_id=str(index))
+            if rate_limiter:
+                rate_limiter.acquire(len(chunk))
+            try:
+                batch.execute()
+            except (HttpError, httplib2.HttpLib2Error, OSError) as e:
+                print(f"Drive batch request of {len(chunk)} calls failed: {e}")
+                for index in chunk:
+                    if index in answered:
+                        continue
+                    if _is_retryable(e) and attempt < max_retries:
+                        retry.append(index)
+                    results[index] = (None, e)
+
+        if retry:
+            attempt += 1
+            delay = 2 ** attempt
+            print(f"Retrying {len(retry)} rate limited or failed Drive requests in {delay}s...")
+            time.sleep(delay)
+        pending = sorted(retry)
+    return results
@@ -1,33 +1,146 @@
-from typing import List
+from typing import Optional
 
 from googleapiclient.discovery import Resource
 
+from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter, execute_batched
 from delivery_workflow.data_ingest.src.gdrive_utils.utils import (
-    create_folder_path,
+    FOLDER_MIME_TYPE,
     extract_folder_id,
-    list_all_files_in_folder,
+    list_files_in_folders,
 )
 
+CLONE_LIST_FIELDS = "id, name, mimeType, md5Checksum, size"
 
-def clone_contents(service: Resource, source_id: str, dest_id: str):
+
+def _is_same_file(source: dict, existing: dict) -> bool:
+    """Whether a file already in the destination is a finished copy of the source file."""
+    if source.get("md5Checksum") and existing.get("md5Checksum"):
+        return source["md5Checksum"] == existing["md5Checksum"]
+    # Google Docs have no checksum, so only the name and type can be compared
+    return source.get("mimeType") == existing.get("mimeType")
+
+
+def clone_contents(
+    service: Resource,
+    source_id: str,
+    dest_id: str,
+    resume: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> dict:
     """Clone the contents of a Google Drive folder to another folder.
 
+    The source tree is walked one level at a time. All folders of a level are
+    listed in batch requests, the subfolders of the next level are created in
+    one batch and the files of the level are copied in batches of 100.
+
     Args:
         service: The Google Drive service resource.
         source_id: The ID of the source folder in Google Drive.
         dest_id: The ID of the destination folder in Google Drive.
+        resume: If True, list the destination as well and skip folders and files that
+            were already cloned, so an interrupted clone can be run again. Destination
+            items of the same name that differ from the source are moved to the trash
+            and copied again.
+        rate_limiter: Limiter for the Drive API calls. Defaults to 10 calls per second.
+
+    Returns:
+        A summary dict with the number of folders created, files copied, files skipped
+        and the source paths that failed to clone.
     """
-    all_files = list_all_files_in_folder(service, source_id)
-    for item in all_files:
-        if item["mimeType"] == "application/vnd.google-apps.folder":
-            # It's a folder, create it and clone its contents
-            new_folder_id = create_folder_path(service, item["name"], dest_id)
-            clone_contents(service, item["id"], new_folder_id)
-        else:
-            # It's a file, copy it to the destination folder
-            file_metadata = {"parents": [dest_id]}
-            service.files().copy(fileId=item["id"], body=file_metadata).execute()
-            print(f"Copied file '{item['name']}' to folder ID '{dest_id}'.")
+    rate_limiter = rate_limiter or RateLimiter()
+    summary = {"folders_created": 0, "files_copied": 0, "files_skipped": 0, "failed": []}
+    # (source folder ID, destination folder ID, relative path)
+    level = [(source_id, dest_id, ".")]
+
+    while level:
+        source_listings = list_files_in_folders(
+            service, [src for src, _, _ in level], CLONE_LIST_FIELDS, rate_limiter
+        )
+        dest_listings = (
+            list_files_in_folders(service, [dst for _, dst, _ in level], CLONE_LIST_FIELDS, rate_limiter)
+            if resume
+            else {}
+        )
+
+        next_level = []
+        folders_to_create = []
+        files_to_copy = []
+        # Destination items in the way of a copy: files with other content, or a
+        # file where the source has a folder and the other way round
+        stale = {}
+        for src, dst, path in level:
+            existing = {item["name"]: item for item in dest_listings.get(dst, [])}
+            for item in source_listings[src]:
+                item_path = f"{path}/{item['name']}"
+                found = existing.get(item["name"])
+                if item["mimeType"] == FOLDER_MIME_TYPE:
+                    if found and found["mimeType"] == FOLDER_MIME_TYPE:
+                        next_level.append((item["id"], found["id"], item_path))
+                        continue
+                    folders_to_create.append((item, dst, item_path))
+                elif found and _is_same_file(item, found):
+                    summary["files_skipped"] += 1
+                    continue
+                else:
+                    files_to_copy.append((item, dst, item_path))
+                if found:
+                    stale[item_path] = found
+
+        # Trashed rather than deleted, so a wrong replacement can be restored
+        trash_requests = [
+            service.files().update(fileId=found["id"], body={"trashed": True}, fields="id")
+            for found in stale.values()
+        ]
+        for item_path, (_, exception) in zip(
+            list(stale), execute_batched(service, trash_requests, rate_limiter)
+        ):
+            if exception is not None:
+                print(f"Failed to replace '{item_path}': {exception}")
+                summary["failed"].append(item_path)
+            else:
+                del stale[item_path]
+        # Paths still in `stale` could not be trashed; copying them would duplicate the name
+        folders_to_create = [entry for entry in folders_to_create if entry[2] not in stale]
+        files_to_copy = [entry for entry in files_to_copy if entry[2] not in stale]
+
+        folder_requests = [
+            service.files().create(
+                body={"name": item["name"], "mimeType": FOLDER_MIME_TYPE, "parents": [dst]},
+                fields="id",
+            )
+            for item, dst, _ in folders_to_create
+        ]
+        for (item, _, item_path), (response, exception) in zip(
+            folders_to_create, execute_batched(service, folder_requests, rate_limiter)
+        ):
+            if exception is not None:
+                print(f"Failed to create folder '{item_path}': {exception}")
+                summary["failed"].append(item_path)
+                continue
+            summary["folders_created"] += 1
+            next_level.append((item["id"], response["id"], item_path))
+
+        copy_requests = [
+            service.files().copy(
+                fileId=item["id"], body={"name": item["name"], "parents": [dst]}, fields="id"
+            )
+            for item, dst, _ in files_to_copy
+        ]
+        for (item, _, item_path), (_, exception) in zip(
+            files_to_copy, execute_batched(service, copy_requests, rate_limiter)
+        ):
+            if exception is not None:
+                print(f"Failed to copy file '{item_path}': {exception}")
+                summary["failed"].append(item_path)
+            else:
+                summary["files_copied"] += 1
+
+        print(
+            f"Cloned {len(level)} folders at this level: {summary['files_copied']} files copied, "
+            f"{summary['files_skipped']} skipped so far."
+        )
+        level = next_level
+    return summary
 
 
 def clone_drive_folder(
@@ -35,7 +148,9 @@ def clone_drive_folder(
     source_folder: str,
     destination_folder: str,
     is_url: bool = True,
-):
+    resume: bool = False,
+    requests_per_second: float = 10.0,
+) -> dict:
     """Clone a Google Drive folder with all its contents to another folder.
 
     Args:
@@ -43,6 +158,11 @@ def clone_drive_folder(
         source_folder: The ID or URL of the source folder in Google Drive.
         destination_folder: The ID or URL of the destination folder in Google Drive.
         is_url: A flag indicating whether the provided source and destination are URLs. Default is True.
+        resume: If True, skip folders and files that already exist in the destination.
+        requests_per_second: Maximum rate of Drive API calls made by the clone.
+
+    Returns:
+        The summary returned by `clone_contents`.
     """
     source_folder_id = extract_folder_id(source_folder, is_url)
     destination_folder_id = extract_folder_id(destination_folder, is_url)
@@ -58,7 +178,16 @@ def clone_drive_folder(
             f"Destination folder with ID '{destination_folder_id}' does not exist."
         )
     # Start the cloning process from the source folder to the destination
-    clone_contents(service, source_folder_id, destination_folder_id)
+    summary = clone_contents(
+        service,
+        source_folder_id,
+        destination_folder_id,
+        resume=resume,
+        rate_limiter=RateLimiter(requests_per_second),
+    )
     print(
-        f"Cloning of folder ID '{source_folder_id}' to folder ID '{destination_folder_id}' completed."
+        f"Cloning of folder ID '{source_folder_id}' to folder ID '{destination_folder_id}' completed: "
+        f"{summary['folders_created']} folders created, {summary['files_copied']} files copied, "
+        f"{summary['files_skipped']} skipped, {len(summary['failed'])} failed."
     )
+    return summary
@@ -1,4 +1,5 @@
 import os
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
 from typing import Optional
@@ -9,6 +10,7 @@ from googleapiclient.discovery import Resource
 from googleapiclient.http import MediaFileUpload
 import os
 from delivery_workflow.data_ingest.src.gdrive_utils.auth import build_services
+from delivery_workflow.data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
 from delivery_workflow.data_ingest.src.gdrive_utils.utils import (
     create_folder_path,
     extract_folder_id,
@@ -52,7 +54,11 @@ def authenticate_service_account(GOOGLE_API_CREDENTIALS_PATH):
 
 
 def upload_file(
-    service: Resource, file_path: str, parent_id: str, force_replace: bool = False
+    service: Resource,
+    file_path: str,
+    parent_id: str,
+    force_replace: bool = False,
+    index: Optional[DriveTreeIndex] = None,
 ) -> Optional[str]:
     """Upload a file to Google Drive, optionally forcing replacement of existing files.
 
@@ -61,6 +67,7 @@ def upload_file(
         file_path: The path to the file to upload.
         parent_id: The ID of the parent folder in Google Drive.
         force_replace: If True, replace the file if it already exists.
+        index: Optional index of the destination tree, used instead of a lookup request.
 
     Returns:
         File url if the file was uploaded, None otherwise.
@@ -68,7 +75,7 @@ def upload_file(
     file_name = os.path.basename(file_path)
     file_metadata = {"name": file_name, "parents": [parent_id]}
     media = MediaFileUpload(file_path, resumable=True)
-    file_id = get_file_id(service, file_name, parent_id)
+    file_id = get_file_id(service, file_name, parent_id, index=index)
 
     if file_id and not force_replace:
         print(f"File '{file_name}' already exists and won't be replaced.")
@@ -89,6 +96,8 @@ def upload_file(
             .execute()
         )
         print(f"File '{file_name}' has been uploaded.")
+        if index is not None:
+            index.add({"id": response["id"], "name": file_name}, parent_id)
 
     if response:
         file_url = f"https://drive.google.com/uc?id={response['id']}"
@@ -101,6 +110,7 @@ def sync_folder_structure(
     service: Resource,
     source_folder_path: str,
     destination_folder_id: str,
+    index: Optional[DriveTreeIndex] = None,
 ) -> None:
     """Create folder structure in Google Drive.
 
@@ -108,6 +118,7 @@ def sync_folder_structure(
         service: The Google Drive service resource.
         source_folder_path: The path to the local folder to upload.
         destination_folder_id: The ID of the destination folder in Google Drive.
+        index: Optional index of the destination tree; created folders are added to it.
     """
     total_dirs = 0
     for root, dirs, _ in os.walk(source_folder_path):
@@ -120,11 +131,11 @@ def sync_folder_structure(
         current_folder_id = (
             destination_folder_id
             if relative_path == "."
-            else get_nested_folder_id(service, relative_path, destination_folder_id)
+            else get_nested_folder_id(service, relative_path, destination_folder_id, index=index)
         )
 
         if current_folder_id is None:
-            create_folder_path(service, relative_path, destination_folder_id)
+            create_folder_path(service, relative_path, destination_folder_id, index=index)
 
         processed_dirs += 1
         print(
@@ -137,6 +148,7 @@ def add_files_to_queue(
     source_folder_path: str,
     destination_folder_id: str,
     file_queue: Queue,
+    index: Optional[DriveTreeIndex] = None,
 ) -> None:
     """Add files to be uploaded to the queue.
 
@@ -145,11 +157,12 @@ def add_files_to_queue(
         source_folder_path: The path to the local folder to upload.
         destination_folder_id: The ID of the destination folder in Google Drive.
         file_queue: The queue to which files will be added.
+        index: Optional index of the destination tree, used instead of lookup requests.
     """
     for root, _, files in os.walk(source_folder_path):
         relative_path = os.path.relpath(root, source_folder_path)
         current_folder_id = get_nested_folder_id(
-            service, relative_path, destination_folder_id
+            service, relative_path, destination_folder_id, index=index
         )
 
         for file_name in files:
@@ -164,6 +177,7 @@ def worker(
     uploaded_files: dict[str, Optional[str]],
     force_replace: bool,
     total_files: int,
+    index: Optional[DriveTreeIndex] = None,
 ) -> None:
     """Function to be run by each thread.
 
@@ -172,6 +186,7 @@ def worker(
         file_queue: The queue from which files will be uploaded.
         uploaded_files: Dict of relative file path -> URL for the file after upload, URL is None if it was skipped due to force replace. "ERROR" if there was an error during the upload.
         force_replace: If True, re-upload files even if they exist.
+        index: Optional index of the destination tree, shared by all workers.
     """
     service = authenticate_service_account(GOOGLE_API_CREDENTIALS_PATH)
     while not file_queue.empty():
@@ -180,7 +195,7 @@ def worker(
             f"Processing {relative_file_path} {file_queue.qsize()} left after this one"
         )
         try:
-            file_url = upload_file(service, file_path, current_folder_id, force_replace)
+            file_url = upload_file(service, file_path, current_folder_id, force_replace, index=index)
             if file_url is not None:
                 uploaded_files[relative_file_path] = file_url
             else:
@@ -221,29 +236,35 @@ def upload_folder(
     Returns:
         Dict of relative file path -> URL for the file after upload, URL is None if it was skipped due to force replace. "ERROR" if there was an error during the upload.
     """
-    service = build_services(creds_file_path)
+    service = build_services(creds_file_path, services=["drive"])["drive"]
     destination_folder_id = extract_folder_id(destination_folder, is_url)
     if not os.path.exists(source_folder_path):
         raise FolderNotFoundError(
             f"Local folder '{source_folder_path}' does not exist."
         )
-    sync_folder_structure(service, source_folder_path, destination_folder_id)
+    # Index the destination once so folder and file lookups need no further requests; the
+    # index is the folder ID cache of the upload, created folders are recorded in it
+    index = DriveTreeIndex.build(service, destination_folder_id)
+    sync_folder_structure(service, source_folder_path, destination_folder_id, index=index)
 
     total_files = sum([len(files) for _, _, files in os.walk(source_folder_path)])
     file_queue = Queue()
     uploaded_files = {}
 
-    add_files_to_queue(service, source_folder_path, destination_folder_id, file_queue)
+    add_files_to_queue(service, source_folder_path, destination_folder_id, file_queue, index=index)
 
     with ThreadPoolExecutor(max_workers=max_threads) as executor:
         for _ in range(min(total_files, max_threads)):
+            # Each worker runs in a copy of the caller's context, so its API calls count towards the traced run
             executor.submit(
+                contextvars.copy_context().run,
                 worker,
                 creds_file_path,
                 file_queue,
                 uploaded_files,
                 force_replace,
                 total_files,
+                index,
             )
     file_queue.join()
 
@@ -3,32 +3,69 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
 
-def download_sheet_as_df(service_account_path, sheet_id, sheet_name):
-    # Authenticate with the service account
+def a1_sheet_range(sheet_name):
+    """A1 range of a whole sheet; the API answers it with the sheet's used range."""
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def _values_to_df(values):
+    """A DataFrame from the values of a range whose first row is the header."""
+    if not values:
+        return pd.DataFrame()
+    columns = values[0]
+    # Cells right of the header have no column; trailing empty cells are already omitted by the API
+    rows = [row if len(row) <= len(columns) else row[:len(columns)] for row in values[1:]]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def download_sheets_as_df(service_account_path, sheet_id, sheet_names, sheet_name_column=None):
+    """
+    Reads the used range of every sheet in `sheet_names` with a single values.batchGet
+    request and returns the rows of all of them in one DataFrame, in order.
+    The first row of each sheet is its header. With `sheet_name_column` a column
+    of that name holds the sheet each row comes from.
+    """
     scopes = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
     creds = service_account.Credentials.from_service_account_file(
         service_account_path, scopes=scopes
     )
     service = build("sheets", "v4", credentials=creds)
 
-    # Construct the range to read
-    sheet_range = f"{sheet_name}!A:Z"  # Adjust the range A:Z as needed
-
-    # Make the API request
     result = (
         service.spreadsheets()
         .values()
-        .get(spreadsheetId=sheet_id, range=sheet_range)
+        .batchGet(spreadsheetId=sheet_id, ranges=[a1_sheet_range(name) for name in sheet_names])
         .execute()
     )
-    values = result.get("values", [])
+    sheet_values = []
+    for sheet_name, value_range in zip(sheet_names, result.get("valueRanges", [])):
+        values = value_range.get("values", [])
+        if not values:
+            print(f"No data found in sheet '{sheet_name}'.")
+            continue
+        sheet_values.append((sheet_name, values))
+    if not sheet_values:
+        return pd.DataFrame(columns=[sheet_name_column] if sheet_name_column else [])
 
-    # Convert to a DataFrame
-    if not values:
-        print("No data found.")
-        return pd.DataFrame()
-    else:
-        return pd.DataFrame(values[1:], columns=values[0])
+    headers = [values[0] for _, values in sheet_values]
+    if all(header == headers[0] for header in headers):
+        # Same columns in every sheet: one frame straight from the rows of all of them
+        df = _values_to_df([headers[0]] + [row for _, values in sheet_values for row in values[1:]])
+        if sheet_name_column:
+            df[sheet_name_column] = [name for name, values in sheet_values for _ in values[1:]]
+        return df
+
+    dataframes = []
+    for sheet_name, values in sheet_values:
+        df = _values_to_df(values)
+        if sheet_name_column:
+            df[sheet_name_column] = sheet_name
+        dataframes.append(df)
+    return pd.concat(dataframes, ignore_index=True)
+
+
+def download_sheet_as_df(service_account_path, sheet_id, sheet_name):
+    return download_sheets_as_df(service_account_path, sheet_id, [sheet_name])
 
 
 def upload_df_to_sheet(service_account_path, sheet_id, sheet_name, df):
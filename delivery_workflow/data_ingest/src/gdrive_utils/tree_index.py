@@ -0,0 +1,151 @@
+import threading
+from typing import Iterator, Optional, Tuple
+
+from googleapiclient.discovery import Resource
+
+from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter
+from delivery_workflow.data_ingest.src.gdrive_utils.utils import (
+    FOLDER_MIME_TYPE,
+    TREE_LIST_FIELDS,
+    list_files_in_folders,
+)
+
+
+class DriveTreeIndex:
+    """In-memory index of a Google Drive folder tree.
+
+    The index is built with one batched listing per tree level and keeps the
+    full metadata of every file (id, name, mimeType, md5Checksum, modifiedTime,
+    parents, size), so lookups by name or path and checksum comparisons need no
+    further API calls. Items created after the build can be recorded with `add`
+    so the index stays in sync; it is safe to share between threads, and
+    `lock_for` gives one lock per folder name so concurrent creators of the
+    same folder wait for each other instead of creating duplicates.
+
+    Folders outside the indexed tree are looked up with the API; the folders
+    found or created there are remembered, so an index created with
+    `indexed=False` (nothing listed) still memoizes folder IDs for a session.
+
+    Args:
+        root_id: The ID of the indexed root folder.
+        indexed: Whether the contents of the root are known, i.e. it is empty or
+            about to be listed by `build`.
+    """
+
+    def __init__(self, root_id: str, indexed: bool = True):
+        self.root_id = root_id
+        self.items = {root_id: {"id": root_id, "name": ".", "mimeType": FOLDER_MIME_TYPE}}
+        # parent folder ID -> {(name, is folder) -> item}, only for folders whose contents are indexed.
+        # Drive allows a file and a folder of the same name side by side, so both are part of the key
+        self.children = {root_id: {}} if indexed else {}
+        # (parent folder ID, folder name) -> folder ID, for folders whose parent is not indexed
+        self.found_folders = {}
+        # (parent folder ID, folder name) -> lock held while the folder is looked up and created
+        self.folder_locks = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(
+        cls,
+        service: Resource,
+        folder_id: str,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> "DriveTreeIndex":
+        """Index a folder and all of its subfolders.
+
+        Args:
+            service: The Google Drive service resource.
+            folder_id: The ID of the root folder.
+            rate_limiter: Optional limiter applied to the listing batches.
+
+        Returns:
+            The built index.
+        """
+        index = cls(folder_id)
+        level = [folder_id]
+        while level:
+            listings = list_files_in_folders(service, level, TREE_LIST_FIELDS, rate_limiter)
+            next_level = []
+            for parent_id in level:
+                for item in listings[parent_id]:
+                    index.add(item, parent_id)
+                    if item.get("mimeType") == FOLDER_MIME_TYPE:
+                        next_level.append(item["id"])
+            level = next_level
+        print(f"Indexed {len(index.items) - 1} files and folders under folder ID '{folder_id}'.")
+        return index
+
+    def add(self, item: dict, parent_id: str) -> None:
+        """Record a file or folder in the index, e.g. after it was created."""
+        with self.lock:
+            item = dict(item)
+            item.setdefault("parents", [parent_id])
+            self.items[item["id"]] = item
+            # Names are not unique in Drive; like the API lookups, keep the first match.
+            # Adding to a folder that is not indexed must not make its other contents look absent
+            if parent_id in self.children:
+                is_folder = item.get("mimeType") == FOLDER_MIME_TYPE
+                self.children[parent_id].setdefault((item["name"], is_folder), item)
+            elif item.get("mimeType") == FOLDER_MIME_TYPE:
+                self.found_folders.setdefault((parent_id, item["name"]), item["id"])
+            if item.get("mimeType") == FOLDER_MIME_TYPE:
+                self.children.setdefault(item["id"], {})
+
+    def remember_folder(self, parent_id: str, folder_name: str, folder_id: str) -> None:
+        """Record a folder found by an API lookup in a folder that is not indexed."""
+        with self.lock:
+            self.found_folders.setdefault((parent_id, folder_name), folder_id)
+
+    def found_folder_id(self, parent_id: str, folder_name: str) -> Optional[str]:
+        """The ID of a folder remembered in a folder that is not indexed, or None."""
+        return self.found_folders.get((parent_id, folder_name))
+
+    def lock_for(self, parent_id: str, folder_name: str) -> threading.Lock:
+        """The lock of the folder with the given name in a folder."""
+        with self.lock:
+            return self.folder_locks.setdefault((parent_id, folder_name), threading.Lock())
+
+    def covers(self, folder_id: str) -> bool:
+        """Whether the contents of the folder are known to the index."""
+        return folder_id in self.children
+
+    def get_child(self, parent_id: str, name: str, is_folder: bool = False) -> Optional[dict]:
+        """Return the file (or with `is_folder`, the folder) with the given name in a folder, or None if not found."""
+        return self.children.get(parent_id, {}).get((name, is_folder))
+
+    def get_file_id(self, file_name: str, parent_id: str) -> Optional[str]:
+        """Return the ID of a file in a folder, or None if not found."""
+        item = self.get_child(parent_id, file_name)
+        return item["id"] if item else None
+
+    def get_nested_folder_id(self, folder_path: str, parent_id: Optional[str] = None) -> Optional[str]:
+        """Return the ID of a nested folder given its path relative to `parent_id` (the root by default)."""
+        parent_id = parent_id or self.root_id
+        folder_names = folder_path.strip("/").split("/")
+        if folder_names == ["."]:
+            return parent_id
+        for folder_name in folder_names:
+            if folder_name == ".":
+                continue
+            item = self.get_child(parent_id, folder_name, is_folder=True)
+            if item is None:
+                return None
+            parent_id = item["id"]
+        return parent_id
+
+    def walk(self, folder_id: Optional[str] = None, parent_path: str = ".") -> Iterator[Tuple[str, dict]]:
+        """Yield (relative path, item) for every file and folder below `folder_id`."""
+        folder_id = folder_id or self.root_id
+        for item in list(self.children.get(folder_id, {}).values()):
+            path = f"{parent_path}/{item['name']}"
+            yield path, item
+            if item.get("mimeType") == FOLDER_MIME_TYPE:
+                yield from self.walk(item["id"], path)
+
+    def file_ids(self, folder_id: Optional[str] = None, parent_path: str = ".") -> dict[str, str]:
+        """Map the relative path of every file (not folder) below `folder_id` to its ID."""
+        return {
+            path: item["id"]
+            for path, item in self.walk(folder_id, parent_path)
+            if item.get("mimeType") != FOLDER_MIME_TYPE
+        }
@@ -1,7 +1,14 @@
 import re
-from typing import Optional
+from contextlib import nullcontext
+from typing import Iterable, Optional
 from googleapiclient.discovery import Resource
 
+from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter, execute_batched
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# Wide listing fields, so callers can compare checksums and parents without another metadata fetch
+TREE_LIST_FIELDS = "id, name, mimeType, md5Checksum, modifiedTime, parents, size"
+
 
 def extract_file_id(file: str, is_url: bool = True) -> str:
     """Extract the file ID from a Google Drive file URL or ID.
@@ -64,7 +71,7 @@ def extract_folder_id(folder: str, is_url: bool = True) -> str:
 
 
 def get_nested_folder_id(
-    service: Resource, folder_path: str, parent_id: str
+    service: Resource, folder_path: str, parent_id: str, index=None
 ) -> Optional[str]:
     """Retrieve the ID of a nested folder in Google Drive using a path.
 
@@ -72,67 +79,88 @@ def get_nested_folder_id(
         service: The Google Drive service resource.
         folder_path: The path of the folder to find, may include nested folders.
         parent_id: The ID of the parent folder.
+        index: Optional DriveTreeIndex; if it covers the parent folder, no API call is made.
+            Otherwise the folders it remembers are reused and the found ones are recorded in it.
 
     Returns:
         The ID of the nested folder or None if not found.
     """
+    if index is not None and index.covers(parent_id):
+        return index.get_nested_folder_id(folder_path, parent_id)
     folder_names = folder_path.strip("/").split("/")
     if folder_names == ["."]:
         return parent_id
     for folder_name in folder_names:
-        query = f"name = '{folder_name}' and '{parent_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
-        response = (
-            service.files()
-            .list(q=query, spaces="drive", fields="files(id, name)")
-            .execute()
-        )
-        folders = response.get("files", [])
-        if not folders:
-            return None
-        # Assuming the first match is the correct one, as folder names can be non-unique
-        parent_id = folders[0].get("id")
+        folder_id = index.found_folder_id(parent_id, folder_name) if index is not None else None
+        if folder_id is None:
+            query = f"name = '{folder_name}' and '{parent_id}' in parents and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+            response = (
+                service.files()
+                .list(q=query, spaces="drive", fields="files(id, name)")
+                .execute()
+            )
+            folders = response.get("files", [])
+            if not folders:
+                return None
+            # Assuming the first match is the correct one, as folder names can be non-unique
+            folder_id = folders[0].get("id")
+            if index is not None:
+                index.remember_folder(parent_id, folder_name, folder_id)
+        parent_id = folder_id
     return parent_id
 
 
-def create_folder_path(service: Resource, folder_path: str, parent_id: str) -> str:
+def create_folder_path(service: Resource, folder_path: str, parent_id: str, index=None) -> str:
     """Create a new folder path in Google Drive, creating subfolders as needed.
 
     Args:
         service: The Google Drive service resource.
         folder_path: The path of the folder to create, may include nested folders.
         parent_id: The ID of the parent folder.
+        index: Optional DriveTreeIndex used for the lookups; found and created folders are
+            recorded in it, so `DriveTreeIndex(parent_id, indexed=False)` memoizes folder IDs
+            without listing anything. Creating a folder holds the index's lock for it, so
+            concurrent calls sharing the index do not create duplicates.
 
     Returns:
         The ID of the last subfolder in the path.
     """
     folder_names = folder_path.split("/")
     for folder_name in folder_names:
-        folder_id = get_nested_folder_id(service, folder_name, parent_id)
-        if folder_id is None:
-            file_metadata = {
-                "name": folder_name,
-                "mimeType": "application/vnd.google-apps.folder",
-                "parents": [parent_id],
-            }
-            folder = service.files().create(body=file_metadata, fields="id").execute()
-            folder_id = folder.get("id")
+        lock = index.lock_for(parent_id, folder_name) if index is not None else nullcontext()
+        with lock:
+            folder_id = get_nested_folder_id(service, folder_name, parent_id, index=index)
+            if folder_id is None:
+                file_metadata = {
+                    "name": folder_name,
+                    "mimeType": "application/vnd.google-apps.folder",
+                    "parents": [parent_id],
+                }
+                folder = service.files().create(body=file_metadata, fields="id").execute()
+                folder_id = folder.get("id")
+                if index is not None:
+                    index.add(dict(file_metadata, id=folder_id), parent_id)
         parent_id = folder_id
     return parent_id
 
 
-def get_file_id(service: Resource, file_name: str, parent_id: str) -> Optional[str]:
+def get_file_id(service: Resource, file_name: str, parent_id: str, index=None) -> Optional[str]:
     """Retrieve the ID of a file in Google Drive.
 
     Args:
         service: The Google Drive service resource.
         file_name: The name of the file to find.
         parent_id: The ID of the parent folder.
+        index: Optional DriveTreeIndex; if it covers the parent folder, no API call is made.
 
     Returns:
         The ID of the file or None if not found.
     """
+    if index is not None and index.covers(parent_id):
+        return index.get_file_id(file_name, parent_id)
     print("Getting file id...")
-    query = f"name = '{file_name}' and '{parent_id}' in parents and trashed = false"
+    # Folders are excluded, as the index does, so a folder of the same name is never taken for the file
+    query = f"name = '{file_name}' and '{parent_id}' in parents and mimeType != '{FOLDER_MIME_TYPE}' and trashed = false"
     response = (
         service.files()
         .list(q=query, spaces="drive", fields="files(id, name)")
@@ -145,12 +173,15 @@ def get_file_id(service: Resource, file_name: str, parent_id: str) -> Optional[s
     return None
 
 
-def list_all_files_in_folder(service: Resource, folder_id: str) -> list[dict]:
+def list_all_files_in_folder(
+    service: Resource, folder_id: str, fields: str = TREE_LIST_FIELDS
+) -> list[dict]:
     """Get all files in a given Google Drive folder.
 
     Args:
         service: The Google Drive service resource.
         folder_id: The ID of the folder.
+        fields: The file fields to return for each file.
 
     Returns:
         A list of dictionaries, each representing a file.
@@ -161,7 +192,8 @@ def list_all_files_in_folder(service: Resource, folder_id: str) -> list[dict]:
         .list(
             q=query,
             spaces="drive",
-            fields="nextPageToken, files(id, name, mimeType)",
+            fields=f"nextPageToken, files({fields})",
+            pageSize=1000,
             pageToken=None,
         )
         .execute()
@@ -175,7 +207,8 @@ def list_all_files_in_folder(service: Resource, folder_id: str) -> list[dict]:
             .list(
                 q=query,
                 spaces="drive",
-                fields="nextPageToken, files(id, name, mimeType)",
+                fields=f"nextPageToken, files({fields})",
+                pageSize=1000,
                 pageToken=response["nextPageToken"],
             )
             .execute()
@@ -185,10 +218,63 @@ def list_all_files_in_folder(service: Resource, folder_id: str) -> list[dict]:
     return all_files
 
 
+def list_files_in_folders(
+    service: Resource,
+    folder_ids: Iterable[str],
+    fields: str = "id, name, mimeType",
+    rate_limiter: Optional[RateLimiter] = None,
+) -> dict[str, list[dict]]:
+    """Get all files in several Google Drive folders using batch requests.
+
+    The first page of every folder is requested in the same batch, then the
+    folders that have more pages are requested again until all are exhausted.
+
+    Args:
+        service: The Google Drive service resource.
+        folder_ids: The IDs of the folders to list.
+        fields: The file fields to return for each file.
+        rate_limiter: Optional limiter applied to the batch requests.
+
+    Returns:
+        A dictionary mapping each folder ID to the list of files in it.
+
+    Raises:
+        HttpError: If listing any of the folders fails.
+    """
+    listings = {folder_id: [] for folder_id in folder_ids}
+    page_tokens = {folder_id: None for folder_id in listings}
+    while page_tokens:
+        folder_order = list(page_tokens)
+        requests = [
+            service.files().list(
+                q=f"'{folder_id}' in parents and trashed = false",
+                spaces="drive",
+                fields=f"nextPageToken, files({fields})",
+                pageSize=1000,
+                pageToken=page_tokens[folder_id],
+            )
+            for folder_id in folder_order
+        ]
+        next_tokens = {}
+        for folder_id, (response, exception) in zip(
+            folder_order, execute_batched(service, requests, rate_limiter)
+        ):
+            if exception is not None:
+                raise exception
+            listings[folder_id].extend(response.get("files", []))
+            if response.get("nextPageToken"):
+                next_tokens[folder_id] = response["nextPageToken"]
+        page_tokens = next_tokens
+    return listings
+
+
 def map_all_gdrive_files_to_ids(
     service: Resource, folder: str, parent_path: str = ".", is_url=True) -> dict[str, str]:
     """Recursively get all files in a Google Drive folder.
 
+    The tree is listed with a DriveTreeIndex, one batched request per level.
+    Use DriveTreeIndex.build directly to keep the full metadata for later lookups.
+
     Args:
         service: The Google Drive service resource.
         folder: The ID or URL of the folder.
@@ -201,20 +287,8 @@ def map_all_gdrive_files_to_ids(
     Raises:
         ValueError: If the folder does not exist.
     """
-    folder_id = extract_folder_id(folder, is_url)
+    from delivery_workflow.data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
 
-    all_files = list_all_files_in_folder(service, folder_id)
-
-    files = {}
-    for file in all_files:
-        file_path = f"{parent_path}/{file.get('name')}"
-        if file.get("mimeType") != "application/vnd.google-apps.folder":
-            files[file_path] = file.get("id")
-        else:
-            files.update(
-                map_all_gdrive_files_to_ids(
-                    service, file.get("id"), file_path, is_url=False
-                )
-            )
-
-    return files
\ No newline at end of file
+    folder_id = extract_folder_id(folder, is_url)
+    index = DriveTreeIndex.build(service, folder_id)
+    return index.file_ids(parent_path=parent_path)
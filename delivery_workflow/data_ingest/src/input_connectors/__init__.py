@@ -1,10 +1,14 @@
 from delivery_workflow.data_ingest.src.input_connectors.base import (
+    ContentFetchError,
     InputBatch,
     InputConnectorInterface,
     InputItem,
     InputItemMetadata,
     InputItemStatus,
+    InputItemView,
+    LazyContent,
 )
+from delivery_workflow.data_ingest.src.input_connectors.columnar_conn import ColumnarConnector
 from delivery_workflow.data_ingest.src.input_connectors.gdrive import GDriveConnector
 from delivery_workflow.data_ingest.src.input_connectors.gsheets import GSheetsConnector
 from delivery_workflow.data_ingest.src.input_connectors.local_files import LocalFilesConnector
@@ -1,9 +1,12 @@
 import os
+import copy
 import pickle
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional,List, Dict, Union
+from typing import Callable, Optional,List, Dict, Union
 
 DATA_DIR = os.path.join(os.getcwd(), "data")
 
@@ -14,7 +17,7 @@ class InputItemStatus(Enum):
     SKIPPED = "SKIPPED"
 
 
-@dataclass
+@dataclass(slots=True)
 class InputItemMetadata:
     status: InputItemStatus = InputItemStatus.OK
     data: dict = field(default_factory=dict)
@@ -33,15 +36,49 @@ class InputItemMetadata:
         return cls(status=InputItemStatus(d["status"]), data=d["data"])
 
 
-@dataclass
+class ContentFetchError(Exception):
+    """Raised by a LazyContent fetch; the message is recorded as the item's 'input_status_not_ok_msg'."""
+
+
+class LazyContent:
+    """
+    Content of an InputItem that is fetched when first used (see InputItem.get_content).
+    `fetch` returns the content or raises; it runs once, even when several
+    threads ask for the content at the same time.
+    """
+
+    __slots__ = ("fetch", "lock", "done", "value", "error")
+
+    def __init__(self, fetch: Callable[[], str]):
+        self.fetch = fetch
+        self.lock = threading.Lock()
+        self.done = False
+        self.value = None
+        self.error = None
+
+    def get(self) -> str:
+        with self.lock:
+            if not self.done:
+                try:
+                    self.value = self.fetch()
+                except Exception as e:
+                    self.error = e
+                self.done = True
+                self.fetch = None
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+@dataclass(slots=True)
 class InputItem:
-    content: Optional[str]
+    content: Optional[Union[str, LazyContent]]
     metadata: InputItemMetadata = field(default_factory=InputItemMetadata)
 
     def __post_init__(self):
         """Validate the InputItem to ensure content is a string and metadata is an instance of InputItemMetadata."""
         if self.metadata.status == InputItemStatus.OK and not isinstance(
-            self.content, str
+            self.content, (str, LazyContent)
         ):
             raise ValueError(
                 "The 'content' attribute must be a string if metadata status is OK."
@@ -51,8 +88,27 @@ class InputItem:
                 "The 'metadata' attribute must be an instance of InputItemMetadata."
             )
 
+    def get_content(self) -> Optional[str]:
+        """
+        The content. Lazy content is fetched on the first call; if that fails the
+        item becomes ERROR with the reason in 'input_status_not_ok_msg' and has no content.
+        """
+        content = self.content
+        if isinstance(content, LazyContent):
+            try:
+                self.content = content.get()
+            except Exception as e:
+                self.content = None
+                self.metadata.status = InputItemStatus.ERROR
+                self.metadata.data["input_status_not_ok_msg"] = (
+                    str(e) if isinstance(e, ContentFetchError)
+                    else f"Download failed with error: {e.__class__.__name__}: {str(e)}"
+                )
+        return self.content
+
     def serialize(self):
-        return {"content": self.content, "metadata": self.metadata.serialize()}
+        content = self.get_content()
+        return {"content": content, "metadata": self.metadata.serialize()}
 
     @classmethod
     def deserialize(cls, d):
@@ -61,17 +117,87 @@ class InputItem:
         )
 
 
-@dataclass
+_DELETED = object()
+
+
+class InputItemView(MutableMapping):
+    """
+    The serialized form of an InputItem, read from the item without copying it.
+
+    item["content"] is the item's content (lazy content is fetched on first
+    access) and item["metadata"] a dict holding the status value and the
+    item's own metadata data dict. Keys set or deleted
+    on the view (e.g. "parsed") are kept on the view and never change the item.
+    copy.deepcopy() and pickling give the plain dict of InputItem.serialize().
+    """
+
+    __slots__ = ("item", "changes")
+
+    def __init__(self, item: "InputItem"):
+        self.item = item
+        self.changes = None
+
+    def __getitem__(self, key):
+        if self.changes and key in self.changes:
+            value = self.changes[key]
+        elif key == "content":
+            value = self.item.get_content()
+        elif key == "metadata":
+            value = self.item.metadata.serialize()
+        else:
+            raise KeyError(key)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if self.changes is None:
+            self.changes = {}
+        self.changes[key] = value
+
+    def __delitem__(self, key):
+        self[key]  # KeyError if missing
+        self[key] = _DELETED
+
+    def __iter__(self):
+        for key in ("content", "metadata"):
+            if not self.changes or self.changes.get(key) is not _DELETED:
+                yield key
+        for key, value in (self.changes or {}).items():
+            if key not in ("content", "metadata") and value is not _DELETED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.to_dict(), memo)
+
+    def __reduce__(self):
+        return dict, (self.to_dict(),)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+@dataclass(slots=True)
 class InputBatch:
     items: Optional[List[InputItem]] = None
     metadata: Optional[Dict] = None
+    # The items list and its length when validate() last passed
+    _validated: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
 
     def validate(self):
         """Validate the InputBatch to ensure all items are instances of InputItem."""
         if self.items is None:
             raise ValueError("Items cannot be None.")
-        if not all(isinstance(item, InputItem) for item in self.items):
-            raise ValueError("All items in the batch must be instances of InputItem.")
+        if self._validated is None or self._validated[0] is not self.items or self._validated[1] != len(self.items):
+            if not all(isinstance(item, InputItem) for item in self.items):
+                raise ValueError("All items in the batch must be instances of InputItem.")
+            self._validated = (self.items, len(self.items))
         if self.metadata is not None and not isinstance(self.metadata, dict):
             raise TypeError("Metadata must be a dictionary.")
 
@@ -85,6 +211,17 @@ class InputBatch:
             "metadata": self.metadata,
         }
 
+    def view(self) -> dict:
+        """The serialized form of the batch, with an InputItemView per item instead of a copied dict."""
+        return {
+            "items": (
+                [InputItemView(item) for item in self.items]
+                if self.items is not None
+                else None
+            ),
+            "metadata": self.metadata,
+        }
+
     @classmethod
     def deserialize(cls, d):
         return cls(
@@ -128,8 +265,18 @@ class InputConnectorInterface(ABC):
     def _load_data(self):
         pass
 
-    def save_data(self, relative_save_path=None):
-        """Save data to a pickle file at the given path or the path provided in params."""
+    def close(self):
+        """Releases what the connector holds besides its batch, such as open files or download threads."""
+        pass
+
+    def save_data(self, relative_save_path=None, storage="columnar"):
+        """
+        Save data at the given path or the path provided in params, relative to the DATA_DIR.
+        storage="columnar" writes a batch directory read by ColumnarConnector (see
+        columnar_conn.write_batch), storage="pickle" a .pkl file read by PickleConnector.
+        """
+        if storage not in ("columnar", "pickle"):
+            raise ValueError(f"Unknown storage '{storage}'. Use 'columnar' or 'pickle'.")
         if self._input_batch.items is None:
             raise ValueError("No data to save. Load data first.")
 
@@ -144,9 +291,13 @@ class InputConnectorInterface(ABC):
         # Ensure that the directories in the relative path are created if missing
         full_path = os.path.join(DATA_DIR, relative_save_path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if storage == "columnar":
+            from delivery_workflow.data_ingest.src.input_connectors.columnar_conn import write_batch
+
+            return write_batch(full_path, self._input_batch)
         full_path += ".pkl"
         with open(full_path, "wb") as file:
-            pickle.dump(self.get_data(as_json=True), file)
+            pickle.dump(self._input_batch.serialize(), file)
         return full_path
 
     def _validate_data_type(self):
@@ -154,11 +305,15 @@ class InputConnectorInterface(ABC):
         self._input_batch.validate()
 
     def get_data(self, as_json=False) -> Union[dict, InputBatch]:
-        """Retrieve data from the connector. Raise an error if data is not loaded."""
+        """
+        Retrieve data from the connector. Raise an error if data is not loaded.
+        With as_json=True the batch is returned in its serialized form, with
+        items as InputItemView's over the loaded items rather than copies.
+        """
         if self._input_batch.items is None:
             raise ValueError("Data not loaded. Call load_data first.")
         self._validate_data_type()
         if as_json:
-            return self._input_batch.serialize()
+            return self._input_batch.view()
         else:
             return self._input_batch
@@ -0,0 +1,226 @@
+import os
+import json
+import mmap
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from delivery_workflow.data_ingest.src.input_connectors.base import (
+    DATA_DIR,
+    InputBatch,
+    InputConnectorInterface,
+    InputItem,
+    InputItemMetadata,
+    InputItemStatus,
+)
+
+FORMAT_VERSION = 1
+BATCH_FILE = "batch.json"
+METADATA_FILE = "metadata.parquet"
+CONTENT_FILE = "content.bin"
+# Metadata table columns holding item metadata data, one per key
+DATA_PREFIX = "data."
+INDEX_COLUMNS = ["status", "offset", "length"]
+# Tags of the JSON objects that stand for the metadata values JSON has no type for
+TIMESTAMP_TAG = "$timestamp"
+DATETIME_TAG = "$datetime"
+DATE_TAG = "$date"
+
+
+def _encode_value(value):
+    # Sheet and DataFrame columns hold pandas Timestamps (NaT for empty cells); they are stored
+    # tagged so they load back as the same type. Any other unknown type is refused rather than
+    # turned into a string that would load back as one
+    if isinstance(value, pd.Timestamp) or value is pd.NaT:
+        return {TIMESTAMP_TAG: value.isoformat()}
+    if isinstance(value, datetime):
+        return {DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {DATE_TAG: value.isoformat()}
+    raise TypeError(f"Item metadata value of type {type(value).__name__} cannot be stored in a columnar batch")
+
+
+def _decode_value(obj: dict):
+    if len(obj) == 1:
+        tag, value = next(iter(obj.items()))
+        if tag == TIMESTAMP_TAG:
+            return pd.Timestamp(value)
+        if tag == DATETIME_TAG:
+            return datetime.fromisoformat(value)
+        if tag == DATE_TAG:
+            return date.fromisoformat(value)
+    return obj
+
+
+def write_batch(path: str, input_batch: InputBatch, append: bool = False) -> str:
+    """
+    Stores a batch in the directory `path` and returns the path:
+
+    - batch.json: the format version and the batch metadata.
+    - content.bin: the UTF-8 contents of the items, one after another.
+    - metadata.parquet: a row per item with its status, the offset and length
+      in bytes of its content in content.bin (length -1 when it has none) and
+      a `data.<key>` column per item metadata key with the JSON-encoded value.
+      Timestamps, datetimes and dates are encoded as tagged objects and load
+      back as such; any other value JSON cannot encode raises TypeError.
+
+    With append=True the items are added to the batch stored at `path`: their
+    contents are appended to content.bin and the metadata table is rewritten.
+    """
+    os.makedirs(path, exist_ok=True)
+    metadata_path = os.path.join(path, METADATA_FILE)
+    stored = None
+    if append and os.path.exists(metadata_path):
+        stored = pd.read_parquet(metadata_path)
+
+    rows = []
+    with open(os.path.join(path, CONTENT_FILE), "ab" if stored is not None else "wb") as f:
+        offset = f.seek(0, os.SEEK_END)
+        for item in input_batch.items or []:
+            content = item.get_content()
+            row = {"status": item.metadata.status.value, "offset": offset, "length": -1}
+            if content is not None:
+                encoded = content.encode("utf-8")
+                f.write(encoded)
+                row["length"] = len(encoded)
+                offset += len(encoded)
+            for key, value in item.metadata.data.items():
+                row[DATA_PREFIX + key] = json.dumps(value, default=_encode_value)
+            rows.append(row)
+
+    columns = list(INDEX_COLUMNS)
+    for row in rows:
+        columns += [column for column in row if column not in columns]
+    table = pd.DataFrame(rows, columns=columns).astype({"offset": "int64", "length": "int64"})
+    if stored is not None:
+        table = pd.concat([stored, table], ignore_index=True)
+    # Written to a temporary file first so a crash never leaves a half-written table
+    table.to_parquet(metadata_path + ".tmp", index=False)
+    os.replace(metadata_path + ".tmp", metadata_path)
+
+    batch_path = os.path.join(path, BATCH_FILE)
+    if stored is None or not os.path.exists(batch_path):
+        with open(batch_path, "w", encoding="utf-8") as f:
+            json.dump({"format_version": FORMAT_VERSION, "metadata": input_batch.metadata}, f)
+    return path
+
+
+class ColumnarBatch:
+    """
+    Read access to a batch stored by write_batch. The metadata table is read
+    on its own, optionally only some of its columns, and contents are decoded
+    from a memory map of content.bin only when an item is reached.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, BATCH_FILE), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported batch format version {info.get('format_version')} at path: {path}")
+        self.metadata = info["metadata"]
+        self._table = None
+        self._file = None
+        self._content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def table(self, columns: Optional[list] = None) -> pd.DataFrame:
+        """
+        The metadata table. With `columns` ('status', 'offset', 'length' or
+        'data.<key>') only those columns are read from the file.
+        """
+        metadata_path = os.path.join(self.path, METADATA_FILE)
+        if columns is not None:
+            return pd.read_parquet(metadata_path, columns=columns)
+        if self._table is None:
+            self._table = pd.read_parquet(metadata_path)
+        return self._table
+
+    def __len__(self):
+        return len(self.table(["status"]))
+
+    def content(self, offset: int, length: int) -> Optional[str]:
+        if length < 0:
+            return None
+        if self._content is None:
+            self._file = open(os.path.join(self.path, CONTENT_FILE), "rb")
+            # An empty file cannot be memory mapped, and has no content to read anyway
+            if os.fstat(self._file.fileno()).st_size:
+                self._content = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._content = b""
+        return self._content[offset:offset + length].decode("utf-8")
+
+    @staticmethod
+    def item_metadata(row: dict) -> InputItemMetadata:
+        data = {
+            column[len(DATA_PREFIX):]: json.loads(value, object_hook=_decode_value)
+            for column, value in row.items()
+            if column.startswith(DATA_PREFIX) and isinstance(value, str)
+        }
+        return InputItemMetadata(status=InputItemStatus(row["status"]), data=data)
+
+    def iter_items(self) -> Iterator[InputItem]:
+        """The stored items in order. Each content is read from content.bin when its item is reached."""
+        for row in self.table().to_dict("records"):
+            yield InputItem(
+                content=self.content(int(row["offset"]), int(row["length"])),
+                metadata=self.item_metadata(row),
+            )
+
+    def close(self):
+        if isinstance(self._content, mmap.mmap):
+            self._content.close()
+        if self._file is not None:
+            self._file.close()
+        self._content = None
+        self._file = None
+
+
+class ColumnarConnector(InputConnectorInterface):
+    def __init__(
+        self, relative_path: str, common_metadata: dict | None = None, **params
+    ):
+        """
+        Reads a batch saved by save_data() (see write_batch). Path is relative to the DATA_DIR.
+        load_data() loads every item; load_metadata() and iter_items() read
+        only the metadata table, or the items one at a time.
+        """
+        super().__init__(common_metadata, **params)
+        self.relative_path = relative_path
+        self._stored_batch = None
+
+    def _open(self) -> ColumnarBatch:
+        if self._stored_batch is None:
+            full_path = os.path.join(DATA_DIR, self.relative_path)
+            if not os.path.exists(os.path.join(full_path, BATCH_FILE)):
+                raise FileNotFoundError(f"No stored batch at path: {full_path}")
+            self._stored_batch = ColumnarBatch(full_path)
+        return self._stored_batch
+
+    def load_metadata(self, columns: Optional[list] = None) -> pd.DataFrame:
+        """The metadata table of the stored batch, without reading any content."""
+        return self._open().table(columns)
+
+    def iter_items(self) -> Iterator[InputItem]:
+        """Streams the stored items without loading the batch."""
+        return self._open().iter_items()
+
+    def _load_data(self):
+        stored_batch = self._open()
+        metadata = self._input_batch.metadata
+        self._input_batch = InputBatch(
+            items=list(stored_batch.iter_items()),
+            metadata=metadata if metadata is not None else stored_batch.metadata,
+        )
+
+    def close(self):
+        if self._stored_batch is not None:
+            self._stored_batch.close()
+            self._stored_batch = None
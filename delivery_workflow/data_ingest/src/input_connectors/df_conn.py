@@ -15,8 +15,11 @@ from delivery_workflow.data_ingest.src.input_connectors.retrievers.gdrive_retrie
     RevisionSelectionByRevId,
     RevisionSelectionByTS,
 )
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.revision_cache import RevisionCache
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.sources_cache import SourcesCache
 
 GOOGLE_API_CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS")
+REVISION_IN_URL = r"#revisionId=((?:(?!#revisionId=)[^&])*)"
 
 class DFConnector(InputConnectorInterface):
     def __init__(
@@ -38,6 +41,9 @@ class DFConnector(InputConnectorInterface):
         ) = None,
         # general
         max_workers=10,
+        lazy_content: bool = False,
+        revision_cache: RevisionCache | None = None,
+        sources_cache: SourcesCache | None = None,
         **params,
     ):
         """
@@ -65,6 +71,14 @@ class DFConnector(InputConnectorInterface):
         revision_instructions_map: a map or a single default value for all items. A map is a dict initial_url->RevisionInstruction().
             See src/input_connectors/retrievers/gdrive_retriever.py for more on the instructions format.
 
+        # General
+
+        max_workers: number of concurrent Google Drive requests.
+        lazy_content: if True, notebooks are downloaded when their content is first used instead of up front
+            (see GDriveConnector).
+        revision_cache: a RevisionCache to reuse revision lists of files unchanged since an earlier run.
+        sources_cache: a SourcesCache; contents are then sources-only notebooks without outputs (see GDriveConnector).
+
         Specified columns must be present. rows with nan values for specified columns will be dropped
         """
         super().__init__(common_metadata, **params)
@@ -81,6 +95,10 @@ class DFConnector(InputConnectorInterface):
             fetch_latest_revision_or_skip_if_url_contains_same_rev
         )
         self.max_workers = max_workers
+        self.lazy_content = lazy_content
+        self.revision_cache = revision_cache
+        self.sources_cache = sources_cache
+        self._gdrive_connector = None
 
         if (
             bool(revision_instructions_map)
@@ -144,67 +162,54 @@ class DFConnector(InputConnectorInterface):
         return df
 
     def df_to_file_items_with_metadata(self, df):
+        """
+        One dict per row with the row's link as 'file_uri' and the metadata
+        columns: every other column, or those listed in make_columns_as_per_item_metadata.
+        """
+        link_column = self.gdrive_file_link_column_name
         if isinstance(self.make_columns_as_per_item_metadata, bool):
-            gdrive_file_items = df.to_dict("records")
-            for item in gdrive_file_items:
-                item["file_uri"] = item.pop(self.gdrive_file_link_column_name)
+            positions = [i for i, column in enumerate(df.columns) if column != link_column]
         else:
             # make_columns_as_per_item_metadata is a list of specific columns
-            gdrive_file_items = []
-            for record in df.to_dict("records"):
-                item_metadata = {
-                    col: record[col] for col in self.make_columns_as_per_item_metadata
-                }
-                item_metadata["file_uri"] = record[self.gdrive_file_link_column_name]
-                gdrive_file_items.append(item_metadata)
-        return gdrive_file_items
+            positions = [df.columns.get_loc(column) for column in self.make_columns_as_per_item_metadata]
+        keys = [df.columns[i] for i in positions] + ["file_uri"]
+        columns = [df.iloc[:, i].tolist() for i in positions] + [df[link_column].tolist()]
+        return [dict(zip(keys, row)) for row in zip(*columns)]
 
     def generate_revision_instructions_map_from_ts_column(self, df):
-        revisions_ts = df[
-            [
-                self.gdrive_file_link_column_name,
-                self.find_revision_by_timestamp_column_name,
-            ]
-        ].copy()
         # Convert the column to datetime, taking into account the timezone delta, then to UTC
-        timestamp_column = self.find_revision_by_timestamp_column_name
-        datetime_series = pd.to_datetime(revisions_ts[timestamp_column])
+        datetime_series = pd.to_datetime(df[self.find_revision_by_timestamp_column_name])
         datetime_series = datetime_series.dt.tz_localize(
             None
         )  # Remove existing timezone information
         datetime_series = (
             datetime_series - self.timestamp_column_timezone_delta
         )  # Apply the timedelta
-        revisions_ts[timestamp_column] = datetime_series.dt.tz_localize(
-            "UTC"
-        )  # Convert to UTC
-        revision_instructions_map = {}
-        for _, row in revisions_ts.iterrows():
-            file_uri = row[self.gdrive_file_link_column_name]
-            timestamp = row[self.find_revision_by_timestamp_column_name]
-            revision_instructions_map[file_uri] = RevisionInstructionByTS(
+        utc_timestamps = datetime_series.dt.tz_localize("UTC")  # Convert to UTC
+        return {
+            file_uri: RevisionInstructionByTS(
                 how=RevisionSelectionByTS.BEFORE_OR_EQ, utc_timestamp=timestamp
             )
-        return revision_instructions_map
+            for file_uri, timestamp in zip(
+                df[self.gdrive_file_link_column_name].tolist(), utc_timestamps
+            )
+        }
 
     def generate_revision_instructions_map_from_revisions_in_urls(self, df):
-        gdrive_files_uris_to_prev_revisions = {}
-        for uri in df[self.gdrive_file_link_column_name]:
-            if "#revisionId=" in uri:
-                uri_parts = uri.split("#revisionId=")
-                gdrive_files_uris_to_prev_revisions[uri] = uri_parts[1].split("&")[0]
-            else:
-                gdrive_files_uris_to_prev_revisions[uri] = None
+        uris = df[self.gdrive_file_link_column_name]
+        # The text after the first '#revisionId=' up to the next '#revisionId=' or '&', NaN without one
+        revisions = uris.str.extract(REVISION_IN_URL, expand=False)
 
+        # Instructions don't change during selection, so one LATEST instruction serves every URI without a revision
+        latest = RevisionInstructionByTS(how=RevisionSelectionByTS.LATEST)
         revision_instructions_map = {}
-        for uri, rev in gdrive_files_uris_to_prev_revisions.items():
-            if rev is None:
-                instruction = RevisionInstructionByTS(how=RevisionSelectionByTS.LATEST)
-            else:
-                instruction = RevisionInstructionByRevId(
+        for uri, rev in zip(uris.tolist(), revisions.tolist()):
+            if isinstance(rev, str):
+                revision_instructions_map[uri] = RevisionInstructionByRevId(
                     how=RevisionSelectionByRevId.LATEST_NOT_EQ, revision_id=rev
                 )
-            revision_instructions_map[uri] = instruction
+            else:
+                revision_instructions_map[uri] = latest
         return revision_instructions_map
 
     def _load_data(self):
@@ -225,12 +230,23 @@ class DFConnector(InputConnectorInterface):
                 self.generate_revision_instructions_map_from_revisions_in_urls(df)
             )
 
+        self.close()
         # revision_instructions_map = construct revision_instructions_map
         gdrive_connector = GDriveConnector(
             gdrive_file_items,
             common_metadata=None,
             revision_instructions_map=revision_instructions_map,
             max_workers=self.max_workers,
+            lazy_content=self.lazy_content,
+            revision_cache=self.revision_cache,
+            sources_cache=self.sources_cache,
         )
         gdrive_connector.load_data()
         self._input_batch.items = gdrive_connector.get_data().items
+        # Kept for close(), lazy contents are downloaded by the connector's prefetcher
+        self._gdrive_connector = gdrive_connector
+
+    def close(self):
+        if self._gdrive_connector is not None:
+            self._gdrive_connector.close()
+            self._gdrive_connector = None
@@ -1,16 +1,89 @@
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
+
 from delivery_workflow.data_ingest.src.input_connectors.base import (
+    ContentFetchError,
     InputConnectorInterface,
     InputItem,
     InputItemMetadata,
     InputItemStatus,
+    LazyContent,
 )
 from delivery_workflow.data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
     DownloadStatus,
+    GDriveFile,
     GDriveRetriever,
     RevisionInstruction,
     RevisionInstructionByRevId,
     RevisionInstructionByTS,
 )
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.revision_cache import RevisionCache
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.sources_cache import SourcesCache
+
+
+class ContentPrefetcher:
+    """
+    Downloads the contents of lazily loaded files on a thread pool. When the
+    consumer reaches a file, the next `window` files in batch order are
+    downloaded ahead of it, so at most `window` contents wait unused in memory.
+    Call close() when the batch is discarded, to drop those contents and stop
+    the thread pool.
+    """
+
+    def __init__(self, retriever: GDriveRetriever, gdrive_files: list[GDriveFile], window: int, max_workers: int):
+        self.retriever = retriever
+        self.gdrive_files = gdrive_files
+        self.window = window
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        # Indexes of the files with lazy content, in batch order, and their positions in that list
+        self.lazy_indexes = []
+        self.positions = {}
+        # index -> Future of a download not yet handed to the consumer
+        self.pending: dict[int, Future] = {}
+        self.handed_over = set()
+        self.closed = False
+
+    def lazy_content(self, index: int) -> LazyContent:
+        self.positions[index] = len(self.lazy_indexes)
+        self.lazy_indexes.append(index)
+        return LazyContent(lambda: self.content(index))
+
+    def content(self, index: int) -> str:
+        position = self.positions[index]
+        for ahead in self.lazy_indexes[position + 1:position + 1 + self.window]:
+            self._submit(ahead)
+        gdrive_file = self._submit(index).result()
+        with self.lock:
+            self.pending.pop(index, None)
+            self.handed_over.add(index)
+        content, gdrive_file.content = gdrive_file.content, None
+        if gdrive_file.status == DownloadStatus.ERROR:
+            raise ContentFetchError(gdrive_file.status_not_ok_msg)
+        return content
+
+    def _submit(self, index: int) -> Future | None:
+        with self.lock:
+            if self.closed:
+                raise ContentFetchError("The connector was closed before the content was used.")
+            if index in self.handed_over:
+                return None
+            if index not in self.pending:
+                self.pending[index] = self.executor.submit(contextvars.copy_context().run, self.retriever.download, self.gdrive_files[index])
+            return self.pending[index]
+
+    def close(self):
+        """Cancels the downloads not handed over yet, drops the contents they already hold and stops the pool."""
+        with self.lock:
+            self.closed = True
+            pending, self.pending = self.pending, {}
+        for index, future in pending.items():
+            future.cancel()
+            # Runs at once for finished downloads, and when it ends for a running one
+            future.add_done_callback(lambda _, gdrive_file=self.gdrive_files[index]: setattr(gdrive_file, "content", None))
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 class GDriveConnector(InputConnectorInterface):
@@ -22,9 +95,24 @@ class GDriveConnector(InputConnectorInterface):
         | RevisionInstruction
         | None = None,
         max_workers=10,
+        lazy_content: bool = False,
+        prefetch: int | None = None,
+        revision_cache: RevisionCache | None = None,
+        sources_cache: SourcesCache | None = None,
         **params,
     ):
-        """gdrive_file_items must include file_uri, the rest is metadata or be a str"""
+        """
+        gdrive_file_items must include file_uri, the rest is metadata or be a str
+
+        lazy_content: if True, load_data() only resolves revisions. Each item's content is a
+            LazyContent downloaded when first used, with the next `prefetch` files (default
+            max_workers) downloaded ahead of it, so items dropped before use are never downloaded.
+            Call close() once the batch is no longer used, to release the downloads ahead.
+        revision_cache: a RevisionCache (see retrievers/revision_cache.py); files unchanged since
+            their revisions were cached are resolved without listing their revisions again.
+        sources_cache: a SourcesCache (see retrievers/sources_cache.py). Contents are then sources-only
+            notebooks, without outputs and attachments, read from the cache for revisions downloaded before.
+        """
         super().__init__(common_metadata, **params)
         self.gdrive_file_items = gdrive_file_items
 
@@ -32,6 +120,11 @@ class GDriveConnector(InputConnectorInterface):
 
         self.revision_instructions_map = revision_instructions_map
         self.max_workers = max_workers
+        self.lazy_content = lazy_content
+        self.prefetch = prefetch if prefetch is not None else max_workers
+        self.revision_cache = revision_cache
+        self.sources_cache = sources_cache
+        self._prefetcher = None
 
     def _parse_file_items(self):
         if self.gdrive_file_items and isinstance(self.gdrive_file_items[0], str):
@@ -45,14 +138,14 @@ class GDriveConnector(InputConnectorInterface):
             }
         return gdrive_files_uris, per_item_metadata
 
-    def _convert_gdrive_files_to_items(self, gdrive_files):
+    def _convert_gdrive_files_to_items(self, gdrive_files, prefetcher: ContentPrefetcher | None = None):
         status_map = {
             DownloadStatus.SKIPPED: InputItemStatus.SKIPPED,
             DownloadStatus.ERROR: InputItemStatus.ERROR,
             DownloadStatus.OK: InputItemStatus.OK,
         }
         items = []
-        for f in gdrive_files:
+        for index, f in enumerate(gdrive_files):
             metadata_dict = {
                 "original_uri": f.original_file_uri,
                 "file_id": f.file_id,
@@ -61,20 +154,61 @@ class GDriveConnector(InputConnectorInterface):
             }
             if f.status_not_ok_msg:
                 metadata_dict["input_status_not_ok_msg"] = f.status_not_ok_msg
+            if f.failure is not None:
+                metadata_dict["input_failure_reason"] = f.failure.reason.value
             if self._per_item_metadata is not None:
                 metadata_dict.update(self._per_item_metadata[f.original_file_uri])
 
             status = status_map[f.status]
             metadata = InputItemMetadata(status=status, data=metadata_dict)
-            file_data = InputItem(content=f.content, metadata=metadata)
+            content = f.content
+            if prefetcher is not None and f.status == DownloadStatus.OK:
+                content = prefetcher.lazy_content(index)
+            file_data = InputItem(content=content, metadata=metadata)
             items.append(file_data)
         return items
 
-    def _load_data(self):
-        retriever = GDriveRetriever(
+    def _retriever(self) -> GDriveRetriever:
+        return GDriveRetriever(
             self._gdrive_files_uris,
             revision_instructions_map=self.revision_instructions_map,
             max_workers=self.max_workers,
+            revision_cache=self.revision_cache,
+            sources_cache=self.sources_cache,
         )
-        gdrive_files = retriever.retrieve()
-        self._input_batch.items = self._convert_gdrive_files_to_items(gdrive_files)
+
+    def iter_items(self, window: int | None = None) -> Iterator[InputItem]:
+        """
+        Streams the items in batch order without loading the batch: revisions are
+        resolved first, then each item is yielded once its content is downloaded,
+        with at most `window` files downloaded ahead (see GDriveRetriever.iter_files_with_content).
+        """
+        retriever = self._retriever()
+        retriever.retrieve(download_content=False)
+        for f in retriever.iter_files_with_content(window):
+            item = self._convert_gdrive_files_to_items([f])[0]
+            # The item holds the content now, the retriever keeps only the file's metadata
+            f.content = None
+            yield item
+
+    def _load_data(self):
+        retriever = self._retriever()
+        if not self.lazy_content:
+            gdrive_files = retriever.retrieve()
+            self._input_batch.items = self._convert_gdrive_files_to_items(gdrive_files)
+            return
+
+        gdrive_files = retriever.retrieve(download_content=False)
+        for f in gdrive_files:
+            if f.file_id is None:
+                # Marks the file ERROR without a download
+                retriever.download(f)
+        # A reload replaces the batch, so the downloads ahead for the previous one are not needed
+        self.close()
+        self._prefetcher = ContentPrefetcher(retriever, gdrive_files, self.prefetch, self.max_workers)
+        self._input_batch.items = self._convert_gdrive_files_to_items(gdrive_files, self._prefetcher)
+
+    def close(self):
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
@@ -1,14 +1,14 @@
 import copy
 from datetime import timedelta
 
-import pandas as pd
-
-from delivery_workflow.data_ingest.src.gdrive_utils.sheet_utils import download_sheet_as_df
+from delivery_workflow.data_ingest.src.gdrive_utils.sheet_utils import download_sheets_as_df
 from delivery_workflow.data_ingest.src.input_connectors.base import InputConnectorInterface
 from delivery_workflow.data_ingest.src.input_connectors.df_conn import DFConnector
 from delivery_workflow.data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
     RevisionInstruction,
 )
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.revision_cache import RevisionCache
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.sources_cache import SourcesCache
 import os
 
 GOOGLE_API_CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS")
@@ -33,6 +33,9 @@ class GSheetsConnector(InputConnectorInterface):
         ) = None,
         # general
         max_workers=10,
+        lazy_content: bool = False,
+        revision_cache: RevisionCache | None = None,
+        sources_cache: SourcesCache | None = None,
         **params,
     ):
         """
@@ -61,6 +64,14 @@ class GSheetsConnector(InputConnectorInterface):
         revision_instructions_map: a map or a single default value for all items. A map is a dict initial_url->RevisionInstruction().
             See src/input_connectors/retrievers/gdrive_retriever.py for more on the instructions format.
 
+        # General
+
+        max_workers: number of concurrent Google Drive requests.
+        lazy_content: if True, notebooks are downloaded when their content is first used instead of up front
+            (see GDriveConnector).
+        revision_cache: a RevisionCache to reuse revision lists of files unchanged since an earlier run.
+        sources_cache: a SourcesCache; contents are then sources-only notebooks without outputs (see GDriveConnector).
+
         Specified columns must be present. rows with nan values for specified columns will be dropped
         """
         super().__init__(common_metadata, **params)
@@ -78,6 +89,10 @@ class GSheetsConnector(InputConnectorInterface):
             fetch_latest_revision_or_skip_if_url_contains_same_rev
         )
         self.max_workers = max_workers
+        self.lazy_content = lazy_content
+        self.revision_cache = revision_cache
+        self.sources_cache = sources_cache
+        self._df_connector = None
 
         if (
             bool(revision_instructions_map)
@@ -97,16 +112,12 @@ class GSheetsConnector(InputConnectorInterface):
             )
 
     def _load_data(self):
-        dataframes = []
-        for sheet_name in self.sheet_names:
-            df = download_sheet_as_df(
-                GOOGLE_API_CREDENTIALS_PATH, self.sheet_id, sheet_name
-            )
-            df["__src_sheet_name"] = sheet_name
-            dataframes.append(df)
-
-        input_df = pd.concat(dataframes, ignore_index=True)
+        # All the sheets in a single request
+        input_df = download_sheets_as_df(
+            GOOGLE_API_CREDENTIALS_PATH, self.sheet_id, self.sheet_names, sheet_name_column="__src_sheet_name"
+        )
         input_df['colab_task_link']=input_df['colab_task_link'].str.strip()
+        self.close()
         df_connector = DFConnector(
             input_df=input_df,
             gdrive_file_link_column_name=self.gdrive_file_link_column_name,
@@ -117,6 +128,15 @@ class GSheetsConnector(InputConnectorInterface):
             fetch_latest_revision_or_skip_if_url_contains_same_rev=self.fetch_latest_revision_or_skip_if_url_contains_same_rev,
             revision_instructions_map=self.revision_instructions_map,
             max_workers=self.max_workers,
+            lazy_content=self.lazy_content,
+            revision_cache=self.revision_cache,
+            sources_cache=self.sources_cache,
         )
         df_connector.load_data()
         self._input_batch.items = df_connector.get_data().items
+        self._df_connector = df_connector
+
+    def close(self):
+        if self._df_connector is not None:
+            self._df_connector.close()
+            self._df_connector = None
@@ -2,7 +2,7 @@ import os
 import pickle
 
 DATA_DIR = os.path.join(os.getcwd(), "data")
-from delivery_workflow.data_ingest.src.input_connectors.base import InputConnectorInterface
+from delivery_workflow.data_ingest.src.input_connectors.base import InputBatch, InputConnectorInterface
 
 
 class PickleConnector(InputConnectorInterface):
@@ -17,6 +17,8 @@ class PickleConnector(InputConnectorInterface):
         full_path = os.path.join(DATA_DIR, self.relative_file_path)
         try:
             with open(full_path, "rb") as file:
-                self._input_batch = pickle.load(file)
+                data = pickle.load(file)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found at path: {full_path}")
+        # save_data() pickles the serialized batch
+        self._input_batch = InputBatch.deserialize(data) if isinstance(data, dict) else data
@@ -7,3 +7,5 @@ from delivery_workflow.data_ingest.src.input_connectors.retrievers.gdrive_retrie
     RevisionSelectionByRevId,
     RevisionSelectionByTS,
 )
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.revision_cache import RevisionCache
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.sources_cache import SourcesCache
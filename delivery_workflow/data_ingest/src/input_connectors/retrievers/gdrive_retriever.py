@@ -1,18 +1,30 @@
+import contextvars
 import copy
 import io
+import threading
 import traceback
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
+import numpy as np
 import pandas as pd
 from googleapiclient.http import MediaIoBaseDownload
 from tqdm.auto import tqdm
 
 from delivery_workflow.data_ingest.src.gdrive_utils.auth import build_services
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.revision_cache import (
+    HEAD_FIELDS,
+    RevisionCache,
+)
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.sources_cache import (
+    SourcesCache,
+    strip_notebook,
+)
 
 
 class DownloadStatus(Enum):
@@ -21,6 +33,22 @@ class DownloadStatus(Enum):
     SKIPPED = "SKIPPED"
 
 
+class FailureReason(Enum):
+    """Why a file ended up ERROR or SKIPPED."""
+
+    NO_FILE_ID = "no_file_id"
+    REVISION_NOT_SATISFIED = "revision_not_satisfied"
+    DOWNLOAD_FAILED = "download_failed"
+
+
+@dataclass
+class DownloadFailure:
+    reason: FailureReason
+    # Class name of the exception, if one was raised
+    error_type: str | None = None
+    message: str | None = None
+
+
 @dataclass(eq=True)
 class GDriveFile:
     file_id: str | None
@@ -30,6 +58,7 @@ class GDriveFile:
     revision_timestamp: datetime | None = None
     status: DownloadStatus = DownloadStatus.OK
     status_not_ok_msg: str | None = None
+    failure: DownloadFailure | None = None
 
 
 class RevisionSelectionByTS(Enum):
@@ -60,6 +89,77 @@ class RevisionSelectionByRevId(Enum):
     LATEST_NOT_EQ = "latest_not_eq"
 
 
+# Files whose parsed revisions are kept for reuse by later instructions
+REVISION_TIMELINE_CACHE_SIZE = 4096
+
+
+def _utc_datetime64(timestamp) -> np.datetime64:
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.to_datetime64()
+
+
+class RevisionTimeline:
+    """
+    The revisions of a file from latest to oldest, with their modifiedTime parsed
+    once into an ascending datetime64 array so timestamp lookups are a searchsorted.
+    Timelines are cached per file ID (see of()).
+    """
+
+    __slots__ = ("key", "revisions", "times")
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, revisions: list[dict]):
+        self.key = self.cache_key(revisions)
+        self.revisions = sorted(revisions, key=lambda r: r["modifiedTime"], reverse=True)
+        times = pd.to_datetime(
+            [revision["modifiedTime"] for revision in reversed(self.revisions)], utc=True, format="ISO8601"
+        )
+        self.times = times.tz_localize(None).to_numpy()
+
+    @staticmethod
+    def cache_key(revisions: list[dict]) -> tuple:
+        # Revisions are only ever added or removed, which changes the count or the ends of the list
+        if not revisions:
+            return (0,)
+        return len(revisions), revisions[0]["id"], revisions[-1]["id"], revisions[-1]["modifiedTime"]
+
+    @classmethod
+    def of(cls, revisions: list[dict], file_id: str | None = None) -> "RevisionTimeline":
+        """The timeline of the revisions, reused from the cache while the file's revisions are unchanged."""
+        if file_id is None:
+            return cls(revisions)
+        key = cls.cache_key(revisions)
+        with cls._cache_lock:
+            timeline = cls._cache.get(file_id)
+            if timeline is not None and timeline.key == key:
+                cls._cache.move_to_end(file_id)
+                return timeline
+        timeline = cls(revisions)
+        with cls._cache_lock:
+            cls._cache[file_id] = timeline
+            cls._cache.move_to_end(file_id)
+            while len(cls._cache) > REVISION_TIMELINE_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return timeline
+
+    @property
+    def latest(self) -> dict:
+        return self.revisions[0]
+
+    def before_or_eq(self, utc_timestamp) -> dict | None:
+        """The latest revision modified at or before the timestamp."""
+        index = int(np.searchsorted(self.times, _utc_datetime64(utc_timestamp), side="right")) - 1
+        return self.revisions[len(self.revisions) - 1 - index] if index >= 0 else None
+
+    def after_or_eq(self, utc_timestamp) -> dict | None:
+        """The oldest revision modified at or after the timestamp."""
+        index = int(np.searchsorted(self.times, _utc_datetime64(utc_timestamp), side="left"))
+        return self.revisions[len(self.revisions) - 1 - index] if index < len(self.revisions) else None
+
+
 @dataclass
 class RevisionInstruction(ABC):
     @abstractmethod
@@ -86,43 +186,30 @@ class RevisionInstructionByTS(RevisionInstruction):
     utc_timestamp: datetime | None = None
 
     def select_revision(self, revisions: list[dict], **params) -> dict | None:
-        # Implement the logic to select a revision based on timestamp here
-        revisions.sort(key=lambda r: r["modifiedTime"], reverse=True)
+        timeline = RevisionTimeline.of(revisions, params.get("file_id"))
 
         if self.how == RevisionSelectionByTS.LATEST:
-            return revisions[0]
+            return timeline.latest
         if self.utc_timestamp is None:
             raise NotImplementedError(
                 "The specified revision selection method is not supported."
             )
         if self.how == RevisionSelectionByTS.BEFORE_OR_EQ:
-            utc_cutoff_timestamp = self.utc_timestamp
-
-            # Sorted desc
-            for revision in revisions:
-                # Convert the modifiedTime of the revision to a datetime object
-                modified_time = pd.to_datetime(revision["modifiedTime"], utc=True)
-
-                if modified_time <= utc_cutoff_timestamp:
-                    return revision
+            revision = timeline.before_or_eq(self.utc_timestamp)
+            if revision is not None:
+                return revision
             print(
-                f"Asked to find a revision before timestamp {utc_cutoff_timestamp} but it was not found. Returning latest!"
+                f"Asked to find a revision before timestamp {self.utc_timestamp} but it was not found. Returning latest!"
             )
-            return {**revisions[0], "failed_to_satisfy": True}
+            return {**timeline.latest, "failed_to_satisfy": True}
         elif self.how == RevisionSelectionByTS.AFTER_OR_EQ:
-            utc_cutoff_timestamp = self.utc_timestamp
-
-            # Sorted desc, reversing it
-            for revision in reversed(revisions):
-                # Convert the modifiedTime of the revision to a datetime object
-                modified_time = pd.to_datetime(revision["modifiedTime"], utc=True)
-
-                if modified_time >= utc_cutoff_timestamp:
-                    return revision
+            revision = timeline.after_or_eq(self.utc_timestamp)
+            if revision is not None:
+                return revision
             print(
-                f"Asked to find a revision after timestamp {utc_cutoff_timestamp} but it was not found. Returning latest!"
+                f"Asked to find a revision after timestamp {self.utc_timestamp} but it was not found. Returning latest!"
             )
-            return {**revisions[0], "failed_to_satisfy": True}
+            return {**timeline.latest, "failed_to_satisfy": True}
         else:
             raise NotImplementedError(
                 "This revision selection method is not implemented."
@@ -158,6 +245,49 @@ class RevisionInstructionByRevId(RevisionInstruction):
             )
 
 
+class RequestCoalescer:
+    """
+    Runs a request once per key however many callers ask for it at the same time:
+    callers of a key in flight wait for its result (or exception) instead of repeating it.
+    A result is kept for the number of callers announced with expect(), then released;
+    keys without announced callers are only shared while in flight.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures: dict[Any, Future] = {}
+        self.remaining = Counter()
+        # Calls answered by another caller's request
+        self.coalesced = 0
+
+    def expect(self, key, callers: int):
+        with self.lock:
+            self.remaining[key] += callers
+
+    def call(self, key, request: Callable, *args):
+        with self.lock:
+            future = self.futures.get(key)
+            owner = future is None
+            if owner:
+                future = self.futures[key] = Future()
+            else:
+                self.coalesced += 1
+        if owner:
+            try:
+                future.set_result(request(*args))
+            except Exception as e:
+                future.set_exception(e)
+        try:
+            return future.result()
+        finally:
+            with self.lock:
+                self.remaining[key] -= 1
+                if self.remaining[key] <= 0:
+                    del self.remaining[key]
+                    if self.futures.get(key) is future:
+                        del self.futures[key]
+
+
 class GDriveRetriever:
     def __init__(
         self,
@@ -166,8 +296,15 @@ class GDriveRetriever:
             dict[str, RevisionInstruction] | RevisionInstruction | None
         ) = None,
         max_workers: int = 10,
+        revision_cache: RevisionCache | None = None,
+        sources_cache: SourcesCache | None = None,
     ):
-        """Revision instuctions that evaluate to failed will force the retriever to skip dowloading these files and mark them as SKIPPED."""
+        """
+        Revision instuctions that evaluate to failed will force the retriever to skip dowloading these files and mark them as SKIPPED.
+        With a revision_cache, the revision list of a file is only fetched when the file changed since it was cached.
+        With a sources_cache, contents are sources-only notebooks without outputs (see sources_cache.strip_notebook),
+        read from the cache when the revision was downloaded before and cached after the download otherwise.
+        """
         if isinstance(revision_instructions_map, RevisionInstruction):
             revision_instructions_map = {"default": revision_instructions_map}
 
@@ -195,6 +332,13 @@ class GDriveRetriever:
         self.gdrive_files = gdrive_files
 
         self.max_workers = max_workers
+        self.revision_cache = revision_cache
+        self.sources_cache = sources_cache
+        self._local = threading.local()
+        # URIs that differ only in their suffix share the file ID, so each revision list
+        # and each (file ID, revision ID) content is requested once and fanned out
+        self._revision_requests = RequestCoalescer()
+        self._download_requests = RequestCoalescer()
 
     def parse_uri_to_ids(self, uris: list[str]) -> dict[str, str | None]:
         """
@@ -223,30 +367,67 @@ class GDriveRetriever:
                 uri_to_file_id[uri] = None
         return uri_to_file_id
 
+    def download(self, gdrive_file: GDriveFile) -> GDriveFile:
+        """Downloads the content of one file at its selected revision. Failures set the file status to ERROR."""
+        return self._download_file(gdrive_file)
+
+    def _drive_service(self):
+        """A Drive client per thread, so downloads don't rebuild the credentials and client every time."""
+        drive_service = getattr(self._local, "drive_service", None)
+        if drive_service is None:
+            drive_service = build_services(services=["drive"])["drive"]
+            self._local.drive_service = drive_service
+        return drive_service
+
     def _download_file(self, gdrive_file: GDriveFile) -> GDriveFile:
         if gdrive_file.file_id is None:
             gdrive_file.status = DownloadStatus.ERROR
             gdrive_file.status_not_ok_msg = "File id was not provided."
+            gdrive_file.failure = DownloadFailure(FailureReason.NO_FILE_ID, message=gdrive_file.status_not_ok_msg)
             return gdrive_file
         try:
-            gdrive_file.content = self.__download_file(
-                gdrive_file.file_id, gdrive_file.revision_id
+            gdrive_file.content = self._download_requests.call(
+                (gdrive_file.file_id, gdrive_file.revision_id),
+                self._fetch_content,
+                gdrive_file.file_id,
+                gdrive_file.revision_id,
             )
         except Exception as e:
-            gdrive_file.status = DownloadStatus.ERROR
-            gdrive_file.status_not_ok_msg = (
-                f"Download failed with error: {e.__class__.__name__}: {str(e)}"
-            )
-            print(gdrive_file.status_not_ok_msg)
+            self._mark_download_failed(gdrive_file, e)
         return gdrive_file
 
+    def _fetch_content(self, file_id: str, revision_id: str | None) -> str:
+        if self.sources_cache is None:
+            return self.__download_file(file_id, revision_id)
+        content = self.sources_cache.get(file_id, revision_id)
+        if content is not None:
+            return content
+        content = self.__download_file(file_id, revision_id)
+        try:
+            content = strip_notebook(content)
+        except ValueError as e:
+            # Not a notebook, kept as downloaded
+            print(f"Not caching the sources of file {file_id}: {e.__class__.__name__}: {str(e)}")
+            return content
+        self.sources_cache.put(file_id, revision_id, content)
+        return content
+
+    @staticmethod
+    def _mark_download_failed(gdrive_file: GDriveFile, e: Exception):
+        gdrive_file.status = DownloadStatus.ERROR
+        gdrive_file.status_not_ok_msg = (
+            f"Download failed with error: {e.__class__.__name__}: {str(e)}"
+        )
+        gdrive_file.failure = DownloadFailure(FailureReason.DOWNLOAD_FAILED, e.__class__.__name__, str(e))
+        print(gdrive_file.status_not_ok_msg)
+
     def __download_file(self, file_id: str, revision_id: str | None) -> str:
         """
         Downloads a notebook from Google Drive using a file ID and a revision ID.
         Returns a dictionary with the file ID and the parsed notebook content.
         """
 
-        drive_service = build_services(services=["drive"])["drive"]
+        drive_service = self._drive_service()
         # Request to download the file
         # Request to download the file, optionally specifying a revision
         if revision_id is not None:
@@ -270,18 +451,65 @@ class GDriveRetriever:
         file_content = fh.read().decode("utf-8")
         return file_content
 
-    def populate_files_with_content(self):
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
+    def iter_files_with_content(self, window: int | None = None, ordered: bool = True) -> Iterator[GDriveFile]:
+        """
+        Downloads the contents of the files and yields each file once it is done,
+        SKIPPED files without a download. At most `window` (default 2 * max_workers)
+        files are submitted and not yet yielded, so memory doesn't grow with the batch
+        as long as the consumer drops each content after use (e.g. sets it to None).
+        With ordered=True files are yielded in batch order, otherwise as they complete.
+        Failed files are yielded with status ERROR and their failure set.
+        Closing the generator early cancels the downloads not started yet.
+        """
+        window = max(1, window or 2 * self.max_workers)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if ordered:
+                pending = deque()
+                for gdrive_file in self.gdrive_files:
+                    if len(pending) >= window:
+                        yield self._completed(*pending.popleft())
+                    future = None
+                    if gdrive_file.status != DownloadStatus.SKIPPED:
+                        future = executor.submit(contextvars.copy_context().run, self._download_file, gdrive_file)
+                    pending.append((gdrive_file, future))
+                while pending:
+                    yield self._completed(*pending.popleft())
+                return
+
+            in_flight: dict[Future, GDriveFile] = {}
             for gdrive_file in self.gdrive_files:
-                if gdrive_file.status != DownloadStatus.SKIPPED:
-                    future = executor.submit(self._download_file, gdrive_file)
-                    futures.append(future)
-            for future in tqdm(futures, desc="Loading file contents"):
-                try:
-                    result = future.result()
-                except Exception as e:
-                    print(f"Failed to download file: {e.__class__.__name__}: {str(e)}")
+                if gdrive_file.status == DownloadStatus.SKIPPED:
+                    yield gdrive_file
+                    continue
+                while len(in_flight) >= window:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._completed(in_flight.pop(future), future)
+                in_flight[executor.submit(contextvars.copy_context().run, self._download_file, gdrive_file)] = gdrive_file
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._completed(in_flight.pop(future), future)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _completed(self, gdrive_file: GDriveFile, future: Future | None) -> GDriveFile:
+        if future is not None:
+            try:
+                future.result()
+            except Exception as e:
+                self._mark_download_failed(gdrive_file, e)
+        return gdrive_file
+
+    def populate_files_with_content(self, window: int | None = None):
+        files = self.iter_files_with_content(window)
+        for _ in tqdm(files, total=len(self.gdrive_files), desc="Loading file contents"):
+            pass
+
+    def failures(self) -> list[GDriveFile]:
+        """The files that are ERROR or SKIPPED, with the reason in their failure."""
+        return [gdrive_file for gdrive_file in self.gdrive_files if gdrive_file.status != DownloadStatus.OK]
 
     def _get_all_revisions(self, service, file_id, fields="id,modifiedTime"):
         try:
@@ -299,18 +527,48 @@ class GDriveRetriever:
             # traceback.print_exc()
             return None
 
+    def _get_revisions(self, service, file_id):
+        """All revisions of the file, from the revision cache while the file's head revision is unchanged."""
+        if self.revision_cache is None:
+            return self._get_all_revisions(service, file_id)
+        try:
+            file = service.files().get(fileId=file_id, fields=HEAD_FIELDS).execute()
+        except Exception as e:
+            print(
+                f"Error for file: {file_id}.\n Error: {e.__class__.__name__}: {str(e)}"
+            )
+            return None
+        revisions = self.revision_cache.get(file_id, file)
+        if revisions is None:
+            revisions = self._get_all_revisions(service, file_id)
+            if revisions is not None:
+                self.revision_cache.set(file_id, file, revisions)
+        return revisions
+
     def get_revision(
         self, file_id: str, revision_instruction: RevisionInstruction
     ) -> dict | None:
-        drive_service = build_services(services=["drive"])["drive"]
-        # Get the revisions of the file
-        revisions = self._get_all_revisions(drive_service, file_id)
+        drive_service = self._drive_service()
+        # Get the revisions of the file, once for all the URIs of the file
+        revisions = self._revision_requests.call(file_id, self._get_revisions, drive_service, file_id)
         if revisions is None:
             return None
-        return revision_instruction.select_revision(revisions, file_id=file_id)
+        # A copy, instructions may sort the list they are given
+        return revision_instruction.select_revision(list(revisions), file_id=file_id)
+
+    @staticmethod
+    def _expect_shared(coalescer: RequestCoalescer, keys: list):
+        """Keeps the results of keys requested by several files until each of them got it."""
+        for key, callers in Counter(keys).items():
+            if callers > 1:
+                coalescer.expect(key, callers)
 
     def populate_files_with_revisions(self):
-        results = {}
+        self._revision_requests = RequestCoalescer()
+        self._expect_shared(
+            self._revision_requests,
+            [gdrive_file.file_id for gdrive_file in self.gdrive_files if gdrive_file.file_id is not None],
+        )
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             futures = []
             for gdrive_file in self.gdrive_files:
@@ -322,6 +580,7 @@ class GDriveRetriever:
                     self.revision_instructions_map["default"],
                 )
                 future = executor.submit(
+                    contextvars.copy_context().run,
                     self.get_revision, gdrive_file.file_id, revision_instruction
                 )
                 futures.append({"gdrive_file": gdrive_file, "revision": future})
@@ -336,14 +595,32 @@ class GDriveRetriever:
                         gdrive_file.status_not_ok_msg = (
                             "Failed to satisfy revision instruction."
                         )
+                        gdrive_file.failure = DownloadFailure(
+                            FailureReason.REVISION_NOT_SATISFIED,
+                            message=f"Latest revision: {revision.get('id')}",
+                        )
                 except Exception as e:
                     print(
                         f"An error occurred while getting the result from the revision id getter future: {e.__class__.__name__}: {str(e)}"
                     )
-        return results
-
-    def retrieve(self) -> list[GDriveFile]:
-        """Retrieves the files with necessary revision ids."""
+        self._download_requests = RequestCoalescer()
+        self._expect_shared(
+            self._download_requests,
+            [
+                (gdrive_file.file_id, gdrive_file.revision_id)
+                for gdrive_file in self.gdrive_files
+                if gdrive_file.file_id is not None and gdrive_file.status != DownloadStatus.SKIPPED
+            ],
+        )
+
+    def retrieve(self, download_content: bool = True) -> list[GDriveFile]:
+        """
+        Retrieves the files with necessary revision ids. With download_content=False
+        the contents are not downloaded; download() fetches them one file at a time.
+        """
         self.populate_files_with_revisions()
-        self.populate_files_with_content()
+        if self.revision_cache is not None:
+            self.revision_cache.save()
+        if download_content:
+            self.populate_files_with_content()
         return self.gdrive_files
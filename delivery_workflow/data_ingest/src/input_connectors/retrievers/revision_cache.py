@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+FORMAT_VERSION = 1
+# File fields fetched to revalidate a cached revision list
+HEAD_FIELDS = "headRevisionId,modifiedTime"
+
+
+class RevisionCache:
+    """
+    Revision lists of Google Drive files kept between runs in a JSON file.
+
+    Revision history only grows, so a list fetched earlier is still complete
+    while the file's headRevisionId and modifiedTime are those it was fetched
+    at. The retriever checks them with a files.get of HEAD_FIELDS and fetches
+    the full list only for files that changed. Entries older than `max_age`
+    are fetched again too, as Drive purges old revisions over time.
+    Thread-safe; call save() to write the changes.
+    """
+
+    def __init__(self, path: str, max_age: timedelta | None = timedelta(days=1)):
+        self.path = path
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self._entries = self._load()
+        self._changed = False
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable revision cache at path: {self.path}: {e.__class__.__name__}: {str(e)}")
+            return {}
+        if stored.get("format_version") != FORMAT_VERSION:
+            print(f"Ignoring revision cache of format version {stored.get('format_version')} at path: {self.path}")
+            return {}
+        return stored["files"]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _head(file: dict) -> list:
+        return [file.get("headRevisionId"), file.get("modifiedTime")]
+
+    def get(self, file_id: str, file: dict) -> list[dict] | None:
+        """
+        The cached revisions of the file, or None if they have to be fetched.
+        `file` is the file's metadata with HEAD_FIELDS.
+        """
+        with self.lock:
+            entry = self._entries.get(file_id)
+        if entry is None or entry["head"] != self._head(file):
+            return None
+        if self.max_age is not None:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"])
+            if datetime.now(timezone.utc) - fetched_at > self.max_age:
+                return None
+        # A copy, the instructions may sort the list they are given
+        return list(entry["revisions"])
+
+    def set(self, file_id: str, file: dict, revisions: list[dict]):
+        """Stores the revisions of the file, fetched when its metadata was `file`."""
+        entry = {
+            "head": self._head(file),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "revisions": list(revisions),
+        }
+        with self.lock:
+            self._entries[file_id] = entry
+            self._changed = True
+
+    def save(self):
+        with self.lock:
+            if not self._changed:
+                return
+            stored = {"format_version": FORMAT_VERSION, "files": dict(self._entries)}
+            self._changed = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file first so a crash never leaves a half-written cache
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(self.path + ".tmp", self.path)
@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+# Notebook metadata that only matters to a notebook front end, e.g. the state of every widget
+DROPPED_NOTEBOOK_METADATA = ("widgets",)
+# Anything but characters safe in a file name
+UNSAFE_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_.=-]")
+
+
+def strip_notebook(content: str) -> str:
+    """
+    The sources-only form of an .ipynb: the cells keep their type, source,
+    id and metadata, code cells lose their outputs and execution counts and
+    markdown cells their attachments (inline images). The result is still a
+    valid notebook for nbformat and json readers, serialized compactly.
+    Raises ValueError if the content is not a notebook.
+    """
+    notebook = json.loads(content)
+    if not isinstance(notebook, dict) or not isinstance(notebook.get("cells"), list):
+        raise ValueError("Content is not a notebook, it has no list of cells.")
+    cells = []
+    for cell in notebook["cells"]:
+        stripped = {key: cell[key] for key in ("cell_type", "id", "metadata", "source") if key in cell}
+        if cell.get("cell_type") == "code":
+            stripped["execution_count"] = None
+            stripped["outputs"] = []
+        cells.append(stripped)
+    metadata = {
+        key: value
+        for key, value in notebook.get("metadata", {}).items()
+        if key not in DROPPED_NOTEBOOK_METADATA
+    }
+    stripped_notebook = {
+        "nbformat": notebook.get("nbformat", 4),
+        "nbformat_minor": notebook.get("nbformat_minor", 0),
+        "metadata": metadata,
+        "cells": cells,
+    }
+    return json.dumps(stripped_notebook, ensure_ascii=False, separators=(",", ":"))
+
+
+class SourcesCache:
+    """
+    Sources-only notebooks (see strip_notebook) stored under `directory`, one
+    file per file ID and revision ID. A revision never changes, so an entry is
+    valid for good; only notebooks with a resolved revision ID are cached.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, file_id: str, revision_id: str) -> str:
+        return os.path.join(
+            self.directory,
+            UNSAFE_NAME_CHARACTERS.sub("_", file_id),
+            UNSAFE_NAME_CHARACTERS.sub("_", revision_id) + ".ipynb",
+        )
+
+    def get(self, file_id: str, revision_id: str | None) -> str | None:
+        if revision_id is None:
+            return None
+        try:
+            with open(self.path(file_id, revision_id), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, file_id: str, revision_id: str | None, stripped_content: str):
+        if revision_id is None:
+            return
+        path = self.path(file_id, revision_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written to a temporary file first so a crash never leaves a half-written notebook
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(stripped_content)
+        os.replace(temporary_path, path)
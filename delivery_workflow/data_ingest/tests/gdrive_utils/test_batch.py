@@ -0,0 +1,102 @@
+import json
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from data_ingest.src.gdrive_utils import batch as batch_module
+from data_ingest.src.gdrive_utils.batch import RateLimiter, _is_retryable, execute_batched
+
+
+def test_rate_limiter_charges_every_call_of_a_batch():
+    limiter = RateLimiter(requests_per_second=100, burst=10)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire(20)
+    elapsed = time.monotonic() - start
+    # 100 calls with 10 in the bucket: the other 90 take 0.9s at 100 calls per second
+    assert 0.85 <= elapsed < 2
+
+
+def test_rate_limiter_allows_a_burst():
+    limiter = RateLimiter(requests_per_second=10, burst=10)
+    start = time.monotonic()
+    limiter.acquire(10)
+    assert time.monotonic() - start < 0.05
+
+
+def http_error(status, reason):
+    content = json.dumps({"error": {"code": status, "message": reason, "errors": [{"domain": "usageLimits", "reason": reason}]}})
+    return HttpError(httplib2.Response({"status": status}), content.encode("utf-8"))
+
+
+def test_only_rate_limit_403s_are_retried():
+    assert _is_retryable(http_error(403, "userRateLimitExceeded"))
+    assert _is_retryable(http_error(403, "rateLimitExceeded"))
+    assert not _is_retryable(http_error(403, "insufficientFilePermissions"))
+    assert not _is_retryable(HttpError(httplib2.Response({"status": 403}), b"Forbidden"))
+    assert _is_retryable(http_error(429, "rateLimitExceeded"))
+    assert not _is_retryable(http_error(404, "notFound"))
+    assert _is_retryable(httplib2.ServerNotFoundError("Unable to find the server"))
+    assert _is_retryable(ConnectionResetError())
+
+
+class FlakyBatchService:
+    """A service whose batch requests fail as a whole for the first `failures` sends."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.sent = 0
+
+    def new_batch_http_request(self, callback):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append((request, request_id))
+
+            def execute(self):
+                service.sent += 1
+                if service.sent <= service.failures:
+                    raise service.error
+                for request, request_id in self.requests:
+                    callback(request_id, {"id": request}, None)
+
+        return Batch()
+
+
+def test_failed_batch_requests_are_retried(monkeypatch):
+    delays = []
+    monkeypatch.setattr(batch_module.time, "sleep", delays.append)
+    service = FlakyBatchService(2, http_error(503, "backendError"))
+
+    results = execute_batched(service, ["a", "b", "c"], batch_size=2)
+
+    assert results == [({"id": "a"}, None), ({"id": "b"}, None), ({"id": "c"}, None)]
+    # Both chunks failed once, so both were sent again after a backoff
+    assert service.sent == 4
+    assert delays == [2]
+
+
+def test_batch_errors_are_returned_once_the_retries_run_out(monkeypatch):
+    monkeypatch.setattr(batch_module.time, "sleep", lambda delay: None)
+    error = httplib2.ServerNotFoundError("Unable to find the server")
+    service = FlakyBatchService(100, error)
+
+    results = execute_batched(service, ["a", "b"], max_retries=2)
+
+    assert results == [(None, error), (None, error)]
+    assert service.sent == 3
+
+
+def test_batch_errors_that_are_not_retryable_are_returned_at_once(monkeypatch):
+    monkeypatch.setattr(batch_module.time, "sleep", lambda delay: None)
+    error = http_error(400, "badRequest")
+    service = FlakyBatchService(100, error)
+
+    assert execute_batched(service, ["a"]) == [(None, error)]
+    assert service.sent == 1
@@ -0,0 +1,134 @@
+from data_ingest.src.gdrive_utils.auth import build_services
+from data_ingest.src.gdrive_utils.batch import RateLimiter
+from data_ingest.src.gdrive_utils.folder_clone import clone_contents, clone_drive_folder
+from data_ingest.src.gdrive_utils.utils import FOLDER_MIME_TYPE
+from delivery_workflow.benchmarks.fake_google import FakeGoogleServer
+
+
+def add_source_tree(drive):
+    """source/{a.json, b.json, sub/{c.json, deeper/d.json}}"""
+    source = drive.add_folder("source")
+    drive.add_file("a.json", '{"a": 1}', source)
+    drive.add_file("b.json", '{"b": 2}', source)
+    sub = drive.add_folder("sub", source)
+    drive.add_file("c.json", '{"c": 3}', sub)
+    deeper = drive.add_folder("deeper", sub)
+    drive.add_file("d.json", '{"d": 4}', deeper)
+    return source
+
+
+def tree(drive, folder_id):
+    """The files under a folder as {path: content}, folders as {path: None}."""
+    paths = {}
+    for file in drive.query(f"'{folder_id}' in parents and trashed = false"):
+        if file["mimeType"] == FOLDER_MIME_TYPE:
+            paths[file["name"]] = None
+            for path, content in tree(drive, file["id"]).items():
+                paths[f"{file['name']}/{path}"] = content
+        else:
+            paths[file["name"]] = drive.content(file["id"])
+    return paths
+
+
+def test_clone_copies_the_whole_tree(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+
+    summary = clone_contents(drive_service, source, destination, rate_limiter=RateLimiter(1000))
+
+    assert summary == {"folders_created": 2, "files_copied": 4, "files_skipped": 0, "failed": []}
+    assert tree(drive, destination) == tree(drive, source)
+
+
+def test_resume_copies_only_what_is_missing(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+    # An interrupted clone: the top level and the subfolder were copied, c.json is
+    # missing and b.json was copied with other content
+    drive.add_file("a.json", '{"a": 1}', destination)
+    drive.add_file("b.json", '{"b": "partial"}', destination)
+    drive.add_folder("sub", destination)
+
+    summary = clone_contents(drive_service, source, destination, resume=True, rate_limiter=RateLimiter(1000))
+
+    assert summary["folders_created"] == 1
+    assert summary["files_skipped"] == 1
+    assert summary["files_copied"] == 3
+    assert summary["failed"] == []
+    # The partial b.json was trashed, not left next to its new copy
+    names = [file["name"] for file in drive.query(f"'{destination}' in parents and trashed = false")]
+    assert sorted(names) == ["a.json", "b.json", "sub"]
+    assert tree(drive, destination) == tree(drive, source)
+
+
+def test_resume_replaces_items_of_the_other_type(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+    # "sub" is a file and "a.json" a folder in the destination
+    drive.add_file("sub", "{}", destination)
+    drive.add_folder("a.json", destination)
+
+    summary = clone_contents(drive_service, source, destination, resume=True, rate_limiter=RateLimiter(1000))
+
+    assert summary["failed"] == []
+    assert tree(drive, destination) == tree(drive, source)
+
+
+def test_resume_of_a_finished_clone_copies_nothing(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+    clone_contents(drive_service, source, destination, rate_limiter=RateLimiter(1000))
+    calls = fake_google.stats["calls"]
+
+    summary = clone_contents(drive_service, source, destination, resume=True, rate_limiter=RateLimiter(1000))
+
+    assert summary == {"folders_created": 0, "files_copied": 0, "files_skipped": 4, "failed": []}
+    # Three levels, each listed in the source and the destination
+    assert fake_google.stats["calls"] - calls == 6
+
+
+def test_clone_reports_files_that_fail_to_copy(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+    # Listed by the clone but gone by the time it is copied
+    original_copy = drive.copy
+    drive.copy = lambda file_id, metadata: (
+        original_copy(file_id, metadata) if metadata["name"] != "c.json" else drive.get("missing")
+    )
+
+    summary = clone_contents(drive_service, source, destination, rate_limiter=RateLimiter(1000))
+
+    assert summary["files_copied"] == 3
+    assert summary["failed"] == ["./sub/c.json"]
+
+
+def test_clone_drive_folder_takes_folder_ids(fake_google, drive_service):
+    drive = fake_google.drive
+    source = add_source_tree(drive)
+    destination = drive.add_folder("destination")
+
+    summary = clone_drive_folder(drive_service, source, destination, is_url=False, requests_per_second=1000)
+
+    assert summary["files_copied"] == 4
+    assert tree(drive, destination) == tree(drive, source)
+
+
+def test_clone_retries_rate_limited_copies(tmp_path):
+    with FakeGoogleServer(requests_per_second=20, burst=20) as server:
+        source = server.drive.add_folder("source")
+        for number in range(30):
+            server.drive.add_file(f"{number}.json", "{}", source)
+        destination = server.drive.add_folder("destination")
+        path = server.write_service_account_file(str(tmp_path))
+        with server.redirect():
+            service = build_services(path, services=["drive"])["drive"]
+            summary = clone_contents(service, source, destination, rate_limiter=RateLimiter(1000))
+
+    assert server.stats["throttled"] > 0
+    assert summary == {"folders_created": 0, "files_copied": 30, "files_skipped": 0, "failed": []}
+    assert len(server.drive.query(f"'{destination}' in parents")) == 30
@@ -0,0 +1,96 @@
+from data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
+from data_ingest.src.gdrive_utils.utils import FOLDER_MIME_TYPE, get_file_id
+
+
+def test_build_indexes_every_level(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    top_file = drive.add_file("top.json", "{}", root)
+    sub = drive.add_folder("sub", root)
+    deeper = drive.add_folder("deeper", sub)
+    deep_file = drive.add_file("deep.json", "{}", deeper)
+
+    index = DriveTreeIndex.build(drive_service, root)
+
+    assert index.get_file_id("top.json", root) == top_file
+    assert index.get_nested_folder_id("sub/deeper") == deeper
+    assert index.get_file_id("deep.json", deeper) == deep_file
+    assert index.file_ids() == {"./top.json": top_file, "./sub/deeper/deep.json": deep_file}
+    # The listing keeps the metadata needed to compare files without another call
+    assert index.items[deep_file]["md5Checksum"] == drive.get(deep_file)["md5Checksum"]
+    assert [path for path, _ in index.walk()] == ["./top.json", "./sub", "./sub/deeper", "./sub/deeper/deep.json"]
+
+
+def test_build_follows_paginated_listings(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    # More than one page of files.list (1000 items)
+    for number in range(1005):
+        drive.add_file(f"{number}.json", "{}", root)
+    last = drive.add_folder("last", root)
+    inner = drive.add_file("inner.json", "{}", last)
+
+    index = DriveTreeIndex.build(drive_service, root)
+
+    # The token request, two pages of the root and one listing of `last`
+    assert fake_google.stats["calls"] == 4
+    assert len(index.file_ids()) == 1006
+    assert index.get_file_id("1004.json", root) is not None
+    assert index.get_file_id("inner.json", index.get_nested_folder_id("last")) == inner
+
+
+def test_covers_only_indexed_folders(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    sub = drive.add_folder("sub", root)
+    outside = drive.add_folder("outside")
+
+    index = DriveTreeIndex.build(drive_service, root)
+
+    assert index.covers(root)
+    assert index.covers(sub)
+    assert not index.covers(outside)
+
+
+def test_get_nested_folder_id_paths():
+    index = DriveTreeIndex("root")
+    index.add({"id": "a", "name": "a", "mimeType": FOLDER_MIME_TYPE}, "root")
+    index.add({"id": "b", "name": "b", "mimeType": FOLDER_MIME_TYPE}, "a")
+    index.add({"id": "file", "name": "file", "mimeType": "application/json"}, "a")
+
+    assert index.get_nested_folder_id(".") == "root"
+    assert index.get_nested_folder_id("./a/b") == "b"
+    assert index.get_nested_folder_id("/a/b/") == "b"
+    assert index.get_nested_folder_id("b", parent_id="a") == "b"
+    # Missing folders and files are not folders
+    assert index.get_nested_folder_id("a/missing") is None
+    assert index.get_nested_folder_id("a/file") is None
+
+
+def test_add_keeps_the_first_item_of_a_name():
+    index = DriveTreeIndex("root")
+    index.add({"id": "first", "name": "x.json", "mimeType": "application/json"}, "root")
+    index.add({"id": "second", "name": "x.json", "mimeType": "application/json"}, "root")
+    index.add({"id": "new", "name": "new", "mimeType": FOLDER_MIME_TYPE}, "root")
+
+    assert index.get_file_id("x.json", "root") == "first"
+    assert index.items["second"]["parents"] == ["root"]
+    # A created folder is empty, so its contents are known
+    assert index.covers("new")
+    assert index.get_child("new", "anything") is None
+
+
+def test_file_and_folder_of_the_same_name_are_both_indexed(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    file_id = drive.add_file("data", "{}", root)
+    folder_id = drive.add_folder("data", root)
+    inner = drive.add_file("inner.json", "{}", folder_id)
+
+    index = DriveTreeIndex.build(drive_service, root)
+
+    assert index.get_file_id("data", root) == file_id
+    assert index.get_nested_folder_id("data") == folder_id
+    assert index.get_child(root, "data", is_folder=True)["id"] == folder_id
+    assert index.file_ids() == {"./data": file_id, "./data/inner.json": inner}
+    assert get_file_id(drive_service, "data", root) == file_id
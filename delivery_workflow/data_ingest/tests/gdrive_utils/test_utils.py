@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from data_ingest.src.gdrive_utils.auth import build_services
+from data_ingest.src.gdrive_utils.tree_index import DriveTreeIndex
+from data_ingest.src.gdrive_utils.utils import create_folder_path, get_nested_folder_id
+from delivery_workflow.benchmarks.fake_google import FakeGoogleServer
+
+
+def test_create_folder_path_creates_missing_folders(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    existing = drive.add_folder("a", root)
+
+    folder_id = create_folder_path(drive_service, "a/b/c", root)
+
+    assert get_nested_folder_id(drive_service, "a/b/c", root) == folder_id
+    assert get_nested_folder_id(drive_service, "a", root) == existing
+    assert len(drive.query("mimeType = 'application/vnd.google-apps.folder'")) == 4
+
+
+def test_create_folder_path_records_created_folders_in_the_index(fake_google, drive_service):
+    root = fake_google.drive.add_folder("root")
+    index = DriveTreeIndex.build(drive_service, root)
+
+    folder_id = create_folder_path(drive_service, "a/b", root, index=index)
+    calls = fake_google.stats["calls"]
+
+    assert get_nested_folder_id(drive_service, "a/b", root, index=index) == folder_id
+    assert create_folder_path(drive_service, "a/b", root, index=index) == folder_id
+    # Both answered by the index
+    assert fake_google.stats["calls"] == calls
+
+
+def test_unindexed_index_memoizes_folder_ids(fake_google, drive_service):
+    drive = fake_google.drive
+    root = drive.add_folder("root")
+    existing = drive.add_folder("a", root)
+    sibling = drive.add_folder("sibling", root)
+    index = DriveTreeIndex(root, indexed=False)
+
+    folder_id = create_folder_path(drive_service, "a/b", root, index=index)
+    calls = fake_google.stats["calls"]
+
+    assert create_folder_path(drive_service, "a/b", root, index=index) == folder_id
+    assert get_nested_folder_id(drive_service, "a", root, index=index) == existing
+    assert fake_google.stats["calls"] == calls
+    # Folders recorded in the unlisted root do not hide the rest of its contents
+    assert not index.covers(root)
+    assert get_nested_folder_id(drive_service, "sibling", root, index=index) == sibling
+
+
+def test_concurrent_create_folder_path_creates_each_folder_once(tmp_path):
+    # Latency widens the window between the lookup and the creation of a folder
+    with FakeGoogleServer(latency=0.02) as server:
+        root = server.drive.add_folder("root")
+        path = server.write_service_account_file(str(tmp_path))
+        with server.redirect():
+            index = DriveTreeIndex.build(build_services(path, services=["drive"])["drive"], root)
+
+            def create(_):
+                # A client per thread, as the upload workers do; httplib2 is not thread-safe
+                service = build_services(path, services=["drive"])["drive"]
+                return create_folder_path(service, "a/b", root, index=index)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                folder_ids = set(executor.map(create, range(8)))
+
+        folders = server.drive.query("mimeType = 'application/vnd.google-apps.folder'")
+
+    assert len(folder_ids) == 1
+    assert sorted(folder["name"] for folder in folders) == ["a", "b", "root"]
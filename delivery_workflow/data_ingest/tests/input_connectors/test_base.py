@@ -0,0 +1,85 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from data_ingest.src.input_connectors.base import (
+    InputBatch,
+    InputItem,
+    InputItemMetadata,
+    InputItemStatus,
+    InputItemView,
+    LazyContent,
+)
+
+
+@pytest.fixture
+def input_batch():
+    return InputBatch(
+        items=[
+            InputItem(content="{}", metadata=InputItemMetadata(data={"file_id": "a"})),
+            InputItem(content=None, metadata=InputItemMetadata(status=InputItemStatus.ERROR, data={"file_id": "b"})),
+        ],
+        metadata={"batch": "test"},
+    )
+
+
+def test_view_matches_serialize(input_batch):
+    view = input_batch.view()
+    assert all(isinstance(item, InputItemView) for item in view["items"])
+    assert view == input_batch.serialize()
+    assert json.loads(json.dumps(view, default=dict)) == input_batch.serialize()
+
+
+def test_view_does_not_copy_content_or_data(input_batch):
+    item = input_batch.view()["items"][0]
+    assert item["content"] is input_batch.items[0].content
+    assert item["metadata"]["data"] is input_batch.items[0].metadata.data
+    assert item["metadata"]["status"] == "OK"
+
+
+def test_view_changes_stay_on_the_view(input_batch):
+    item = input_batch.view()["items"][0]
+    item["parsed"] = {"status": "OK"}
+    del item["content"]
+    assert "content" not in item
+    assert dict(item) == {"metadata": {"status": "OK", "data": {"file_id": "a"}}, "parsed": {"status": "OK"}}
+    assert input_batch.items[0].content == "{}"
+    assert input_batch.view()["items"][0] == input_batch.items[0].serialize()
+
+
+def test_view_copies_are_plain_dicts(input_batch):
+    item = input_batch.view()["items"][0]
+    for copied in (copy.deepcopy(item), pickle.loads(pickle.dumps(item))):
+        assert type(copied) is dict
+        assert copied == input_batch.items[0].serialize()
+
+
+def test_validate_rescans_replaced_items(input_batch):
+    input_batch.validate()
+    input_batch.items = input_batch.items + ["not an item"]
+    with pytest.raises(ValueError):
+        input_batch.validate()
+
+
+def test_lazy_content_is_fetched_once():
+    calls = []
+    item = InputItem(content=LazyContent(lambda: calls.append(1) or "fetched"))
+    view = InputBatch(items=[item]).view()
+    assert calls == []
+    assert view["items"][0]["content"] == "fetched"
+    assert item.get_content() == "fetched"
+    assert item.content == "fetched"
+    assert calls == [1]
+
+
+def test_failed_lazy_content_marks_item_error():
+    def fail():
+        raise OSError("connection reset")
+
+    item = InputItem(content=LazyContent(fail), metadata=InputItemMetadata(data={"file_id": "a"}))
+    assert item.serialize() == {
+        "content": None,
+        "metadata": {"status": "ERROR", "data": {"file_id": "a", "input_status_not_ok_msg": "Download failed with error: OSError: connection reset"}},
+    }
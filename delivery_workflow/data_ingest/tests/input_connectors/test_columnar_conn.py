@@ -0,0 +1,106 @@
+import os
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from data_ingest.src.input_connectors import base, columnar_conn
+from data_ingest.src.input_connectors.base import (
+    InputBatch,
+    InputItem,
+    InputItemMetadata,
+    InputItemStatus,
+)
+from data_ingest.src.input_connectors.columnar_conn import ColumnarBatch, ColumnarConnector, write_batch
+from data_ingest.src.input_connectors.json_connector import JSONConnector
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(columnar_conn, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def input_batch():
+    return InputBatch(
+        items=[
+            InputItem(content='{"cells": []}', metadata=InputItemMetadata(data={"file_id": "a", "row": 2, "note": None})),
+            InputItem(content=None, metadata=InputItemMetadata(status=InputItemStatus.ERROR, data={"file_id": "b"})),
+            InputItem(content="Ünïcødé ✅", metadata=InputItemMetadata(data={"file_id": "c", "tags": ["x", "y"]})),
+        ],
+        metadata={"batch": "test"},
+    )
+
+
+def test_write_and_read_back(tmp_path, input_batch):
+    path = write_batch(str(tmp_path / "batch"), input_batch)
+    with ColumnarBatch(path) as stored:
+        assert len(stored) == 3
+        assert stored.metadata == {"batch": "test"}
+        assert list(stored.iter_items()) == input_batch.items
+
+
+def test_datetime_metadata_reads_back_as_stored(tmp_path):
+    data = {
+        "submitted": pd.Timestamp("2024-01-26 10:30", tz="UTC"),
+        "reviewed": pd.NaT,
+        "created": datetime(2024, 1, 25, 8, 0),
+        "due": date(2024, 2, 1),
+    }
+    batch = InputBatch(items=[InputItem(content="{}", metadata=InputItemMetadata(data=data))])
+
+    path = write_batch(str(tmp_path / "batch"), batch)
+    with ColumnarBatch(path) as stored:
+        [item] = stored.iter_items()
+
+    assert item.metadata.data["submitted"] == data["submitted"]
+    assert isinstance(item.metadata.data["submitted"], pd.Timestamp)
+    assert item.metadata.data["reviewed"] is pd.NaT
+    assert item.metadata.data["created"] == data["created"]
+    assert item.metadata.data["due"] == data["due"]
+
+
+def test_metadata_json_cannot_encode_is_refused(tmp_path):
+    batch = InputBatch(items=[InputItem(content="{}", metadata=InputItemMetadata(data={"file": object()}))])
+
+    with pytest.raises(TypeError, match="object"):
+        write_batch(str(tmp_path / "batch"), batch)
+
+
+def test_metadata_columns_without_content(tmp_path, input_batch):
+    path = write_batch(str(tmp_path / "batch"), input_batch)
+    with ColumnarBatch(path) as stored:
+        table = stored.table(["status", "data.file_id"])
+        assert list(table.columns) == ["status", "data.file_id"]
+        assert list(table["status"]) == ["OK", "ERROR", "OK"]
+        assert stored._content is None
+
+
+def test_append(tmp_path, input_batch):
+    path = str(tmp_path / "batch")
+    write_batch(path, InputBatch(items=input_batch.items[:1], metadata=input_batch.metadata))
+    write_batch(path, InputBatch(items=input_batch.items[1:]), append=True)
+    with ColumnarBatch(path) as stored:
+        assert stored.metadata == {"batch": "test"}
+        assert list(stored.iter_items()) == input_batch.items
+
+
+def test_save_data_and_connector(data_dir):
+    source = JSONConnector([{"content": "one", "file_id": "a"}, {"content": "two", "file_id": "b"}], common_metadata={"batch": "json"})
+    source.load_data()
+    path = source.save_data(relative_save_path="saved/batch")
+    assert os.path.isfile(os.path.join(path, columnar_conn.CONTENT_FILE))
+
+    connector = ColumnarConnector(relative_path="saved/batch")
+    assert list(connector.load_metadata(["data.file_id"])["data.file_id"]) == ['"a"', '"b"']
+    assert [item.content for item in connector.iter_items()] == ["one", "two"]
+    connector.load_data()
+    assert connector.get_data() == source.get_data()
+    connector.close()
+
+
+def test_connector_missing_batch(data_dir):
+    with pytest.raises(FileNotFoundError):
+        ColumnarConnector(relative_path="missing").load_data()
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from data_ingest.src.input_connectors.df_conn import DFConnector
+from data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
+    RevisionInstructionByRevId,
+    RevisionInstructionByTS,
+    RevisionSelectionByRevId,
+    RevisionSelectionByTS,
+)
+
+LINK = "https://colab.research.google.com/drive/abc"
+
+
+@pytest.fixture
+def tasks_df():
+    return pd.DataFrame({
+        "batch": ["b1", "b2", "b3", "b4", "b5"],
+        "colab_task_link": [
+            LINK,
+            LINK + "1#revisionId=r1",
+            LINK + "2#revisionId=a#revisionId=b",
+            LINK + "3#revisionId=r2&x=1",
+            LINK + "4#revisionId=",
+        ],
+        "ts": ["2024-01-01 10:00:00"] * 5,
+    })
+
+
+def test_df_to_file_items_with_metadata(tasks_df):
+    connector = DFConnector(tasks_df, "colab_task_link", fetch_latest_revision_or_skip_if_url_contains_same_rev=True)
+    items = connector.df_to_file_items_with_metadata(tasks_df)
+    assert list(items[0]) == ["batch", "ts", "file_uri"]
+    assert items[1] == {"batch": "b2", "ts": "2024-01-01 10:00:00", "file_uri": LINK + "1#revisionId=r1"}
+
+    connector.make_columns_as_per_item_metadata = ["ts"]
+    assert connector.df_to_file_items_with_metadata(tasks_df)[0] == {"ts": "2024-01-01 10:00:00", "file_uri": LINK}
+
+
+def test_revision_map_from_urls(tasks_df):
+    connector = DFConnector(tasks_df, "colab_task_link", fetch_latest_revision_or_skip_if_url_contains_same_rev=True)
+    revision_instructions_map = connector.generate_revision_instructions_map_from_revisions_in_urls(tasks_df)
+    assert revision_instructions_map[LINK] == RevisionInstructionByTS(how=RevisionSelectionByTS.LATEST)
+    revision_ids = {
+        uri: instruction.revision_id
+        for uri, instruction in revision_instructions_map.items()
+        if isinstance(instruction, RevisionInstructionByRevId)
+    }
+    assert revision_ids == {
+        LINK + "1#revisionId=r1": "r1",
+        LINK + "2#revisionId=a#revisionId=b": "a",
+        LINK + "3#revisionId=r2&x=1": "r2",
+        LINK + "4#revisionId=": "",
+    }
+    assert all(
+        instruction.how == RevisionSelectionByRevId.LATEST_NOT_EQ
+        for uri, instruction in revision_instructions_map.items()
+        if uri in revision_ids
+    )
+
+
+def test_revision_map_from_ts_column(tasks_df):
+    connector = DFConnector(
+        tasks_df,
+        "colab_task_link",
+        find_revision_by_timestamp_column_name="ts",
+        timestamp_column_timezone_delta=timedelta(hours=4),
+    )
+    instruction = connector.generate_revision_instructions_map_from_ts_column(tasks_df)[LINK]
+    assert instruction.how == RevisionSelectionByTS.BEFORE_OR_EQ
+    assert instruction.utc_timestamp == pd.Timestamp("2024-01-01 06:00:00", tz="UTC")
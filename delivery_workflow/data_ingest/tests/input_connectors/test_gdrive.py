@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime, timezone
 
 import pytest
@@ -8,7 +9,7 @@ from data_ingest.src.input_connectors.base import (
     InputItemMetadata,
     InputItemStatus,
 )
-from data_ingest.src.input_connectors.gdrive import GDriveConnector
+from data_ingest.src.input_connectors.gdrive import ContentPrefetcher, GDriveConnector
 from data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
     DownloadStatus,
     GDriveFile,
@@ -164,6 +165,110 @@ def test_gdrive_gfiles_to_input_items():
     assert items == expected_items
 
 
+
+class StubRetriever:
+    def __init__(self):
+        self.downloaded = []
+
+    def download(self, gdrive_file):
+        self.downloaded.append(gdrive_file.file_id)
+        if gdrive_file.file_id == "broken":
+            gdrive_file.status = DownloadStatus.ERROR
+            gdrive_file.status_not_ok_msg = "Download failed with error: HttpError: 404"
+        else:
+            gdrive_file.content = f"content of {gdrive_file.file_id}"
+        return gdrive_file
+
+
+def test_gdrive_lazy_items_download_on_access():
+    retriever = StubRetriever()
+    gdrive_files = [GDriveFile(file_id=f"id{i}") for i in range(6)] + [GDriveFile(file_id="broken")]
+    gdrive_conn = GDriveConnector([f.file_id for f in gdrive_files])
+    prefetcher = ContentPrefetcher(retriever, gdrive_files, window=2, max_workers=2)
+    items = gdrive_conn._convert_gdrive_files_to_items(gdrive_files, prefetcher)
+    assert retriever.downloaded == []
+
+    assert items[1].get_content() == "content of id1"
+    for future in list(prefetcher.pending.values()):
+        future.result()
+    assert sorted(retriever.downloaded) == ["id1", "id2", "id3"]
+    assert gdrive_files[1].content is None
+
+    assert items[6].get_content() is None
+    assert items[6].metadata.status == InputItemStatus.ERROR
+    assert items[6].metadata.data["input_status_not_ok_msg"] == "Download failed with error: HttpError: 404"
+
+class BlockingRetriever(StubRetriever):
+    """Downloads only once `release` is set, so the test controls which downloads are still running."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def download(self, gdrive_file):
+        self.release.wait(timeout=5)
+        return super().download(gdrive_file)
+
+
+def test_gdrive_prefetcher_close_releases_downloads_ahead():
+    retriever = BlockingRetriever()
+    gdrive_files = [GDriveFile(file_id=f"id{i}") for i in range(8)]
+    prefetcher = ContentPrefetcher(retriever, gdrive_files, window=4, max_workers=1)
+    items = GDriveConnector([f.file_id for f in gdrive_files])._convert_gdrive_files_to_items(gdrive_files, prefetcher)
+    retriever.release.set()
+    assert items[0].get_content() == "content of id0"
+    ahead = list(prefetcher.pending.values())
+    for future in ahead:
+        future.result()
+    assert all(gdrive_files[i].content is not None for i in range(1, 5))
+
+    prefetcher.close()
+
+    # The contents downloaded ahead are dropped and the pool is stopped
+    assert prefetcher.pending == {}
+    assert all(f.content is None for f in gdrive_files)
+    assert prefetcher.executor._shutdown
+    # Items reached after the close are not downloaded
+    assert items[5].get_content() is None
+    assert items[5].metadata.status == InputItemStatus.ERROR
+    assert items[5].metadata.data["input_status_not_ok_msg"] == "The connector was closed before the content was used."
+    assert "id5" not in retriever.downloaded
+
+
+def test_gdrive_prefetcher_close_cancels_queued_downloads():
+    retriever = BlockingRetriever()
+    gdrive_files = [GDriveFile(file_id=f"id{i}") for i in range(6)]
+    prefetcher = ContentPrefetcher(retriever, gdrive_files, window=4, max_workers=1)
+    for index in range(6):
+        prefetcher.lazy_content(index)
+    # One running download and three queued behind it
+    prefetcher._submit(0)
+    for index in range(1, 4):
+        prefetcher._submit(index)
+    queued = [prefetcher.pending[index] for index in range(1, 4)]
+
+    prefetcher.close()
+    retriever.release.set()
+    prefetcher.executor.shutdown(wait=True)
+
+    assert all(future.cancelled() for future in queued)
+    assert retriever.downloaded == ["id0"]
+    # The running download finished after the close and dropped its content
+    assert gdrive_files[0].content is None
+
+
+def test_gdrive_connector_close_closes_its_prefetcher():
+    conn = GDriveConnector(["id0"], lazy_content=True)
+    prefetcher = ContentPrefetcher(StubRetriever(), [GDriveFile(file_id="id0")], window=1, max_workers=1)
+    conn._prefetcher = prefetcher
+
+    conn.close()
+    conn.close()
+
+    assert prefetcher.closed
+    assert conn._prefetcher is None
+
+
 def test_gdrive_connector_actual_download_no_prev_rev_no_instruction():
     conn = GDriveConnector(
         [
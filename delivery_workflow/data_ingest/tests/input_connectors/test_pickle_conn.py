@@ -36,7 +36,7 @@ def test_save_data(pickle_connector):
     # Load data to ensure there is data to save
     pickle_connector.load_data()
     save_path = pickle_connector.save_data(
-        relative_save_path="26-01-2024/test_save_output"
+        relative_save_path="26-01-2024/test_save_output", storage="pickle"
     )
     assert os.path.isfile(save_path), "The data should be saved to a file"
 
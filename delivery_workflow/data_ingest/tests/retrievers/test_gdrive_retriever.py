@@ -1,3 +1,5 @@
+import threading
+import time
 from datetime import datetime
 
 import pytest
@@ -6,13 +8,16 @@ from pytz import timezone
 from data_ingest.src.gdrive_utils.auth import build_services
 from data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
     DownloadStatus,
+    FailureReason,
     GDriveFile,
     GDriveRetriever,
     RevisionInstructionByRevId,
     RevisionInstructionByTS,
     RevisionSelectionByRevId,
     RevisionSelectionByTS,
+    RevisionTimeline,
 )
+from data_ingest.src.input_connectors.retrievers.revision_cache import RevisionCache
 
 
 @pytest.fixture
@@ -224,6 +229,130 @@ def test_select_revision_after(gdrive_real_retriever, dummy_revisions):
     }
 
 
+def test_revision_timeline_cached_per_file(dummy_revisions):
+    timeline = RevisionTimeline.of(dummy_revisions, file_id="timeline_file")
+    assert RevisionTimeline.of(list(dummy_revisions), file_id="timeline_file") is timeline
+    assert [revision["modifiedTime"] for revision in timeline.revisions] == [
+        "2024-01-26T10:35:40.684Z",
+        "2024-01-26T10:35:33.670Z",
+        "2024-01-26T10:35:13.750Z",
+    ]
+
+    # A new revision invalidates the cached timeline
+    revisions = dummy_revisions + [{"id": "new", "modifiedTime": "2024-01-26T10:36:00.000Z"}]
+    instruction = RevisionInstructionByTS(how=RevisionSelectionByTS.LATEST)
+    assert instruction.select_revision(revisions, file_id="timeline_file")["id"] == "new"
+    assert RevisionTimeline.of(revisions, file_id="timeline_file") is not timeline
+
+
+class StubRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class StubDriveService:
+    """Answers files.get and revisions.list from a dict of file ID -> revisions, counting the list calls."""
+
+    def __init__(self, file_revisions):
+        self.file_revisions = file_revisions
+        self.list_calls = 0
+
+    def files(self):
+        return self
+
+    def revisions(self):
+        return self
+
+    def get(self, fileId, fields):
+        head = self.file_revisions[fileId][-1]
+        return StubRequest({"headRevisionId": head["id"], "modifiedTime": head["modifiedTime"]})
+
+    def list(self, fileId, pageSize, fields):
+        self.list_calls += 1
+        return StubRequest({"revisions": list(self.file_revisions[fileId])})
+
+
+def test_revision_cache_revalidates_by_head_revision(tmp_path, dummy_revisions):
+    service = StubDriveService({"file1": list(dummy_revisions)})
+    path = str(tmp_path / "revisions.json")
+    retriever = GDriveRetriever(["file1"], revision_cache=RevisionCache(path))
+    assert retriever._get_revisions(service, "file1") == dummy_revisions
+    retriever.revision_cache.save()
+
+    # A later run revalidates the stored list without listing the revisions again
+    retriever = GDriveRetriever(["file1"], revision_cache=RevisionCache(path))
+    assert retriever._get_revisions(service, "file1") == dummy_revisions
+    assert service.list_calls == 1
+
+    service.file_revisions["file1"].append({"id": "new", "modifiedTime": "2024-01-26T10:36:00.000Z"})
+    assert retriever._get_revisions(service, "file1")[-1]["id"] == "new"
+    assert service.list_calls == 2
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_iter_files_with_content_bounds_in_flight_downloads(ordered):
+    file_ids = [f"id{i}" for i in range(20)] + ["broken"]
+    retriever = GDriveRetriever(file_ids, max_workers=4)
+    retriever.gdrive_files[3].status = DownloadStatus.SKIPPED
+    lock = threading.Lock()
+    submitted = {"count": 0, "max_ahead": 0}
+    yielded = []
+
+    def download(file_id, revision_id):
+        with lock:
+            submitted["count"] += 1
+            submitted["max_ahead"] = max(submitted["max_ahead"], submitted["count"] - len(yielded))
+        time.sleep(0.001)
+        if file_id == "broken":
+            raise ConnectionError("connection reset")
+        return f"content of {file_id}"
+
+    retriever._GDriveRetriever__download_file = download
+    for gdrive_file in retriever.iter_files_with_content(window=5, ordered=ordered):
+        yielded.append(gdrive_file)
+
+    assert submitted["max_ahead"] <= 5
+    assert len(yielded) == len(file_ids)
+    if ordered:
+        assert [f.file_id for f in yielded] == file_ids
+    broken = next(f for f in yielded if f.file_id == "broken")
+    assert broken.status == DownloadStatus.ERROR
+    assert broken.failure.reason == FailureReason.DOWNLOAD_FAILED
+    assert broken.failure.error_type == "ConnectionError"
+    assert next(f for f in yielded if f.file_id == "id3").content is None
+    assert next(f for f in yielded if f.file_id == "id0").content == "content of id0"
+    assert retriever.failures() == [retriever.gdrive_files[3], broken]
+
+
+def test_retrieve_coalesces_uris_of_the_same_file(dummy_revisions):
+    link = "https://colab.research.google.com/drive/file1"
+    uris = [link, link + "#scrollTo=abc", link + "?usp=sharing", "file2"]
+    service = StubDriveService({"file1": dummy_revisions, "file2": dummy_revisions[:1]})
+    retriever = GDriveRetriever(uris, max_workers=4)
+    retriever._drive_service = lambda: service
+    downloads = []
+
+    def download(file_id, revision_id):
+        downloads.append((file_id, revision_id))
+        time.sleep(0.01)
+        return f"{file_id} at {revision_id}"
+
+    retriever._GDriveRetriever__download_file = download
+    gdrive_files = retriever.retrieve()
+
+    assert service.list_calls == 2
+    assert sorted(downloads) == [
+        ("file1", "0BzvC7kiIr38UV1lUQXFMa1pGVHdUYnZiR21HUmtNQkdHUmZrPQ"),
+        ("file2", "0BzvC7kiIr38UcmkxNVBheG5aSFI5WHBNdWFLNlovdVJJc0FFPQ"),
+    ]
+    assert [f.content for f in gdrive_files[:3]] == ["file1 at 0BzvC7kiIr38UV1lUQXFMa1pGVHdUYnZiR21HUmtNQkdHUmZrPQ"] * 3
+    # Shared results are released once every file got them
+    assert retriever._download_requests.futures == {}
+
+
 def test_retrieve_latest_revision():
     instruction = RevisionInstructionByTS(how=RevisionSelectionByTS.LATEST)
     gdrive_real_retriever = GDriveRetriever(
@@ -0,0 +1,68 @@
+import json
+
+import nbformat
+import pytest
+
+from data_ingest.src.input_connectors.retrievers.gdrive_retriever import GDriveRetriever
+from data_ingest.src.input_connectors.retrievers.sources_cache import SourcesCache, strip_notebook
+
+NOTEBOOK = {
+    "nbformat": 4,
+    "nbformat_minor": 0,
+    "metadata": {"colab": {"provenance": []}, "widgets": {"application/vnd.jupyter.widget-state+json": {"state": {}}}},
+    "cells": [
+        {
+            "cell_type": "markdown",
+            "metadata": {"id": "md"},
+            "source": ["**Apex Code Analysis**\n", "![plot](attachment:plot.png)"],
+            "attachments": {"plot.png": {"image/png": "iVBORw0KGgo" * 1000}},
+        },
+        {
+            "cell_type": "code",
+            "execution_count": 7,
+            "metadata": {"id": "code"},
+            "source": ["print('hi')"],
+            "outputs": [{"output_type": "stream", "name": "stdout", "text": ["hi\n"] * 1000}],
+        },
+    ],
+}
+
+
+def test_strip_notebook_keeps_sources_only():
+    content = json.dumps(NOTEBOOK, indent=1)
+    stripped = strip_notebook(content)
+    assert len(stripped) * 10 < len(content)
+
+    notebook = nbformat.reads(stripped, as_version=4)
+    nbformat.validate(notebook)
+    assert [cell.source for cell in notebook.cells] == [
+        "**Apex Code Analysis**\n![plot](attachment:plot.png)",
+        "print('hi')",
+    ]
+    assert notebook.cells[1].outputs == [] and notebook.cells[1].execution_count is None
+    assert "attachments" not in notebook.cells[0]
+    assert "widgets" not in notebook.metadata and "colab" in notebook.metadata
+
+
+def test_strip_notebook_rejects_other_content():
+    with pytest.raises(ValueError):
+        strip_notebook('{"not": "a notebook"}')
+
+
+def test_retriever_reads_cached_sources(tmp_path):
+    downloads = []
+
+    def download(file_id, revision_id):
+        downloads.append(file_id)
+        return json.dumps(NOTEBOOK)
+
+    contents = []
+    for _ in range(2):
+        retriever = GDriveRetriever(["file1"], sources_cache=SourcesCache(str(tmp_path)))
+        retriever._GDriveRetriever__download_file = download
+        gdrive_file = retriever.gdrive_files[0]
+        gdrive_file.revision_id = "rev1"
+        contents.append(retriever.download(gdrive_file).content)
+
+    assert downloads == ["file1"]
+    assert contents[0] == contents[1] == strip_notebook(json.dumps(NOTEBOOK))
@@ -0,0 +1,355 @@
+import os
+import json
+import hashlib
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+
+from delivery_workflow.data_ingest.src.input_connectors import GSheetsConnector, SourcesCache
+from delivery_workflow.data_ingest.src.gdrive_utils import upload_folder, create_or_get_drive_folder
+from delivery_workflow.data_ingest.src.gdrive_utils.batch import RateLimiter, execute_batched
+from delivery_workflow.parsers.src.utils import split_jsonl_to_json
+from delivery_workflow.sheet_util import get_colab_links_from_folder, write_links_to_sheet, update_google_sheet_from_json, copy_specific_tabs_google_sheet, copy_google_sheet_to_drive
+from delivery_workflow.notify import send_lwc_issue_email_notification, send_email_notification_apex, send_email_notification_json_only
+from delivery_workflow.move import create_google_drive_folder, move_files_from_sheet
+from delivery_workflow.manifest import DeliveryManifest, split_changed_items, restore_outputs, record_delivery
+from delivery_workflow.checkpoint import RunCheckpoint, make_run_id
+from delivery_workflow.pipeline import Pipeline, StopPipeline
+from delivery_workflow import tracing, api_accounting
+
+# Load environment variables from .env file
+load_dotenv()
+
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+
+DELIVERY_TYPES = ['normal', 'rework', 'snapshot']
+FOLDER_NAME_PREFIXES = {
+    'normal': "Delivery-Batch",
+    'rework': "Rework-Delivery-Batch",
+    'snapshot': "Snapshot-Delivery-Batch",
+}
+
+
+@dataclass
+class DeliveryProject:
+    """
+    What differs between the delivery pipelines of two projects.
+
+    `defaults` holds the fallbacks for the delivery config keys (input_sheet_id,
+    input_sheet_name, task_link_column, output_dir, json_output_dir,
+    google_drive_dir, gdrive_dir_folder_id_collabs, google_drive_json_folder_id).
+    `validate_fn(input_batch, drive_service, issues_tab, sheet_id)` is the internal
+    notebook validator, `parse_fn(input_batch)` returns the parsed items to
+    deliver and `process_fn(input_path, output_path)` turns the parsed JSONL
+    into the client JSONL.
+    """
+    key: str
+    label: str
+    folder_label: str
+    defaults: dict
+    validate_fn: Callable
+    parse_fn: Callable[[dict], list]
+    process_fn: Callable[[str, str], Any]
+    common_metadata: dict = field(default_factory=dict)
+    column_filter_map: Optional[dict] = None
+    # Metadata columns removed from delivered outputs, also dropped from restored outputs
+    drop_keys: list = field(default_factory=list)
+    issue_file_type: str = "Collab"
+    # Whether the client validator writes the delivered JSONs to <output_dir>/<sheet name>
+    cleaned_output: bool = False
+
+
+def folder_prefixes(ctx: dict) -> dict:
+    """Returns the Drive name prefixes of the JSON folder, Colab folder and sheet copy of a delivery."""
+    base = f"{FOLDER_NAME_PREFIXES[ctx['delivery_type']]}-{ctx['project'].folder_label}"
+    return {"json": f"{base}-Json", "colab": f"{base}-Colab", "sheet": f"{base}-Sheet"}
+
+
+def is_delivery(ctx: dict) -> bool:
+    """Normal and rework deliveries move the Colabs; snapshots only deliver the JSONs."""
+    return ctx['delivery_type'] in ['normal', 'rework']
+
+
+def run_validation(ctx: dict) -> bool:
+    return ctx['run_validation']
+
+
+def validated_batch(ctx: dict) -> dict:
+    """The batch to parse: the validator output if validation ran, otherwise the ingested batch."""
+    if ctx.get('validate') is not None:
+        return ctx['validate']['data']
+    return ctx['ingest']['input_batch']
+
+
+# Stages shared by every delivery pipeline. Each receives the run context.
+
+def prepare_source(ctx: dict):
+    """Fills the input sheet from a Drive folder or a JSON file; sheet sources are used as is."""
+    if ctx['source_kind'] == 'drive':
+        colab_links = get_colab_links_from_folder(ctx['drive_service'], ctx['source'])
+        if not colab_links:
+            raise ValueError("No Colab links found in the specified folder.")
+        write_links_to_sheet(ctx['drive_service'], ctx['sheet_id'], ctx['sheet_name'], colab_links)
+        print("Colab links have been successfully copied to the Google Sheet.")
+        return len(colab_links)
+    if ctx['source_kind'] == 'json':
+        with tempfile.NamedTemporaryFile('w', delete=False, suffix='.json', dir=ctx['output_dir']) as tmp:
+            json.dump(ctx['json_data'], tmp)
+        try:
+            update_google_sheet_from_json(ctx['drive_service'], ctx['sheet_id'], ctx['sheet_name'], tmp.name)
+        finally:
+            os.remove(tmp.name)
+    return None
+
+
+def ingest(ctx: dict) -> dict:
+    project = ctx['project']
+    manifest = ctx['manifest']
+    # Optional: a directory of sources-only notebooks, so revisions downloaded before are read without their outputs
+    sources_cache_dir = ctx['config'].get('sources_cache_dir')
+    conn = GSheetsConnector(
+        sheet_id=ctx['sheet_id'],
+        sheet_names=[ctx['sheet_name']],
+        gdrive_file_link_column_name=ctx['config'].get('task_link_column', project.defaults['task_link_column']),
+        common_metadata=project.common_metadata,
+        column_filter_map=project.column_filter_map,
+        revision_instructions_map=manifest.revision_instructions(project.key) if ctx['incremental'] else None,
+        max_workers=24,
+        sources_cache=SourcesCache(sources_cache_dir) if sources_cache_dir else None,
+    )
+    with tracing.span("load_data"):
+        conn.load_data()
+    input_batch, unchanged_items, content_info = split_changed_items(manifest, project.key, conn.get_data(as_json=True), ctx['incremental'])
+    tracing.count("notebooks_downloaded", len(input_batch['items']))
+    tracing.count("notebooks_unchanged", len(unchanged_items))
+    print(f"✅ Processing {len(input_batch['items'])} Unique Collab links")
+    return {"input_batch": input_batch, "unchanged_items": unchanged_items, "content_info": content_info}
+
+
+def ingested_revisions(ingest_result: dict) -> dict:
+    """Maps the file ID of every ingested notebook, downloaded or unchanged, to the revision it was resolved to."""
+    revisions = {}
+    for item in ingest_result['input_batch']['items'] + ingest_result['unchanged_items']:
+        data = item['metadata']['data']
+        # Notebooks that failed to resolve are reported by validation, there is no revision to compare
+        if data.get('file_id') and data.get('requested_revision_id'):
+            revisions[data['file_id']] = data['requested_revision_id']
+    return revisions
+
+
+def ingest_is_current(ctx: dict, ingest_result: dict) -> bool:
+    """
+    Whether a checkpointed ingest still holds the latest revision of every
+    notebook. A notebook fixed after the failed attempt, or deleted since,
+    makes the ingest stale, so a resumed run downloads and validates again.
+    """
+    revisions = ingested_revisions(ingest_result)
+    file_ids = list(revisions)
+    requests = [ctx['drive_service'].files().get(fileId=file_id, fields="id, headRevisionId") for file_id in file_ids]
+    for file_id, (response, exception) in zip(file_ids, execute_batched(ctx['drive_service'], requests, RateLimiter())):
+        if exception is not None or response.get('headRevisionId') != revisions[file_id]:
+            print(f"Notebook {file_id} changed since it was ingested.")
+            return False
+    return True
+
+
+def validate(ctx: dict) -> dict:
+    validation_results = ctx['project'].validate_fn(ctx['ingest']['input_batch'], ctx['drive_service'], 'issues', ctx['sheet_id'])
+    tracing.count("notebooks_validated", len(validation_results['data']['items']))
+    tracing.count("notebooks_with_issues", validation_results.get('count_of_collabs_with_issues', 0))
+    return validation_results
+
+
+def validation_gate(ctx: dict):
+    """Stops the delivery and emails the issues tab if the internal validator failed any notebook."""
+    validation_results = ctx['validate']
+    if validation_results['status'] != "failed":
+        return None
+    project = ctx['project']
+    print(f"❌ Internal Validator failed {validation_results['count_of_collabs_with_issues']} Collab Notebooks")
+    new_sheet_info = copy_specific_tabs_google_sheet(ctx['drive_service'], ctx['sheet_id'], ctx['emails'], ['issues'])
+    print(f'Sheet link to Internal Validator Errors: {new_sheet_info["new_sheet_url"]}')
+    send_lwc_issue_email_notification(
+        sender_email=SENDER_EMAIL,
+        sender_password=SENDER_PASSWORD,
+        recipient_emails=ctx['emails'],
+        sheet_url=new_sheet_info["new_sheet_url"],
+        batch=ctx['sheet_name'],
+        project=project.label,
+        file_type=project.issue_file_type
+    )
+    raise StopPipeline("Sent Email with Issues")
+
+
+def parse(ctx: dict) -> dict:
+    input_batch = validated_batch(ctx)
+    print(f"✅ Parsing {len(input_batch['items'])} Collab Notebooks into Json")
+    items = ctx['project'].parse_fn(input_batch)
+    tracing.count("notebooks_parsed", len(items))
+    return {"items": items}
+
+
+def split(ctx: dict):
+    """Writes the parsed JSONL, converts it to the client JSONL and splits that into one JSON per notebook."""
+    project = ctx['project']
+    with open(ctx['parsed_path'], 'w') as outfile:
+        for item in ctx['parse']['items']:
+            json.dump(item, outfile)
+            outfile.write('\n')
+    print("Exported parsed_input_batch as a JSONL file.")
+
+    project.process_fn(ctx['parsed_path'], ctx['client_path'])
+    unchanged_items = ctx['ingest']['unchanged_items']
+    if unchanged_items:
+        tracing.count("outputs_restored", restore_outputs(ctx['manifest'], project.key, unchanged_items, ctx['client_path'], drop_keys=project.drop_keys))
+    split_jsonl_to_json(ctx['client_path'], ctx['json_output_dir'])
+    with open(ctx['client_path']) as f:
+        tracing.count("json_files_written", sum(1 for _ in f))
+
+
+def json_folder(ctx: dict) -> str:
+    print(f"✅ Uploading Jsons to Drive")
+    google_drive_dir = ctx['config'].get('google_drive_dir', ctx['project'].defaults['google_drive_dir'])
+    return create_or_get_drive_folder(ctx['drive_service'], google_drive_dir, folder_prefix=folder_prefixes(ctx)['json'])
+
+
+def upload(ctx: dict):
+    # A resumed run keeps the JSON folder of the failed attempt; files uploaded
+    # before the failure are identical, so the upload skips them
+    force_replace = 'json_folder' not in ctx['resumed']
+    uploaded_files = upload_folder(ctx['drive_service'], ctx['upload_dir'], ctx['json_folder'], force_replace=force_replace)
+    tracing.count("files_uploaded", sum(1 for url in uploaded_files.values() if url not in (None, "ERROR")))
+    return uploaded_files
+
+
+def colab_folder(ctx: dict) -> str:
+    print(f"✅ Creating Google Drive For Collabs")
+    parent_folder_id = ctx['config'].get('gdrive_dir_folder_id_collabs', ctx['project'].defaults['gdrive_dir_folder_id_collabs'])
+    folder_id = create_google_drive_folder(folder_prefixes(ctx)['colab'], parent_folder_id)
+    if not folder_id:
+        raise RuntimeError("Could not create the Colab delivery folder.")
+    return folder_id
+
+
+def move(ctx: dict):
+    print(f"✅ Moving Collabs to Drive For Collabs")
+    # Every moved Colab is recorded, so a retry after a failure part-way only moves the rest
+    checkpoint = ctx['checkpoint']
+    move_files_from_sheet(
+        ctx['sheet_name'],
+        f"https://docs.google.com/spreadsheets/d/{ctx['sheet_id']}",
+        ctx['colab_folder'],
+        skip_ids=checkpoint.completed_items('move'),
+        on_moved=lambda file_id: checkpoint.mark_item_done('move', file_id),
+    )
+
+
+def sheet_copy(ctx: dict) -> dict:
+    with tracing.span("copy_tabs"):
+        new_sheet_info = copy_specific_tabs_google_sheet(ctx['drive_service'], ctx['sheet_id'], ctx['emails'], ['delivery'])
+    json_folder_id = ctx['config'].get('google_drive_json_folder_id', ctx['project'].defaults['google_drive_json_folder_id'])
+    with tracing.span("copy_to_drive"):
+        copy_google_sheet_to_drive(ctx['drive_service'], new_sheet_info["new_sheet_id"], folder_prefixes(ctx)['sheet'], json_folder_id)
+    return new_sheet_info
+
+
+def record(ctx: dict):
+    record_delivery(ctx['manifest'], ctx['project'].key, ctx['client_path'], ctx['ingest']['content_info'])
+
+
+def notify(ctx: dict) -> str:
+    project = ctx['project']
+    if is_delivery(ctx):
+        send_email_notification_apex(
+            sender_email=SENDER_EMAIL,
+            sender_password=SENDER_PASSWORD,
+            recipient_emails=ctx['emails'],
+            json_folder_url=ctx['json_folder'],
+            collab_folder_url=f"https://drive.google.com/drive/folders/{ctx['colab_folder']}",
+            sheet_url=ctx['sheet_copy']["new_sheet_url"],
+            batch=ctx['sheet_name'],
+            project=project.label
+        )
+    else:  # snapshot
+        send_email_notification_json_only(
+            sender_email=SENDER_EMAIL,
+            sender_password=SENDER_PASSWORD,
+            recipient_emails=ctx['emails'],
+            json_folder_url=ctx['json_folder'],
+            batch=ctx['sheet_name'],
+            project=project.label
+        )
+    return 'done'
+
+
+def run_delivery(
+    project: DeliveryProject,
+    pipeline: Pipeline,
+    drive_service,
+    source_kind: str,
+    source: Any,
+    delivery_type: str,
+    emails: list[str],
+    validate: bool,
+    **config,
+):
+    """
+    Runs a delivery pipeline for one input source and returns its result.
+
+    `source_kind` is 'sheet' (source is the sheet ID), 'drive' (source is the
+    folder ID whose Colab links are written to the input sheet) or 'json'
+    (source is the JSON data written to the input sheet). Stage results are
+    checkpointed under a run ID derived from the project, source, sheet name,
+    delivery type and validation flag, so retrying a failed delivery resumes
+    at the first incomplete stage; within the upload and move stages, files
+    handled before the failure are skipped too. The ingest checkpoint is only reused while
+    every notebook is still at the revision it was ingested at, and checkpoints
+    expire after DELIVERY_CHECKPOINT_MAX_AGE_HOURS (see checkpoint.py).
+
+    Config 'run_id' overrides the derived ID: passing the ID of an earlier run
+    resumes it whatever the other arguments are, and a new ID starts over
+    without touching the checkpoints of other runs.
+    """
+    if delivery_type not in DELIVERY_TYPES:
+        raise ValueError(f"Invalid delivery type '{delivery_type}'. Must be one of {', '.join(DELIVERY_TYPES)}.")
+    # Hooked on the first delivery rather than on import, so importing the stages patches nothing
+    api_accounting.install()
+
+    defaults = project.defaults
+    sheet_name = config.get('input_sheet_name', defaults['input_sheet_name'])
+    output_dir = config.get('output_dir', defaults['output_dir'])
+    os.makedirs(output_dir, exist_ok=True)
+    ctx = {
+        'project': project,
+        'config': config,
+        'source_kind': source_kind,
+        'source': source,
+        'sheet_id': source if source_kind == 'sheet' else config.get('input_sheet_id', defaults['input_sheet_id']),
+        'sheet_name': sheet_name,
+        'delivery_type': delivery_type,
+        'emails': emails,
+        'run_validation': validate,
+        'drive_service': drive_service,
+        # Reworks only download and parse notebooks whose Drive revision changed since the last delivery
+        'incremental': delivery_type == 'rework',
+        'output_dir': output_dir,
+        'json_output_dir': config.get('json_output_dir', defaults['json_output_dir']),
+        'parsed_path': f'{output_dir}/parsed_input_batch.jsonl',
+        'client_path': f'{output_dir}/client_parsed_batch.jsonl',
+    }
+    ctx['upload_dir'] = f'{output_dir}/{sheet_name}' if project.cleaned_output else ctx['json_output_dir']
+
+    if source_kind == 'json':
+        ctx['json_data'] = source
+        run_source = hashlib.sha256(json.dumps(source, sort_keys=True).encode("utf-8")).hexdigest()
+    else:
+        run_source = source
+    checkpoint = RunCheckpoint(config.get('run_id') or make_run_id(project.key, run_source, sheet_name, delivery_type, validate))
+    ctx['checkpoint'] = checkpoint
+    with DeliveryManifest() as manifest:
+        ctx['manifest'] = manifest
+        ctx = pipeline.run(ctx, checkpoint)
+    return ctx.get('result', ctx.get('notify'))
@@ -0,0 +1,196 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+from delivery_workflow.data_ingest.src.input_connectors.retrievers.gdrive_retriever import (
+    RevisionInstructionByRevId,
+    RevisionSelectionByRevId,
+)
+
+DELIVERY_MANIFEST_PATH = os.getenv("DELIVERY_MANIFEST_PATH", "output/delivery_manifest.sqlite")
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DeliveryManifest:
+    """
+    Local SQLite record of what was delivered for each notebook.
+
+    One row per (project, file_id) holds the delivered Drive revision, the hash
+    of the notebook content, the output JSON and its hash. Rework deliveries
+    use it to download, validate and parse only the notebooks that changed,
+    and restore the output of the unchanged ones so the delivery stays complete.
+    Use it as a context manager, or call close(), to close the database.
+    """
+
+    def __init__(self, path: str = DELIVERY_MANIFEST_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS delivered (
+                project TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                original_uri TEXT,
+                revision_id TEXT,
+                content_hash TEXT,
+                output_hash TEXT,
+                output_json TEXT,
+                delivered_at TEXT,
+                PRIMARY KEY (project, file_id)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, project: str, file_id: str):
+        """Returns the delivered row for a notebook as a dict, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT original_uri, revision_id, content_hash, output_hash, output_json "
+                "FROM delivered WHERE project = ? AND file_id = ?",
+                (project, file_id),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ["original_uri", "revision_id", "content_hash", "output_hash", "output_json"]
+        return dict(zip(keys, row))
+
+    def revision_instructions(self, project: str) -> dict:
+        """
+        Builds a revision_instructions_map for the input connectors: notebooks whose
+        latest Drive revision is still the delivered one come back SKIPPED and are
+        not downloaded. Notebooks not in the manifest use the default (latest).
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT original_uri, revision_id FROM delivered WHERE project = ? AND revision_id IS NOT NULL",
+                (project,),
+            ).fetchall()
+        return {
+            uri: RevisionInstructionByRevId(how=RevisionSelectionByRevId.LATEST_NOT_EQ, revision_id=revision_id)
+            for uri, revision_id in rows
+            if uri
+        }
+
+    def record(self, project: str, entries: list[dict]):
+        """
+        Records delivered notebooks. Each entry has file_id, original_uri,
+        revision_id, content_hash and output (the output JSON object).
+        """
+        delivered_at = datetime.now().isoformat(timespec="seconds")
+        rows = []
+        for entry in entries:
+            output_json = json.dumps(entry["output"], sort_keys=True, ensure_ascii=False)
+            rows.append((
+                project,
+                entry["file_id"],
+                entry.get("original_uri"),
+                entry.get("revision_id"),
+                entry.get("content_hash"),
+                sha256_text(output_json),
+                output_json,
+                delivered_at,
+            ))
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO delivered VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.commit()
+        print(f"Recorded {len(rows)} delivered notebooks in the {project} manifest.")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def split_changed_items(manifest: DeliveryManifest, project: str, input_batch: dict, incremental: bool = True):
+    """
+    Splits a connector batch (as_json=True) into changed and unchanged notebooks.
+
+    Items SKIPPED by the manifest revision instructions are unchanged. Items that
+    were downloaded but whose content hash matches the delivered one (a new
+    revision with identical content) are unchanged as well. Everything else,
+    including notebooks never delivered, is changed. With incremental=False every
+    item is treated as changed; only the content info is collected.
+
+    Returns (changed_batch, unchanged_items, content_info) where content_info maps
+    file_id to the revision and content hash to record after delivery.
+    """
+    changed = []
+    unchanged = []
+    content_info = {}
+    for item in input_batch["items"]:
+        data = item["metadata"]["data"]
+        file_id = data.get("file_id")
+        delivered = manifest.get(project, file_id) if incremental and file_id else None
+        if delivered and item["metadata"]["status"] == "SKIPPED":
+            unchanged.append(item)
+            continue
+        if item["content"] is not None and file_id:
+            content_hash = sha256_text(item["content"])
+            content_info[file_id] = {
+                "original_uri": data.get("original_uri"),
+                "revision_id": data.get("requested_revision_id"),
+                "content_hash": content_hash,
+            }
+            if delivered and delivered["content_hash"] == content_hash:
+                unchanged.append(item)
+                continue
+        changed.append(item)
+    if incremental:
+        print(f"Manifest: {len(changed)} changed notebooks, {len(unchanged)} unchanged since last delivery.")
+    return dict(input_batch, items=changed), unchanged, content_info
+
+
+def restore_outputs(
+    manifest: DeliveryManifest, project: str, unchanged_items: list, output_jsonl_path: str, drop_keys=()
+) -> int:
+    """
+    Appends the delivered output JSON of unchanged notebooks to the output JSONL
+    file, with the item metadata refreshed from the current sheet row (minus
+    `drop_keys`, the columns the pipeline removes from delivered metadata).
+    Returns the number of restored outputs.
+    """
+    restored = 0
+    with open(output_jsonl_path, "a", encoding="utf-8") as f:
+        for item in unchanged_items:
+            data = dict(item["metadata"]["data"])
+            delivered = manifest.get(project, data.get("file_id"))
+            if delivered is None:
+                continue
+            output = json.loads(delivered["output_json"])
+            for key in list(drop_keys) + ["input_status_not_ok_msg"]:
+                data.pop(key, None)
+            output.setdefault("metadata", {})["data"] = data
+            f.write(json.dumps(output) + "\n")
+            restored += 1
+    print(f"Restored {restored} unchanged outputs from the {project} manifest.")
+    return restored
+
+
+def record_delivery(manifest: DeliveryManifest, project: str, output_jsonl_path: str, content_info: dict):
+    """Records every output in the delivered JSONL file that was produced from a downloaded notebook."""
+    entries = []
+    with open(output_jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            output = json.loads(line)
+            file_id = output.get("metadata", {}).get("data", {}).get("file_id")
+            if file_id in content_info:
+                entries.append({"file_id": file_id, "output": output, **content_info[file_id]})
+    manifest.record(project, entries)
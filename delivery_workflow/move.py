@@ -3,6 +3,7 @@ import os
 import re
 import logging
 from datetime import datetime
+from typing import Callable, Optional
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
@@ -117,8 +118,8 @@ def extract_file_id(link: str) -> str:
     match = pattern.search(link)
     return match.group(1) if match else ""
 
-def move_file(file_id: str, dest_folder_id: str):
-    """Move a file to a different folder and log the result"""
+def move_file(file_id: str, dest_folder_id: str) -> bool:
+    """Move a file to a different folder, log the result and return whether it moved"""
     try:
         service = get_drive_service()
         # Get the file's current parents and name
@@ -136,18 +137,22 @@ def move_file(file_id: str, dest_folder_id: str):
         log_message = f"Moved file: {file_name} (ID: {file_id})"
         print(log_message)
         logging.info(log_message)
+        return True
     except Exception as e:
         error_message = f"Error moving file {file_id}: {e}"
         print(error_message)
         logging.error(error_message)
+        return False
 
-def move_files_from_sheet(tab_name: str, sheet_url: str, dest_folder_id: str):
+def move_files_from_sheet(tab_name: str, sheet_url: str, dest_folder_id: str, skip_ids: Optional[set] = None, on_moved: Optional[Callable[[str], None]] = None):
     """
     Main function to read links from Google Sheets and move the files.
 
     :param tab_name: Name of the sheet tab to read links from
     :param sheet_url: URL of the Google Sheet
     :param dest_folder_id: Destination Google Drive folder ID
+    :param skip_ids: IDs of files already moved, e.g. by an earlier attempt of the delivery
+    :param on_moved: Called with the ID of every file that was moved
     """
     sheet_id = get_sheet_id(sheet_url)
     if not sheet_id:
@@ -159,8 +164,11 @@ def move_files_from_sheet(tab_name: str, sheet_url: str, dest_folder_id: str):
         return
     for link in links:
         file_id = extract_file_id(link)
-        if file_id:
-            move_file(file_id, dest_folder_id)
+        if file_id and skip_ids and file_id in skip_ids:
+            print(f"⏩ Skipping file {file_id}, already moved")
+        elif file_id:
+            if move_file(file_id, dest_folder_id) and on_moved is not None:
+                on_moved(file_id)
         else:
             log_message = f"Invalid file link: {link}"
             print(log_message)
@@ -1,4 +1,5 @@
 import json
+from collections.abc import Mapping
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
 import json
@@ -321,7 +322,7 @@ def process_single_notebook(notebook):
             }
         }
     """
-    if not isinstance(notebook, dict):
+    if not isinstance(notebook, Mapping):
         return {"status": "FAILED", "error_msg": "Notebook should be a dictionary."}
     try:
         content_data = json.loads(notebook.get('content', '{}'))
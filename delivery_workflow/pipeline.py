@@ -0,0 +1,181 @@
+import time
+import contextvars
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Optional
+
+from delivery_workflow.checkpoint import RunCheckpoint
+from delivery_workflow import tracing
+
+
+class StopPipeline(Exception):
+    """
+    Raised by a stage to end the run early, e.g. after emailing validation
+    issues. `result` becomes the result of the run.
+    """
+
+    def __init__(self, result: Any):
+        super().__init__(result)
+        self.result = result
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline.
+
+    `fn` receives the run context (a dict) and its return value is stored in the
+    context under the stage name. `after` lists the stages that must finish
+    first; None means the stage before it in the pipeline. Stages whose
+    dependencies are met run concurrently, up to the pipeline's `max_parallel`.
+    A stage whose `when` predicate is false is skipped and its result is None.
+    Failures are retried `retries` times with exponential backoff starting at
+    `retry_delay` seconds. Results of checkpointed stages must be JSON serializable.
+    `is_current(context, result)` is asked before a checkpointed result is
+    reused; if it returns False, e.g. because the inputs the stage read have
+    changed since, the checkpoints of the stage and of every stage depending
+    on it are discarded and they run again.
+    """
+    name: str
+    fn: Callable[[dict], Any]
+    after: Optional[tuple] = None
+    when: Optional[Callable[[dict], bool]] = None
+    retries: int = 0
+    retry_delay: float = 2.0
+    checkpoint: bool = True
+    is_current: Optional[Callable[[dict, Any], bool]] = None
+
+
+class Pipeline:
+    """
+    Runs a graph of stages, with per-stage timing, retries and checkpointing.
+
+    Every run is traced (see tracing.py): each stage is a span, so stages can
+    open nested spans and count items, and the run summary is logged when the
+    run ends. Stage durations are also stored in the context under 'timings'. With a RunCheckpoint, completed
+    stages are loaded instead of executed (their names are collected in the
+    context under 'resumed'), so a failed run resumes at its first incomplete stage.
+    """
+
+    def __init__(self, name: str, stages: list[Stage], max_parallel: int = 1):
+        self.name = name
+        self.stages = stages
+        self.max_parallel = max_parallel
+        self.dependencies = {}
+        previous = None
+        for stage in stages:
+            if stage.name in self.dependencies:
+                raise ValueError(f"Duplicate stage '{stage.name}' in pipeline '{name}'")
+            after = stage.after if stage.after is not None else ((previous,) if previous else ())
+            for dependency in after:
+                if dependency not in self.dependencies:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown or later stage '{dependency}'")
+            self.dependencies[stage.name] = set(after)
+            previous = stage.name
+
+    def dependents(self, name: str) -> set:
+        """The stages that depend on the given stage, directly or through other stages."""
+        found = set()
+        for stage in self.stages:
+            if self.dependencies[stage.name] & (found | {name}):
+                found.add(stage.name)
+        return found
+
+    def _run_stage(self, stage: Stage, context: dict, checkpoint: Optional[RunCheckpoint]):
+        if checkpoint is not None and stage.checkpoint and checkpoint.is_done(stage.name):
+            result = checkpoint.load(stage.name)
+            if stage.is_current is None or stage.is_current(context, result):
+                print(f"⏩ Stage '{stage.name}' already completed, skipping")
+                context["resumed"].add(stage.name)
+                return result
+            print(f"🔄 Inputs of stage '{stage.name}' changed since it completed, running it again")
+            # The stages after it have not started yet, as they wait for this one
+            for name in {stage.name} | self.dependents(stage.name):
+                checkpoint.discard(name)
+
+        attempt = 0
+        while True:
+            try:
+                result = stage.fn(context)
+                break
+            except StopPipeline:
+                raise
+            except Exception as e:
+                if attempt >= stage.retries:
+                    raise
+                delay = stage.retry_delay * 2 ** attempt
+                attempt += 1
+                print(f"⚠️ Stage '{stage.name}' failed ({e}), retrying in {delay:.0f}s ({attempt}/{stage.retries})")
+                time.sleep(delay)
+
+        if checkpoint is not None and stage.checkpoint:
+            checkpoint.save(stage.name, result)
+        return result
+
+    def _timed(self, stage: Stage, context: dict, checkpoint: Optional[RunCheckpoint]):
+        start = time.perf_counter()
+        try:
+            with tracing.span(stage.name):
+                return self._run_stage(stage, context, checkpoint)
+        finally:
+            context["timings"][stage.name] = time.perf_counter() - start
+
+    def run(self, context: dict, checkpoint: Optional[RunCheckpoint] = None) -> dict:
+        """
+        Runs the pipeline and returns the context, which holds the result of
+        every stage. If a stage raised StopPipeline, its result is stored under
+        'result'. The checkpoints are cleared once the run finishes or stops;
+        after a failure they are kept for the retry.
+        """
+        context.setdefault("timings", {})
+        context.setdefault("resumed", set())
+        trace = tracing.start_trace(self.name, checkpoint.run_id if checkpoint is not None else "")
+        pending = {stage.name: stage for stage in self.stages}
+        finished = set()
+        running = {}
+        stop = None
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            while pending or running:
+                if stop is None and error is None:
+                    for name, stage in list(pending.items()):
+                        if len(running) >= self.max_parallel:
+                            break
+                        if not self.dependencies[name] <= finished:
+                            continue
+                        del pending[name]
+                        if stage.when is not None and not stage.when(context):
+                            context[name] = None
+                            finished.add(name)
+                            continue
+                        # Each stage runs in a copy of this context so it sees the run's trace
+                        run = contextvars.copy_context().run
+                        running[executor.submit(run, self._timed, stage, context, checkpoint)] = name
+                    if not running:
+                        # Skipped stages may have unblocked others
+                        if pending and any(self.dependencies[name] <= finished for name in pending):
+                            continue
+                        break
+                elif not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        context[name] = future.result()
+                        finished.add(name)
+                    except StopPipeline as e:
+                        stop = stop or e
+                    except Exception as e:
+                        error = error or e
+
+        tracing.finish_trace(trace)
+        if error is not None:
+            raise error
+        if stop is not None:
+            context["result"] = stop.result
+        if checkpoint is not None:
+            checkpoint.clear()
+        return context
@@ -13,14 +13,17 @@ def get_colab_links_from_folder(credentials_path, folder_id):
     Retrieve Colab links from a specific folder in Google Drive.
 
     Args:
-        credentials_path (str): Path to the credentials.json file.
+        credentials_path (str): Path to the credentials.json file, or an already built Drive service.
         folder_id (str): The ID of the folder.
 
     Returns:
         list: A list of Colab links found in the specified folder.
     """
-    creds = Credentials.from_service_account_file(credentials_path)
-    service = build('drive', 'v3', credentials=creds)
+    if isinstance(credentials_path, str):
+        creds = Credentials.from_service_account_file(credentials_path)
+        service = build('drive', 'v3', credentials=creds)
+    else:
+        service = credentials_path
 
     files = []
     page_token = None
@@ -0,0 +1,18 @@
+import pytest
+
+from delivery_workflow.data_ingest.src.gdrive_utils.auth import build_services
+from delivery_workflow.benchmarks.fake_google import FakeGoogleServer
+
+
+@pytest.fixture
+def fake_google():
+    with FakeGoogleServer(latency=0) as server:
+        yield server
+
+
+@pytest.fixture
+def drive_service(fake_google, tmp_path):
+    """A Drive client whose requests go to the in-memory Drive of `fake_google`."""
+    path = fake_google.write_service_account_file(str(tmp_path))
+    with fake_google.redirect():
+        yield build_services(path, services=["drive"])["drive"]
@@ -0,0 +1,150 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from delivery_workflow.checkpoint import RunCheckpoint, make_run_id
+from delivery_workflow.pipeline import Pipeline, Stage
+
+
+def age_checkpoints(checkpoint, seconds):
+    for entry in os.scandir(checkpoint.run_dir):
+        os.utime(entry.path, (time.time() - seconds, time.time() - seconds))
+
+
+def test_make_run_id_is_stable_per_delivery():
+    assert make_run_id("apex", "sheet", "Batch 1", "normal", True) == make_run_id("apex", "sheet", "Batch 1", "normal", True)
+    assert make_run_id("apex", "sheet", "Batch 1", "normal", True) != make_run_id("apex", "sheet", "Batch 1", "rework", True)
+
+
+def test_checkpoint_resumes_saved_stages(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    checkpoint.save("ingest", {"items": [1, 2]})
+
+    resumed = RunCheckpoint("run", str(tmp_path))
+
+    assert resumed.resumed
+    assert resumed.is_done("ingest")
+    assert resumed.load("ingest") == {"items": [1, 2]}
+    assert not resumed.is_done("parse")
+
+
+def test_checkpoints_older_than_max_age_are_discarded(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    checkpoint.save("ingest", {"items": []})
+    age_checkpoints(checkpoint, 2 * 3600)
+
+    assert RunCheckpoint("run", str(tmp_path), max_age=timedelta(hours=3)).is_done("ingest")
+    expired = RunCheckpoint("run", str(tmp_path), max_age=timedelta(hours=1))
+    assert not expired.resumed
+    assert not expired.is_done("ingest")
+
+
+def test_checkpoints_without_max_age_are_kept(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    checkpoint.save("ingest", {"items": []})
+    age_checkpoints(checkpoint, 30 * 24 * 3600)
+
+    assert RunCheckpoint("run", str(tmp_path), max_age=None).is_done("ingest")
+
+
+def test_discard_removes_one_stage(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    checkpoint.save("ingest", 1)
+    checkpoint.save("parse", 2)
+
+    checkpoint.discard("ingest")
+    checkpoint.discard("missing")
+
+    assert not checkpoint.is_done("ingest")
+    assert checkpoint.is_done("parse")
+
+
+def test_save_rejects_results_json_cannot_encode(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+
+    with pytest.raises(TypeError, match="datetime"):
+        checkpoint.save("ingest", {"at": datetime(2024, 1, 1)})
+    assert not checkpoint.is_done("ingest")
+
+
+def test_completed_items_survive_a_retry_until_discarded(tmp_path):
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    assert checkpoint.completed_items("move") == set()
+    checkpoint.mark_item_done("move", "a")
+    checkpoint.mark_item_done("move", "b")
+
+    resumed = RunCheckpoint("run", str(tmp_path))
+
+    assert resumed.resumed
+    assert not resumed.is_done("move")
+    assert resumed.completed_items("move") == {"a", "b"}
+    resumed.discard("move")
+    assert resumed.completed_items("move") == set()
+
+
+def recording_pipeline(calls, is_current=None, fail_at=None):
+    """source -> ingest -> parse -> notify, and an `audit` stage that only depends on source."""
+    def stage(name):
+        def fn(ctx):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return f"{name} result"
+        return fn
+
+    return Pipeline("test", [
+        Stage("source", stage("source")),
+        Stage("audit", stage("audit")),
+        Stage("ingest", stage("ingest"), after=("source",), is_current=is_current),
+        Stage("parse", stage("parse")),
+        Stage("notify", stage("notify")),
+    ])
+
+
+def failed_run(tmp_path, fail_at):
+    calls = []
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    try:
+        recording_pipeline(calls, fail_at=fail_at).run({}, checkpoint)
+    except RuntimeError:
+        pass
+    return calls
+
+
+def test_retry_resumes_at_the_failed_stage(tmp_path):
+    failed_run(tmp_path, fail_at="notify")
+    calls = []
+
+    context = recording_pipeline(calls).run({}, RunCheckpoint("run", str(tmp_path)))
+
+    assert calls == ["notify"]
+    assert context["parse"] == "parse result"
+    assert context["resumed"] == {"source", "ingest", "parse", "audit"}
+
+
+def test_stale_stage_reruns_with_its_dependents(tmp_path):
+    failed_run(tmp_path, fail_at="notify")
+    calls = []
+    seen = []
+
+    def is_current(ctx, result):
+        seen.append(result)
+        return False
+
+    context = recording_pipeline(calls, is_current=is_current).run({}, RunCheckpoint("run", str(tmp_path)))
+
+    assert seen == ["ingest result"]
+    assert calls == ["ingest", "parse", "notify"]
+    # Stages that do not depend on the stale one are still resumed
+    assert context["resumed"] == {"source", "audit"}
+
+
+def test_current_stage_is_resumed(tmp_path):
+    failed_run(tmp_path, fail_at="notify")
+    calls = []
+
+    recording_pipeline(calls, is_current=lambda ctx, result: True).run({}, RunCheckpoint("run", str(tmp_path)))
+
+    assert calls == ["notify"]
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from delivery_workflow import move as drive_move
+from delivery_workflow.apex import APEX_PIPELINE
+from delivery_workflow.checkpoint import RunCheckpoint
+from delivery_workflow.delivery_stages import ingest_is_current, ingested_revisions, move
+from delivery_workflow.lwc import LWC_PIPELINE
+
+
+def ingest_result(drive, *file_ids, unchanged=()):
+    """An ingest checkpoint of the files at their current revision."""
+    def item(file_id):
+        revision_id = drive.get(file_id)["headRevisionId"]
+        return {"content": None, "metadata": {"data": {"file_id": file_id, "requested_revision_id": revision_id}}}
+
+    return {
+        "input_batch": {"items": [item(file_id) for file_id in file_ids]},
+        "unchanged_items": [item(file_id) for file_id in unchanged],
+    }
+
+
+def test_ingested_revisions_cover_unchanged_items_and_skip_failures():
+    result = {
+        "input_batch": {"items": [
+            {"metadata": {"data": {"file_id": "a", "requested_revision_id": "rev2"}}},
+            {"metadata": {"data": {"file_id": None, "requested_revision_id": None}}},
+            {"metadata": {"data": {"file_id": "c", "requested_revision_id": None}}},
+        ]},
+        "unchanged_items": [{"metadata": {"data": {"file_id": "b", "requested_revision_id": "rev1"}}}],
+    }
+
+    assert ingested_revisions(result) == {"a": "rev2", "b": "rev1"}
+
+
+def test_ingest_is_current_while_no_notebook_changed(fake_google, drive_service):
+    drive = fake_google.drive
+    a = drive.add_file("a.ipynb", "{}")
+    b = drive.add_file("b.ipynb", "{}")
+
+    assert ingest_is_current({"drive_service": drive_service}, ingest_result(drive, a, unchanged=[b]))
+
+
+def test_ingest_is_stale_after_a_notebook_fix(fake_google, drive_service):
+    drive = fake_google.drive
+    a = drive.add_file("a.ipynb", "{}")
+    b = drive.add_file("b.ipynb", "{}")
+    result = ingest_result(drive, a, unchanged=[b])
+
+    drive.add_revision(b, '{"cells": []}')
+
+    assert not ingest_is_current({"drive_service": drive_service}, result)
+
+
+def test_ingest_is_stale_after_a_notebook_is_deleted(fake_google, drive_service):
+    drive = fake_google.drive
+    a = drive.add_file("a.ipynb", "{}")
+    result = ingest_result(drive, a)
+
+    drive.delete(a)
+
+    assert not ingest_is_current({"drive_service": drive_service}, result)
+
+
+@pytest.mark.parametrize("pipeline, delivered_by", [
+    (LWC_PIPELINE, {"upload"}),
+    (APEX_PIPELINE, {"upload", "delivery_sheet"}),
+])
+def test_colabs_are_moved_only_after_the_jsons_are_delivered(pipeline, delivered_by):
+    for stage in delivered_by:
+        assert {"colab_folder", "move"} <= pipeline.dependents(stage)
+
+
+def test_retried_move_skips_the_colabs_already_moved(tmp_path, monkeypatch):
+    links = [f"https://colab.research.google.com/drive/{file_id}" for file_id in ("a", "b", "c")]
+    moved = []
+
+    def move_file(file_id, dest_folder_id):
+        if file_id == "b" and not moved.count("b"):
+            moved.append("b")
+            raise RuntimeError("connection reset")
+        moved.append(file_id)
+        return True
+
+    monkeypatch.setattr(drive_move, "get_google_sheet_data", lambda sheet_id, tab_name: links)
+    monkeypatch.setattr(drive_move, "move_file", move_file)
+    ctx = {"sheet_name": "Batch", "sheet_id": "sheet", "colab_folder": "dest", "checkpoint": RunCheckpoint("run", str(tmp_path))}
+
+    with pytest.raises(RuntimeError):
+        move(ctx)
+    move(ctx)
+
+    assert moved == ["a", "b", "b", "c"]
+
+
+def test_importing_the_stages_does_not_hook_the_google_clients():
+    code = (
+        "import delivery_workflow.delivery_stages\n"
+        "from delivery_workflow import api_accounting\n"
+        "assert not api_accounting._installed"
+    )
+    # A fresh interpreter, as other tests may already have run a delivery
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[2])
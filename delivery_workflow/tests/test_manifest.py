@@ -0,0 +1,142 @@
+import json
+import sqlite3
+
+import pytest
+
+from delivery_workflow.manifest import (
+    DeliveryManifest,
+    record_delivery,
+    restore_outputs,
+    sha256_text,
+    split_changed_items,
+)
+
+
+def item(file_id, content, status="OK", revision_id="rev2", **data):
+    return {
+        "content": content,
+        "metadata": {
+            "status": status,
+            "data": {
+                "file_id": file_id,
+                "original_uri": f"https://colab.research.google.com/drive/{file_id}",
+                "requested_revision_id": revision_id,
+                **data,
+            },
+        },
+    }
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with DeliveryManifest(str(tmp_path / "manifest.sqlite")) as manifest:
+        yield manifest
+
+
+def deliver(manifest, tmp_path, items, project="apex"):
+    """Runs a delivery of `items` whose output is {"answer": <content>} per notebook."""
+    changed, unchanged, content_info = split_changed_items(manifest, project, {"items": items})
+    output_path = tmp_path / "client_parsed_batch.jsonl"
+    with open(output_path, "w", encoding="utf-8") as f:
+        for changed_item in changed["items"]:
+            f.write(json.dumps({"answer": changed_item["content"], "metadata": changed_item["metadata"]}) + "\n")
+    restore_outputs(manifest, project, unchanged, str(output_path))
+    record_delivery(manifest, project, str(output_path), content_info)
+    with open(output_path, "r", encoding="utf-8") as f:
+        return changed, unchanged, [json.loads(line) for line in f]
+
+
+def test_first_delivery_is_all_changed(manifest, tmp_path):
+    changed, unchanged, outputs = deliver(manifest, tmp_path, [item("a", "A"), item("b", "B")])
+
+    assert [i["metadata"]["data"]["file_id"] for i in changed["items"]] == ["a", "b"]
+    assert unchanged == []
+    delivered = manifest.get("apex", "a")
+    assert delivered["revision_id"] == "rev2"
+    assert delivered["content_hash"] == sha256_text("A")
+    assert json.loads(delivered["output_json"]) == outputs[0]
+
+
+def test_rework_splits_changed_items(manifest, tmp_path):
+    deliver(manifest, tmp_path, [item("a", "A"), item("b", "B"), item("c", "C")])
+
+    changed, unchanged, _ = split_changed_items(manifest, "apex", {"items": [
+        # Same revision, not downloaded
+        item("a", None, status="SKIPPED"),
+        # New revision with the same content
+        item("b", "B", revision_id="rev3"),
+        # Edited
+        item("c", "C2", revision_id="rev3"),
+        # Never delivered
+        item("d", "D"),
+    ]})
+
+    assert [i["metadata"]["data"]["file_id"] for i in changed["items"]] == ["c", "d"]
+    assert [i["metadata"]["data"]["file_id"] for i in unchanged] == ["a", "b"]
+
+
+def test_split_without_incremental_changes_everything(manifest, tmp_path):
+    deliver(manifest, tmp_path, [item("a", "A")])
+
+    changed, unchanged, content_info = split_changed_items(
+        manifest, "apex", {"items": [item("a", "A")]}, incremental=False
+    )
+
+    assert len(changed["items"]) == 1
+    assert unchanged == []
+    assert content_info["a"]["content_hash"] == sha256_text("A")
+
+
+def test_rework_restores_unchanged_outputs(manifest, tmp_path):
+    deliver(manifest, tmp_path, [item("a", "A"), item("b", "B")])
+
+    changed, unchanged, outputs = deliver(manifest, tmp_path, [
+        item("a", None, status="SKIPPED", batch="rework-1"),
+        item("b", "B2", revision_id="rev3"),
+    ])
+
+    assert [i["metadata"]["data"]["file_id"] for i in changed["items"]] == ["b"]
+    assert {output["answer"] for output in outputs} == {"A", "B2"}
+    restored = next(output for output in outputs if output["answer"] == "A")
+    # Restored outputs carry the metadata of the current sheet row
+    assert restored["metadata"]["data"]["batch"] == "rework-1"
+    # Only downloaded notebooks are recorded again
+    assert manifest.get("apex", "a")["revision_id"] == "rev2"
+    assert manifest.get("apex", "b")["revision_id"] == "rev3"
+    assert manifest.get("apex", "b")["content_hash"] == sha256_text("B2")
+
+
+def test_restore_drops_removed_columns(manifest, tmp_path):
+    deliver(manifest, tmp_path, [item("a", "A")])
+    output_path = tmp_path / "restored.jsonl"
+
+    restored = restore_outputs(
+        manifest, "apex", [item("a", None, status="SKIPPED", reviewer="x", input_status_not_ok_msg="")],
+        str(output_path), drop_keys=("reviewer",)
+    )
+
+    assert restored == 1
+    data = json.loads(output_path.read_text())["metadata"]["data"]
+    assert "reviewer" not in data
+    assert "input_status_not_ok_msg" not in data
+
+
+def test_revision_instructions_cover_delivered_notebooks(manifest, tmp_path):
+    deliver(manifest, tmp_path, [item("a", "A")])
+
+    instructions = manifest.revision_instructions("apex")
+
+    assert list(instructions) == ["https://colab.research.google.com/drive/a"]
+    assert instructions["https://colab.research.google.com/drive/a"].revision_id == "rev2"
+    assert manifest.revision_instructions("lwc") == {}
+
+
+def test_manifest_persists_and_closes(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    with DeliveryManifest(path) as manifest:
+        manifest.record("apex", [{"file_id": "a", "revision_id": "rev1", "content_hash": "h", "output": {}}])
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        manifest.get("apex", "a")
+    with DeliveryManifest(path) as reopened:
+        assert reopened.get("apex", "a")["revision_id"] == "rev1"
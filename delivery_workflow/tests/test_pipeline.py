@@ -0,0 +1,211 @@
+import threading
+import time
+
+import pytest
+
+from delivery_workflow import pipeline as pipeline_module
+from delivery_workflow.checkpoint import RunCheckpoint
+from delivery_workflow.pipeline import Pipeline, Stage, StopPipeline
+
+
+def recorder(calls, name, result=None):
+    def fn(ctx):
+        calls.append(name)
+        return result if result is not None else f"{name} result"
+    return fn
+
+
+def test_stages_run_after_their_dependencies():
+    calls = []
+    pipeline = Pipeline("test", [
+        Stage("a", recorder(calls, "a")),
+        Stage("b", recorder(calls, "b")),
+        Stage("c", recorder(calls, "c"), after=("a",)),
+        Stage("d", lambda ctx: ctx["b"] + " and " + ctx["c"], after=("b", "c")),
+    ])
+
+    context = pipeline.run({})
+
+    assert calls.index("a") < calls.index("b")
+    assert calls.index("a") < calls.index("c")
+    assert context["d"] == "b result and c result"
+    assert set(context["timings"]) == {"a", "b", "c", "d"}
+
+
+def test_independent_stages_run_in_parallel():
+    # Both branches wait for each other, which only finishes if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline("test", [
+        Stage("start", lambda ctx: None),
+        Stage("left", lambda ctx: barrier.wait(), after=("start",)),
+        Stage("right", lambda ctx: barrier.wait(), after=("start",)),
+        Stage("end", lambda ctx: "done", after=("left", "right")),
+    ], max_parallel=2)
+
+    assert pipeline.run({})["end"] == "done"
+
+
+def test_max_parallel_limits_running_stages():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def stage(ctx):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    Pipeline("test", [Stage(name, stage, after=()) for name in "abcde"], max_parallel=2).run({})
+
+    assert max(peak) == 2
+
+
+def test_invalid_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="unknown or later stage"):
+        Pipeline("test", [Stage("a", lambda ctx: None, after=("b",)), Stage("b", lambda ctx: None)])
+    with pytest.raises(ValueError, match="Duplicate stage"):
+        Pipeline("test", [Stage("a", lambda ctx: None), Stage("a", lambda ctx: None)])
+
+
+def test_skipped_stage_unblocks_its_dependents():
+    calls = []
+    pipeline = Pipeline("test", [
+        Stage("a", recorder(calls, "a")),
+        Stage("optional", recorder(calls, "optional"), when=lambda ctx: ctx["enabled"]),
+        Stage("b", recorder(calls, "b")),
+    ])
+
+    context = pipeline.run({"enabled": False})
+
+    assert calls == ["a", "b"]
+    assert context["optional"] is None
+
+
+def test_chain_of_skipped_stages_unblocks_the_rest():
+    calls = []
+    pipeline = Pipeline("test", [
+        Stage("first", recorder(calls, "first"), when=lambda ctx: False),
+        Stage("second", recorder(calls, "second"), when=lambda ctx: False),
+        Stage("last", recorder(calls, "last")),
+    ])
+
+    pipeline.run({})
+
+    assert calls == ["last"]
+
+
+def test_failed_stage_is_retried_with_backoff(monkeypatch):
+    delays = []
+    monkeypatch.setattr(pipeline_module.time, "sleep", delays.append)
+    attempts = []
+
+    def flaky(ctx):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("Drive 500")
+        return "ok"
+
+    context = Pipeline("test", [Stage("flaky", flaky, retries=3, retry_delay=1.5)]).run({})
+
+    assert context["flaky"] == "ok"
+    assert delays == [1.5, 3.0]
+
+
+def test_stage_failing_every_retry_raises(monkeypatch):
+    monkeypatch.setattr(pipeline_module.time, "sleep", lambda delay: None)
+    attempts = []
+
+    def failing(ctx):
+        attempts.append(1)
+        raise ConnectionError("Drive 500")
+
+    with pytest.raises(ConnectionError):
+        Pipeline("test", [Stage("failing", failing, retries=2)]).run({})
+    assert len(attempts) == 3
+
+
+def test_stop_pipeline_ends_the_run_with_its_result(tmp_path):
+    calls = []
+
+    def gate(ctx):
+        raise StopPipeline("Sent Email with Issues")
+
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    pipeline = Pipeline("test", [
+        Stage("a", recorder(calls, "a")),
+        Stage("gate", gate, retries=3),
+        Stage("b", recorder(calls, "b")),
+    ])
+
+    context = pipeline.run({}, checkpoint)
+
+    assert context["result"] == "Sent Email with Issues"
+    assert calls == ["a"]
+    assert "b" not in context
+    # A stopped run is finished, it does not resume
+    assert not RunCheckpoint("run", str(tmp_path)).resumed
+
+
+def test_finished_run_clears_its_checkpoints(tmp_path):
+    Pipeline("test", [Stage("a", lambda ctx: 1)]).run({}, RunCheckpoint("run", str(tmp_path)))
+
+    assert not RunCheckpoint("run", str(tmp_path)).resumed
+
+
+def test_failed_run_keeps_checkpoints_and_resumes(tmp_path):
+    calls = []
+    fail = [True]
+
+    def flaky(ctx):
+        calls.append("flaky")
+        if fail[0]:
+            raise RuntimeError("SMTP failure")
+        return ctx["a"] + 1
+
+    pipeline = Pipeline("test", [
+        Stage("a", lambda ctx: calls.append("a") or 1),
+        Stage("uncheckpointed", lambda ctx: calls.append("uncheckpointed"), checkpoint=False),
+        Stage("flaky", flaky),
+    ])
+
+    with pytest.raises(RuntimeError, match="SMTP failure"):
+        pipeline.run({}, RunCheckpoint("run", str(tmp_path)))
+    checkpoint = RunCheckpoint("run", str(tmp_path))
+    assert checkpoint.is_done("a")
+    assert not checkpoint.is_done("uncheckpointed")
+    assert not checkpoint.is_done("flaky")
+
+    fail[0] = False
+    context = pipeline.run({}, checkpoint)
+
+    assert calls == ["a", "uncheckpointed", "flaky", "uncheckpointed", "flaky"]
+    assert context["flaky"] == 2
+    assert context["resumed"] == {"a"}
+
+
+def test_error_waits_for_running_stages(tmp_path):
+    finished = []
+
+    def slow(ctx):
+        time.sleep(0.1)
+        finished.append("slow")
+        return "slow result"
+
+    def failing(ctx):
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline("test", [
+        Stage("slow", slow, after=()),
+        Stage("failing", failing, after=()),
+        Stage("after", lambda ctx: finished.append("after"), after=("slow", "failing")),
+    ], max_parallel=2)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run({}, RunCheckpoint("run", str(tmp_path)))
+
+    # The stage running alongside the failure completed and was checkpointed; nothing new started
+    assert finished == ["slow"]
+    assert RunCheckpoint("run", str(tmp_path)).load("slow") == "slow result"
@@ -0,0 +1,31 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from delivery_workflow import tracing
+
+
+def test_trace_reaches_only_threads_given_the_context(capsys):
+    trace = tracing.start_trace("apex", "run")
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            plain = executor.submit(tracing.current_trace).result()
+            copied = executor.submit(contextvars.copy_context().run, tracing.current_trace).result()
+    finally:
+        tracing.finish_trace(trace)
+
+    assert plain is None
+    assert copied is trace
+    assert tracing.current_trace() is None
+
+
+def test_finish_trace_prints_the_summary(capsys):
+    trace = tracing.start_trace("lwc", "run-1")
+    with tracing.span("parse", items=3):
+        pass
+    tracing.count("json_files_written", 3)
+
+    tracing.finish_trace(trace)
+
+    out = capsys.readouterr().out
+    assert "Delivery run run-1 of pipeline 'lwc'" in out
+    assert "parse" in out and "json_files_written=3" in out
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from delivery_workflow.benchmarks.corpus import generate_notebooks, input_batch
+from delivery_workflow.config import settings
+from delivery_workflow.validation.apex_validation import validate_notebooks_in_input_batch
+from delivery_workflow.validation.lwc_validator_reviewer import extract_markdown_from_ipynb, validate_notebook
+
+ISSUE_HEADER = ["Rule ID", "Severity", "Cell", "Issue No.", "Message"]
+
+
+def with_unbolded(content, index, label):
+    notebook = json.loads(content)
+    cell = notebook["cells"][index]
+    cell["source"] = "".join(cell["source"]).replace(f"**{label}**", label, 1)
+    return json.dumps(notebook)
+
+
+def without_cell(content, index):
+    notebook = json.loads(content)
+    del notebook["cells"][index]
+    return json.dumps(notebook)
+
+
+@pytest.fixture
+def issues_sheet(fake_google, tmp_path):
+    credentials_path = fake_google.write_service_account_file(str(tmp_path))
+    spreadsheet_id = fake_google.sheets.add_spreadsheet(sheets={"Issues": [["stale"] * 7]})
+    with fake_google.redirect():
+        yield credentials_path, spreadsheet_id
+
+
+def test_apex_issues_are_written_one_row_per_issue(fake_google, issues_sheet):
+    credentials_path, spreadsheet_id = issues_sheet
+    valid, broken = generate_notebooks("apex", 2)
+    batch = input_batch([valid, with_unbolded(broken, 2, "User")], file_ids=["valid", "broken"])
+
+    result = validate_notebooks_in_input_batch(batch, credentials_path, "Issues", spreadsheet_id)
+
+    assert result["status"] == "failed"
+    assert [item["metadata"]["data"]["file_id"] for item in result["data"]["items"]] == ["valid"]
+    header, *rows = fake_google.sheets.get_values(spreadsheet_id, "Issues")["values"]
+    assert header == ["File ID", "URL"] + ISSUE_HEADER
+    assert [row[0] for row in rows] == ["broken", "broken"]
+    assert [row[2:6] for row in rows] == [
+        ["apex.issue_count.missing_user", "warning", "", ""],
+        ["apex.issue_block.headers_not_bold", "error", "3", ""],
+    ]
+
+
+def test_lwc_issues_are_written_one_row_per_issue(fake_google, issues_sheet, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join(settings.LWC_OUTPUT_DIR, "error"))
+    credentials_path, spreadsheet_id = issues_sheet
+    valid, broken = generate_notebooks("lwc", 2)
+    batch = input_batch([valid, without_cell(broken, 0), "not a notebook"], file_ids=["valid", "broken", "unreadable"])
+
+    result = validate_notebook(batch, credentials_path, "Issues", spreadsheet_id)
+
+    assert result["status"] == "failed"
+    assert [item["metadata"]["data"]["file_id"] for item in result["data"]["items"]] == ["valid"]
+    header, *rows = fake_google.sheets.get_values(spreadsheet_id, "Issues")["values"]
+    assert header == ["File ID", "Collab Link"] + ISSUE_HEADER
+    assert {row[0] for row in rows} == {"broken", "unreadable"}
+    assert [row[2] for row in rows if row[0] == "unreadable"] == ["lwc.notebook.parse_error"]
+    assert all(row[2].startswith("lwc.") and row[3] == "error" for row in rows)
+
+
+def test_extracted_markdown_maps_back_to_notebook_cells():
+    content = json.dumps({"nbformat": 4, "nbformat_minor": 5, "metadata": {}, "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Title\n", "intro"]},
+        {"cell_type": "code", "metadata": {}, "source": "print(1)", "outputs": [], "execution_count": None},
+        {"cell_type": "markdown", "metadata": {}, "source": "**User**"},
+    ]})
+
+    markdown, cell_index = extract_markdown_from_ipynb(content)
+
+    assert markdown == "# Title\nintro\n\n**User**"
+    assert cell_index.cell_at(markdown.index("intro")) == 1
+    assert cell_index.cell_at(markdown.index("**User**")) == 3
+    assert extract_markdown_from_ipynb("not json")[1] is None
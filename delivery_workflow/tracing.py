@@ -0,0 +1,306 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Optional
+
+# Upper bounds in seconds of the latency histogram buckets
+STAGE_BUCKETS = (0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800)
+API_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms, rendered in the Prometheus text
+    exposition format by `render()`. Metrics are keyed by name and labels.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.help.setdefault(name, ("counter", help))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=STAGE_BUCKETS, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.help.setdefault(name, ("histogram", help))
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    def render(self) -> str:
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self.lock:
+            for name in sorted(self.help):
+                kind, help_text = self.help[name]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{fmt(labels)} {value}")
+                    continue
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{fmt(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def status_class(status: Optional[int]) -> str:
+    """'2xx', '4xx', '429' or '5xx' for an HTTP status, 'error' when no response was received."""
+    if status is None:
+        return "error"
+    if status == 429:
+        return "429"
+    return f"{status // 100}xx"
+
+
+class ApiCallStats:
+    """Calls, latency histogram and responses by status class of one Google API method."""
+
+    def __init__(self):
+        self.calls = 0
+        self.batched = 0
+        self.seconds = 0.0
+        self.histogram = Histogram(API_BUCKETS)
+        self.statuses = defaultdict(int)
+
+    def record(self, seconds: float, status: Optional[int]):
+        self.calls += 1
+        self.seconds += seconds
+        self.histogram.observe(seconds)
+        self.statuses[status_class(status)] += 1
+
+    def describe(self) -> str:
+        text = f"{self.calls:6d} requests"
+        if self.batched:
+            text += f" + {self.batched} batched"
+        if self.calls:
+            text += f"  avg {self.seconds / self.calls:.3f}s"
+            slow = self.calls - self.histogram.counts[API_BUCKETS.index(1)]
+            if slow:
+                text += f", {slow} over 1s"
+        errors = {status: count for status, count in sorted(self.statuses.items()) if status != "2xx"}
+        if errors:
+            text += "  " + " ".join(f"{status}={count}" for status, count in errors.items())
+        return text
+
+
+class RunTrace:
+    """
+    Timing spans, item counters and Google API calls of one delivery run.
+
+    Spans nest: a span opened inside another is named `outer/inner`. Spans can
+    carry the number of items they processed, so the summary shows throughput.
+    Everything recorded here is also added to the process-wide METRICS.
+    """
+
+    def __init__(self, pipeline: str, run_id: str = ""):
+        self.pipeline = pipeline
+        self.run_id = run_id
+        self.started_at = time.perf_counter()
+        self.lock = threading.Lock()
+        # (span name, seconds, items)
+        self.spans = []
+        self.counters = defaultdict(int)
+        # (api, method) -> ApiCallStats
+        self.api_calls = defaultdict(ApiCallStats)
+        self.stack = threading.local()
+
+    @contextmanager
+    def span(self, name: str, items: Optional[int] = None):
+        """Times the block. It receives a dict in which it can set 'items' once known."""
+        parents = getattr(self.stack, "names", [])
+        full_name = "/".join(parents + [name])
+        self.stack.names = parents + [name]
+        info = {"items": items}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            seconds = time.perf_counter() - start
+            self.stack.names = parents
+            with self.lock:
+                self.spans.append((full_name, seconds, info["items"]))
+            METRICS.observe(
+                "delivery_stage_seconds", seconds,
+                help="Duration of delivery pipeline stages and spans.",
+                pipeline=self.pipeline, span=full_name,
+            )
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] += value
+        METRICS.inc(
+            "delivery_items_total", value,
+            help="Items processed by delivery pipelines.",
+            pipeline=self.pipeline, counter=name,
+        )
+
+    def record_api_call(self, api: str, method: str, seconds: float, status: Optional[int]):
+        with self.lock:
+            self.api_calls[(api, method)].record(seconds, status)
+
+    def record_batched_call(self, api: str, method: str):
+        with self.lock:
+            self.api_calls[(api, method)].batched += 1
+
+    def api_totals(self) -> dict:
+        """Totals of the Google API calls of the run: HTTP requests, batched calls and responses per status class."""
+        with self.lock:
+            totals = {"calls": 0, "batched": 0, "seconds": 0.0, "statuses": defaultdict(int)}
+            for stats in self.api_calls.values():
+                totals["calls"] += stats.calls
+                totals["batched"] += stats.batched
+                totals["seconds"] += stats.seconds
+                for status, count in stats.statuses.items():
+                    totals["statuses"][status] += count
+        totals["statuses"] = dict(totals["statuses"])
+        return totals
+
+    def summary(self) -> str:
+        total = time.perf_counter() - self.started_at
+        lines = [f"Delivery run {self.run_id or '-'} of pipeline '{self.pipeline}' took {total:.1f}s"]
+        for name, seconds, items in self.spans:
+            line = f"  {name:<40} {seconds:8.2f}s"
+            if items:
+                line += f"  {items} items, {items / seconds if seconds else 0:.1f}/s"
+            lines.append(line)
+        if self.counters:
+            lines.append("  counters: " + ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        if self.api_calls:
+            totals = self.api_totals()
+            statuses = totals["statuses"]
+            failed = sum(count for status, count in statuses.items() if status != "2xx")
+
+            def rate(count):
+                return f"{100 * count / totals['calls']:.1f}%" if totals["calls"] else "0%"
+
+            lines.append(
+                f"  Google API: {totals['calls']} requests, {totals['batched']} batched calls, "
+                f"{totals['seconds']:.1f}s, {failed} failed ({rate(failed)}): "
+                f"4xx {rate(statuses.get('4xx', 0))}, 429 {rate(statuses.get('429', 0))}, 5xx {rate(statuses.get('5xx', 0))}"
+            )
+            for (api, method), stats in sorted(self.api_calls.items()):
+                lines.append(f"    {api + '.' + method:<38} {stats.describe()}")
+        return "\n".join(lines)
+
+
+_current_trace = contextvars.ContextVar("delivery_trace", default=None)
+
+
+def start_trace(pipeline: str, run_id: str = "") -> RunTrace:
+    """Starts tracing a run in the current context."""
+    trace = RunTrace(pipeline, run_id)
+    _current_trace.set(trace)
+    return trace
+
+
+def finish_trace(trace: RunTrace):
+    """Stops tracing a run and prints its timing summary."""
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+    METRICS.inc("delivery_runs_total", help="Delivery pipeline runs.", pipeline=trace.pipeline)
+    print(f"⏱️ {trace.summary()}")
+
+
+def current_trace() -> Optional[RunTrace]:
+    """
+    The trace of the run in the current context. Threads do not inherit the
+    context, so code that hands work to a thread pool submits it through
+    `contextvars.copy_context().run` to keep it traced.
+    """
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, items: Optional[int] = None):
+    """
+    Times a block as a span of the current run; a no-op outside a traced run.
+    The block can set the number of items it processed:
+
+        with span("parse") as s:
+            s["items"] = len(items)
+    """
+    trace = current_trace()
+    if trace is None:
+        yield {"items": items}
+        return
+    with trace.span(name, items) as info:
+        yield info
+
+
+def count(name: str, value: int = 1):
+    """Adds to a per-item counter of the current run."""
+    trace = current_trace()
+    if trace is not None:
+        trace.count(name, value)
+
+
+def record_api_call(api: str, method: str, seconds: float, status: Optional[int]):
+    """
+    Records one Google API HTTP request for the current run and the process
+    metrics. `status` is the HTTP status, or None if no response was received.
+    """
+    trace = current_trace()
+    pipeline = trace.pipeline if trace is not None else "none"
+    METRICS.inc(
+        "google_api_requests_total", help="Google API HTTP requests by response status class.",
+        pipeline=pipeline, api=api, method=method, status=status_class(status),
+    )
+    METRICS.observe(
+        "google_api_request_seconds", seconds, buckets=API_BUCKETS,
+        help="Google API HTTP request latency.", pipeline=pipeline, api=api, method=method,
+    )
+    if trace is not None:
+        trace.record_api_call(api, method, seconds, status)
+
+
+def record_batched_call(api: str, method: str):
+    """Records a call sent inside a batch request; the batch itself is recorded as one request."""
+    trace = current_trace()
+    METRICS.inc(
+        "google_api_batched_calls_total", help="Google API calls sent in batch requests.",
+        pipeline=trace.pipeline if trace is not None else "none", api=api, method=method,
+    )
+    if trace is not None:
+        trace.record_batched_call(api, method)
+
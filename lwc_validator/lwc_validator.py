@@ -2,11 +2,19 @@ import re
 import sys
 import os
 import nbformat
-from typing import List
+from typing import List, Optional, Tuple
+try:
+    from common.cell_index import CellIndex, join_markdown_cells
+    from common.validation_issue import ValidationIssue
+except ImportError:  # run as a script from inside lwc_validator/
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from common.cell_index import CellIndex, join_markdown_cells
+    from common.validation_issue import ValidationIssue
 
 class NotebookValidator:
-    def __init__(self, content: str, file_path: str):
+    def __init__(self, content: str, file_path: str, cell_index: Optional[CellIndex] = None):
         self.content = content
+        self.cell_index = cell_index
         self.sections = {}
         self.errors = []
         self.file_names = set()
@@ -34,7 +42,7 @@ class NotebookValidator:
             if title not in fixed_sections:
                 fixed_sections.add(title)
         if loose_sections - fixed_sections != set():
-            self.errors.append(f"{loose_sections - fixed_sections} is not formatted properly, Please format header to '# Metadata' or '# Conversation' like format.")
+            self.errors.append(ValidationIssue("lwc.sections.header_format", f"{loose_sections - fixed_sections} is not formatted properly, Please format header to '# Metadata' or '# Conversation' like format."))
         # print("loose sections:",loose_sections)
         # print("fixed sections",fixed_sections)
         sections = {}
@@ -44,13 +52,25 @@ class NotebookValidator:
             start = match.end()
             end = loose_matches[i + 1].start() if i + 1 < len(loose_matches) else len(self.content)
             if title in sections:
-                self.errors.append(f"Duplicate section detected: '{title}'. Each section should appear only once.")
+                self.errors.append(ValidationIssue("lwc.sections.duplicate", f"Duplicate section detected: '{title}'. Each section should appear only once."))
+            raw_content = self.content[start:end]
             sections[title] = {
                 'level': level,
-                'content': self.content[start:end].strip()
+                'content': raw_content.strip(),
+                # Offset of the stripped content in self.content, used to resolve cells
+                'offset': start + len(raw_content) - len(raw_content.lstrip())
             }
         self.sections = sections
 
+    def cell_label(self, offset, fallback):
+        """
+        Returns the notebook cell number for an offset in self.content.
+        Falls back to the given estimate when no cell index was provided.
+        """
+        if self.cell_index is None:
+            return fallback
+        return self.cell_index.cell_at(offset)
+
     def validate_metadata(self):
         """
         Validates the metadata section format and its content dynamically.
@@ -58,7 +78,7 @@ class NotebookValidator:
         """
         metadata_title = 'Metadata'
         if metadata_title not in self.sections:
-            self.errors.append("Missing '# Metadata' section.")
+            self.errors.append(ValidationIssue("lwc.metadata.missing_section", "Missing '# Metadata' section."))
             return
 
         metadata_content = self.sections[metadata_title]['content']
@@ -68,9 +88,9 @@ class NotebookValidator:
         if manual_match:
             manual_value = manual_match.group(1).strip()
             if manual_value not in ["True", "False"]:
-                self.errors.append("**manualSetupRequired** must have a value of either 'True' or 'False'.")
+                self.errors.append(ValidationIssue("lwc.metadata.manual_setup_value", "**manualSetupRequired** must have a value of either 'True' or 'False'."))
         else:
-            self.errors.append("Missing '**manualSetupRequired**' or incorrect formatting.")
+            self.errors.append(ValidationIssue("lwc.metadata.manual_setup_missing", "Missing '**manualSetupRequired**' or incorrect formatting."))
 
     def validate_conversation(self):
         """
@@ -97,49 +117,40 @@ class NotebookValidator:
         conversation_title = "Conversation"
         if conversation_title not in self.sections and "#Conversation" not in self.sections:
             self.errors = []
-            self.errors.append("No conversation header found, please add/format a '# Conversation' section to the notebook.")
+            self.errors.append(ValidationIssue("lwc.conversation.missing_section", "No conversation header found, please add/format a '# Conversation' section to the notebook."))
             # self.report_errors()
             conversation_title = "**Conversation**"
             return
         conversation_content = self.sections[conversation_title]["content"]
-        lines = [line.strip() for line in conversation_content.split("\n")]
+        conversation_offset = self.sections[conversation_title]["offset"]
 
         blocks = []
         current_role = None
         current_text = []
+        current_cell = None
         cell_number = 1
         header_pattern = re.compile(r'^#{0,4}\s?\*\*.+\*\*$')
 
+        # Single pass over the raw lines, tracking each line's offset in
+        # self.content so errors can be reported against the exact cell.
         raw_lines = conversation_content.split("\n")
-        for i in range(len(raw_lines)-1):
-            # If this line is a header…
-            if header_pattern.match(raw_lines[i].strip()):
-                # …and the very next line is blank, then flag it.
-                if i > 3 and raw_lines[i-2].strip() == "" and raw_lines[i-2].strip() in ['**Assistant**', '**Blueprint**', '**Implementation plan**', '**Scaffolding code**', '**Code**']:
-                    self.errors.append(
-                        f"❌ Line {i+2}: Please remove extra newline before '{raw_lines[i].strip()}' who has next header/content like '{raw_lines[i+2].strip()[:15]}', if you cannot see any extra newline please check the previous cell's last line."
-                    )
-                elif i <= 2 and raw_lines[i-1].strip() == "":
-                    self.errors.append(
-                        f"❌ Line {i+2}: Extra blank line detected before header '{raw_lines[i].strip()}'. Please remove extra newline space, if you cannot see any extra newline please check the previous cell's last line."
-                    )
-        for line in lines:
-            if user_pattern.match(line):
+        line_offset = conversation_offset
+        for i, raw_line in enumerate(raw_lines):
+            line = raw_line.strip()
+            if 0 < i <= 2 and header_pattern.match(line):
+                self.check_blank_line_before_header(raw_lines, i, line_offset)
+            if user_pattern.match(line) or assistant_pattern.match(line):
                 if current_role:
-                    blocks.append((current_role, "\n".join(current_text).strip(), cell_number))
+                    blocks.append((current_role, "\n".join(current_text).strip(), current_cell))
                     cell_number += 1  # Increment cell count
-                current_role = "User"
-                current_text = []
-            elif assistant_pattern.match(line):
-                if current_role:
-                    blocks.append((current_role, "\n".join(current_text).strip(), cell_number))
-                    cell_number += 1  # Increment cell count
-                current_role = "Assistant"
+                current_role = "User" if user_pattern.match(line) else "Assistant"
+                current_cell = self.cell_label(line_offset, cell_number + 2)
                 current_text = []
             else:
                 current_text.append(line)
+            line_offset += len(raw_line) + 1
         if current_role:
-            blocks.append((current_role, "\n".join(current_text).strip(), cell_number))
+            blocks.append((current_role, "\n".join(current_text).strip(), current_cell))
 
         # **Validating conversation structure**
         last_role = None
@@ -150,18 +161,18 @@ class NotebookValidator:
         for i, (role, text, cell_num) in enumerate(blocks):
             # 1. Ensure no consecutive User blocks
             if last_role == "User" and role == "User":
-                self.errors.append(f"❌ Cell {cell_num + 2}: Consecutive '**User**' blocks found without an '**Assistant**' response in between.")
+                self.errors.append(ValidationIssue("lwc.conversation.consecutive_user", f"❌ Cell {cell_num}: Consecutive '**User**' blocks found without an '**Assistant**' response in between.", cell=cell_num))
             if last_role == "Assistant" and role == "Assistant" and not any(subheading_regex.search(text) for _, subheading_regex in subheading_order[1:]):
                 # if not expecting_subheading_sequence:
-                self.errors.append(f"❌ Cell {cell_num + 2}: Consecutive '**Assistant**' blocks found without a '**User**' in between.")
+                self.errors.append(ValidationIssue("lwc.conversation.consecutive_assistant", f"❌ Cell {cell_num}: Consecutive '**Assistant**' blocks found without a '**User**' in between.", cell=cell_num))
 
             if role == "User":
                 if expecting_user_after_clarification:
                     expecting_user_after_clarification = False  # Clarification Question is correctly followed by User
                 if text.strip() == "":
-                    self.errors.append(f"❌ Cell {cell_num + 2}: User block is empty: missing user prompt.")
+                    self.errors.append(ValidationIssue("lwc.conversation.empty_user", f"❌ Cell {cell_num}: User block is empty: missing user prompt.", cell=cell_num))
                 if subheading_index > 1 and subheading_index < 4:
-                    self.errors.append(f"❌ Cell {cell_num + 2}: Expected '**{subheading_order[subheading_index][0]}**' but found '**User**' response.")
+                    self.errors.append(ValidationIssue("lwc.conversation.unexpected_user", f"❌ Cell {cell_num}: Expected '**{subheading_order[subheading_index][0]}**' but found '**User**' response.", cell=cell_num))
                 assistant_subheadings.clear()   
                 subheading_index = 0
                 
@@ -173,37 +184,72 @@ class NotebookValidator:
                     for subheading_name, subheading_regex in subheading_order:
                         if subheading_regex.search(text):
                             if subheading_name == "Blueprint" and subheading_index > 0:
-                                self.errors.append(f"❌ Cell {cell_num + 2}: Please check if you have missed user prompt before Blueprint.")
+                                self.errors.append(ValidationIssue("lwc.conversation.missing_user_before_blueprint", f"❌ Cell {cell_num}: Please check if you have missed user prompt before Blueprint.", cell=cell_num))
                             if subheading_name in assistant_subheadings and subheading_index <= 4 and subheading_name != "Blueprint":
-                                self.errors.append(f"❌ Cell {cell_num + 2}: Duplicate '**{subheading_name}**' response found.")
+                                self.errors.append(ValidationIssue("lwc.conversation.duplicate_response", f"❌ Cell {cell_num}: Duplicate '**{subheading_name}**' response found.", cell=cell_num))
                                 continue
                             assistant_subheadings.add(subheading_name)  # Mark subheading as found
                             if subheading_index == 0 and subheading_name != "Blueprint":
-                                self.errors.append(f"❌ Cell {cell_num + 2}: Expected '**Blueprint**' but found '**{subheading_name}**' first.")
+                                self.errors.append(ValidationIssue("lwc.conversation.blueprint_not_first", f"❌ Cell {cell_num}: Expected '**Blueprint**' but found '**{subheading_name}**' first.", cell=cell_num))
 
                             elif subheading_name != subheading_order[subheading_index%4][0]:
-                                self.errors.append(f"❌ Cell {cell_num + 2}: Expected '**{subheading_order[subheading_index][0]}**' but found '**{subheading_name}**' out of order.")
+                                self.errors.append(ValidationIssue("lwc.conversation.response_out_of_order", f"❌ Cell {cell_num}: Expected '**{subheading_order[subheading_index][0]}**' but found '**{subheading_name}**' out of order.", cell=cell_num))
                             subheading_index += 1
 
                             if subheading_name == "Blueprint":
-                                self.validate_blueprint(text, cell_num + 2)
+                                self.validate_blueprint(text, cell_num)
                             elif subheading_name.lower() == "Implementation Plan".lower():
-                                self.validate_implementation_plan(text, cell_num + 2)
+                                self.validate_implementation_plan(text, cell_num)
                             elif subheading_name == "Scaffolding code":
-                                self.validate_scaffolding_code(text, cell_num + 2)
+                                self.validate_scaffolding_code(text, cell_num)
                             elif subheading_name == "Code":
-                                self.validate_code(text, cell_num + 2)
+                                self.validate_code(text, cell_num)
                     if subheading_index == 0:
-                        self.errors.append(f"❌ Cell {cell_num + 2}: Expected one of '**Blueprint**, **Implementation plan**, **Scaffolding code**, **Code**' but found none, or did you forgot mention **Clarification Question** header?")
+                        self.errors.append(ValidationIssue("lwc.conversation.missing_subheading", f"❌ Cell {cell_num}: Expected one of '**Blueprint**, **Implementation plan**, **Scaffolding code**, **Code**' but found none, or did you forgot mention **Clarification Question** header?", cell=cell_num))
             last_role = role
 
         # Check if all 4 Assistant subheadings are present in sequence
         missing_subheadings = [subheading[0] for subheading in subheading_order if subheading[0] not in assistant_subheadings]
         if missing_subheadings:
-            self.errors.append(f"❌ Missing required Assistant responses: {', '.join(missing_subheadings)}. Expected all 4 in sequence.")
+            self.errors.append(ValidationIssue("lwc.conversation.missing_responses", f"❌ Missing required Assistant responses: {', '.join(missing_subheadings)}. Expected all 4 in sequence."))
         # If conversation ended but was expecting a User after Clarification Question
         if expecting_user_after_clarification:
-            self.errors.append("❌ Conversation ended, but a '**User**' response was expected after Clarification Question.")
+            self.errors.append(ValidationIssue("lwc.conversation.missing_user_after_clarification", "❌ Conversation ended, but a '**User**' response was expected after Clarification Question."))
+
+    def check_blank_line_before_header(self, raw_lines, i, header_offset):
+        """
+        Flags an extra blank line before the header on raw_lines[i].
+        With a cell index, the newlines added when joining cells are ignored and
+        the error names the cell the extra newline actually belongs to.
+        """
+        header = raw_lines[i].strip()
+        if self.cell_index is None:
+            if raw_lines[i-1].strip() == "":
+                self.errors.append(
+                    ValidationIssue("lwc.conversation.blank_line_before_header", f"❌ Line {i+2}: Extra blank line detected before header '{header}'. Please remove extra newline space, if you cannot see any extra newline please check the previous cell's last line.")
+                )
+            return
+
+        # Walk back over the whitespace before the header, counting the
+        # newlines that were written in a cell rather than by the join.
+        position = header_offset - 1
+        authored_newlines = []
+        while position >= 0 and self.content[position] in " \t\r\n":
+            if self.content[position] == "\n" and not self.cell_index.is_separator(position):
+                authored_newlines.append(position)
+            position -= 1
+
+        header_cell = self.cell_index.cell_at(header_offset)
+        starts_cell = header_offset == 0 or self.cell_index.is_separator(header_offset - 1)
+        if starts_cell and authored_newlines:
+            previous_cell = self.cell_index.cell_at(authored_newlines[0])
+            self.errors.append(
+                ValidationIssue("lwc.conversation.trailing_newline_before_header", f"❌ Cell {previous_cell}: Extra blank line at the end of the cell before header '{header}' (Cell {header_cell}). Please remove the trailing newline from the last line of Cell {previous_cell}.", cell=previous_cell)
+            )
+        elif not starts_cell and len(authored_newlines) >= 2:
+            self.errors.append(
+                ValidationIssue("lwc.conversation.blank_line_before_header", f"❌ Cell {header_cell}: Extra blank line detected before header '{header}'. Please remove extra newline space.", cell=header_cell)
+            )
 
     def validate_blueprint(self, text, cell_num):
         """
@@ -220,7 +266,7 @@ class NotebookValidator:
         
         lines = text.split("\n")
         if len(lines) < 3:
-            self.errors.append(f"❌ Cell {cell_num}: Incomplete Blueprint section.")
+            self.errors.append(ValidationIssue("lwc.blueprint.incomplete", f"❌ Cell {cell_num}: Incomplete Blueprint section.", cell=cell_num))
             return
 
         # ----------------------------------------------------------------
@@ -240,7 +286,7 @@ class NotebookValidator:
         # If no valid headers found at all, raise an error
         if not headers:
             self.errors.append(
-                f"❌ Cell {cell_num}: No valid bold headers found (other than '**Assistant**' and '**Blueprint**')."
+                ValidationIssue("lwc.blueprint.no_headers", f"❌ Cell {cell_num}: No valid bold headers found (other than '**Assistant**' and '**Blueprint**').", cell=cell_num)
             )
             return
 
@@ -299,7 +345,7 @@ class NotebookValidator:
             #    but is not in bold. So let's produce an error:
             if len(line_stripped) < 15:
                 self.errors.append(
-                        f"❌ Cell {cell_num}: Line '{line_stripped}' is a possible header but is not bold formatted (must be `**...**`)."
+                        ValidationIssue("lwc.blueprint.header_not_bold", f"❌ Cell {cell_num}: Line '{line_stripped}' is a possible header but is not bold formatted (must be `**...**`).", cell=cell_num)
                 )
 
         # ----------------------------------------------------------------
@@ -338,7 +384,7 @@ class NotebookValidator:
 
             if not name_line_indices:
                 self.errors.append(
-                    f"❌ Cell {cell_num}: Section '**{header_text}**' does not contain/ not formatted as '**Name**:'"
+                    ValidationIssue("lwc.blueprint.missing_name", f"❌ Cell {cell_num}: Section '**{header_text}**' does not contain/ not formatted as '**Name**:'", cell=cell_num)
                 )
                 # move to next header
                 continue
@@ -350,7 +396,7 @@ class NotebookValidator:
                 # Check if it's in strict bold
                 if not name_strict_regex.match(name_line_stripped):
                     self.errors.append(
-                        f"❌ Cell {cell_num}: 'Name' is not in bold or not formatted correctly: '{name_line_stripped}'."
+                        ValidationIssue("lwc.blueprint.name_format", f"❌ Cell {cell_num}: 'Name' is not in bold or not formatted correctly: '{name_line_stripped}'.", cell=cell_num)
                     )
 
                 # sub-block for searching "What"/"Why": from after this name line until next name or end of section
@@ -369,11 +415,11 @@ class NotebookValidator:
                         # check bold
                         if not what_strict_regex.match(ln_stripped):
                             self.errors.append(
-                                f"❌ Cell {cell_num}: 'What' is not in bold or not formatted correctly: '{ln_stripped}'."
+                                ValidationIssue("lwc.blueprint.what_format", f"❌ Cell {cell_num}: 'What' is not in bold or not formatted correctly: '{ln_stripped}'.", cell=cell_num)
                             )
                 if not has_what:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Missing 'What' entry after 'Name' line: '{name_line_stripped}'."
+                        ValidationIssue("lwc.blueprint.missing_what", f"❌ Cell {cell_num}: Missing 'What' entry after 'Name' line: '{name_line_stripped}'.", cell=cell_num)
                     )
 
                 # Check at least one "Why"
@@ -385,11 +431,11 @@ class NotebookValidator:
                         # check bold
                         if not why_strict_regex.match(ln_stripped):
                             self.errors.append(
-                                f"❌ Cell {cell_num}: 'Why' is not in bold or not formatted correctly: '{ln_stripped}'."
+                                ValidationIssue("lwc.blueprint.why_format", f"❌ Cell {cell_num}: 'Why' is not in bold or not formatted correctly: '{ln_stripped}'.", cell=cell_num)
                             )
                 if not has_why:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Missing 'Why' entry after 'Name' line: '{name_line_stripped}'."
+                        ValidationIssue("lwc.blueprint.missing_why", f"❌ Cell {cell_num}: Missing 'Why' entry after 'Name' line: '{name_line_stripped}'.", cell=cell_num)
                     )
 
     def validate_implementation_plan(self, text, cell_num):
@@ -415,7 +461,7 @@ class NotebookValidator:
 
         lines = text.split("\n")
         if len(lines) < 3:
-            self.errors.append(f"❌ Cell {cell_num}: Incomplete Implementation plan section.")
+            self.errors.append(ValidationIssue("lwc.implementation_plan.incomplete", f"❌ Cell {cell_num}: Incomplete Implementation plan section.", cell=cell_num))
             return
 
         # -------------------------------------------------------------
@@ -433,7 +479,7 @@ class NotebookValidator:
 
         if not headers:
             self.errors.append(
-                f"❌ Cell {cell_num}: No valid bold headers found (other than '**Assistant**'/'**Implementation plan**')."
+                ValidationIssue("lwc.implementation_plan.no_headers", f"❌ Cell {cell_num}: No valid bold headers found (other than '**Assistant**'/'**Implementation plan**').", cell=cell_num)
             )
             return
 
@@ -456,7 +502,7 @@ class NotebookValidator:
             # If we get here, it looks like it might be a header but isn't bolded
             if len(line_stripped) < 15:
                 self.errors.append(
-                        f"❌ Cell {cell_num}: Line '{line_stripped}' is a possible header but is not bold formatted (must be `**...**`)."
+                        ValidationIssue("lwc.implementation_plan.header_not_bold", f"❌ Cell {cell_num}: Line '{line_stripped}' is a possible header but is not bold formatted (must be `**...**`).", cell=cell_num)
                 )
 
         # -------------------------------------------------------------
@@ -537,7 +583,7 @@ class NotebookValidator:
 
             if not name_line_indices:
                 self.errors.append(
-                    f"❌ Cell {cell_num}: Section '**{header_text}**' does not contain/ not formatted as '**Name**:'"
+                    ValidationIssue("lwc.implementation_plan.missing_name", f"❌ Cell {cell_num}: Section '**{header_text}**' does not contain/ not formatted as '**Name**:'", cell=cell_num)
                 )
                 continue
 
@@ -549,13 +595,13 @@ class NotebookValidator:
                 name_match_strict = name_strict_regex.match(name_line_stripped)
                 if not name_match_strict:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: 'Name' is not bold or incorrectly formatted: '{name_line_stripped}'."
+                        ValidationIssue("lwc.implementation_plan.name_format", f"❌ Cell {cell_num}: 'Name' is not bold or incorrectly formatted: '{name_line_stripped}'.", cell=cell_num)
                     )
                 else:
                     name_content = name_match_strict.group(1).strip()
                     if not name_content:
                         self.errors.append(
-                            f"❌ Cell {cell_num}: 'Name' field is empty (no text after the colon)."
+                            ValidationIssue("lwc.implementation_plan.empty_name", f"❌ Cell {cell_num}: 'Name' field is empty (no text after the colon).", cell=cell_num)
                         )
 
                 # Sub-block from after the Name line up to the next Name or end
@@ -581,7 +627,7 @@ class NotebookValidator:
                         match_what_strict = what_strict_regex.match(ln_stripped)
                         if not match_what_strict:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: 'What' is not bold or incorrectly formatted: '{ln_stripped}'."
+                                ValidationIssue("lwc.implementation_plan.what_format", f"❌ Cell {cell_num}: 'What' is not bold or incorrectly formatted: '{ln_stripped}'.", cell=cell_num)
                             )
                         else:
                             content = match_what_strict.group(1).strip()
@@ -589,7 +635,7 @@ class NotebookValidator:
                                 multiline = get_multiline_field_content(i_sub, sub_block, all_field_start_patterns)
                                 if not multiline:
                                     self.errors.append(
-                                        f"❌ Cell {cell_num}: 'What' field is empty (no text inline or in bullets)."
+                                        ValidationIssue("lwc.implementation_plan.empty_what", f"❌ Cell {cell_num}: 'What' field is empty (no text inline or in bullets).", cell=cell_num)
                                     )
                         i_sub += 1
                         continue
@@ -601,7 +647,7 @@ class NotebookValidator:
                         match_why_strict = why_strict_regex.match(ln_stripped)
                         if not match_why_strict:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: 'Why' is not bold or incorrectly formatted: '{ln_stripped}'."
+                                ValidationIssue("lwc.implementation_plan.why_format", f"❌ Cell {cell_num}: 'Why' is not bold or incorrectly formatted: '{ln_stripped}'.", cell=cell_num)
                             )
                         else:
                             content = match_why_strict.group(1).strip()
@@ -609,7 +655,7 @@ class NotebookValidator:
                                 multiline = get_multiline_field_content(i_sub, sub_block, all_field_start_patterns)
                                 if not multiline:
                                     self.errors.append(
-                                        f"❌ Cell {cell_num}: 'Why' field is empty (no text inline or in bullets)."
+                                        ValidationIssue("lwc.implementation_plan.empty_why", f"❌ Cell {cell_num}: 'Why' field is empty (no text inline or in bullets).", cell=cell_num)
                                     )
                         i_sub += 1
                         continue
@@ -621,7 +667,7 @@ class NotebookValidator:
                         match_step_strict = step_strict_regex.match(ln_stripped)
                         if not match_step_strict:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: 'Step' is not bold or incorrectly formatted: '{ln_stripped}'."
+                                ValidationIssue("lwc.implementation_plan.step_format", f"❌ Cell {cell_num}: 'Step' is not bold or incorrectly formatted: '{ln_stripped}'.", cell=cell_num)
                             )
                         else:
                             content = match_step_strict.group(1).strip()
@@ -629,7 +675,7 @@ class NotebookValidator:
                                 multiline = get_multiline_field_content(i_sub, sub_block, all_field_start_patterns)
                                 if not multiline:
                                     self.errors.append(
-                                        f"❌ Cell {cell_num}: 'Step' field is empty (no text inline or in bullets)."
+                                        ValidationIssue("lwc.implementation_plan.empty_step", f"❌ Cell {cell_num}: 'Step' field is empty (no text inline or in bullets).", cell=cell_num)
                                     )
                         i_sub += 1
                         continue
@@ -641,14 +687,14 @@ class NotebookValidator:
                         if field_name in plurals_to_singulars:
                             corrected = plurals_to_singulars[field_name]
                             self.errors.append(
-                                f"❌ Cell {cell_num}: You wrote '{field_name}'. Please correct it to '{corrected}'."
+                                ValidationIssue("lwc.implementation_plan.field_misspelled", f"❌ Cell {cell_num}: You wrote '{field_name}'. Please correct it to '{corrected}'.", cell=cell_num)
                             )
                         # There's no group(2) in optional_bold_field_regex, so field_val is empty
                         field_val = ""
                         multiline = get_multiline_field_content(i_sub, sub_block, all_field_start_patterns)
                         if not multiline:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: Field '{field_name}' is empty (no text inline or in bullets)."
+                                ValidationIssue("lwc.implementation_plan.empty_field", f"❌ Cell {cell_num}: Field '{field_name}' is empty (no text inline or in bullets).", cell=cell_num)
                             )
 
                         # Special handling for 'File' and 'Class'
@@ -671,11 +717,11 @@ class NotebookValidator:
                         if possible_field_name in plurals_to_singulars:
                             corrected = plurals_to_singulars[possible_field_name]
                             self.errors.append(
-                                f"❌ Cell {cell_num}: You wrote '{possible_field_name}'. Please correct it to '{corrected}'."
+                                ValidationIssue("lwc.implementation_plan.field_misspelled", f"❌ Cell {cell_num}: You wrote '{possible_field_name}'. Please correct it to '{corrected}'.", cell=cell_num)
                             )
 
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Field '{possible_field_name}' is not bold-formatted. Must be '**{possible_field_name}**:'."
+                            ValidationIssue("lwc.implementation_plan.field_not_bold", f"❌ Cell {cell_num}: Field '{possible_field_name}' is not bold-formatted. Must be '**{possible_field_name}**:'.", cell=cell_num)
                         )
                         i_sub += 1
                         continue
@@ -685,11 +731,11 @@ class NotebookValidator:
                 # (d) After scanning sub-block, ensure we found required fields
                 if not has_what:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Missing 'What' entry after 'Name' line: '{name_line_stripped}'."
+                        ValidationIssue("lwc.implementation_plan.missing_what", f"❌ Cell {cell_num}: Missing 'What' entry after 'Name' line: '{name_line_stripped}'.", cell=cell_num)
                     )
                 if not has_why:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Missing 'Why' entry after 'Name' line: '{name_line_stripped}'."
+                        ValidationIssue("lwc.implementation_plan.missing_why", f"❌ Cell {cell_num}: Missing 'Why' entry after 'Name' line: '{name_line_stripped}'.", cell=cell_num)
                     )
 
     def _validate_code_lines(
@@ -754,7 +800,7 @@ class NotebookValidator:
 
                 if j >= n:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Expected a code fence (```lang) after file '{full_file_name}', but found none."
+                        ValidationIssue("lwc.code.missing_fence", f"❌ Cell {cell_num}: Expected a code fence (```lang) after file '{full_file_name}', but found none.", cell=cell_num)
                     )
                     break
 
@@ -764,15 +810,15 @@ class NotebookValidator:
                     # Possibly partial backticks or incorrect format
                     if fence_line.count("`") < 3:
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Found partial backticks '{fence_line}'. Triple backticks (```lang) are required."
+                            ValidationIssue("lwc.code.partial_backticks", f"❌ Cell {cell_num}: Found partial backticks '{fence_line}'. Triple backticks (```lang) are required.", cell=cell_num)
                         )
                     elif fence_line.startswith("``` "):
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Please remove extra space after the triple backticks. Found '{fence_line}'."
+                            ValidationIssue("lwc.code.space_after_fence", f"❌ Cell {cell_num}: Please remove extra space after the triple backticks. Found '{fence_line}'.", cell=cell_num)
                         )
                     else:
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Expected a code fence (```lang) after file '{full_file_name}', but found '{fence_line}'."
+                            ValidationIssue("lwc.code.missing_fence", f"❌ Cell {cell_num}: Expected a code fence (```lang) after file '{full_file_name}', but found '{fence_line}'.", cell=cell_num)
                         )
                     i = j
                     continue
@@ -782,19 +828,19 @@ class NotebookValidator:
                 if valid_langs:
                     if declared_lang not in [v.lower() for v in valid_langs]:
                         self.errors.append(
-                            f"❌ Cell {cell_num}: File extension '.{extension}' expects code fence language "
-                            f"{valid_langs}, but found '{declared_lang}'."
+                            ValidationIssue("lwc.code.fence_language", f"❌ Cell {cell_num}: File extension '.{extension}' expects code fence language "
+                            f"{valid_langs}, but found '{declared_lang}'.", cell=cell_num)
                         )
                 else:
                     if not scaf_required and extension.lower() == 'scaf':
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Found '.scaf' extension in '{full_file_name}' but this is not a scaffolding code block."
+                            ValidationIssue("lwc.code.unexpected_scaf", f"❌ Cell {cell_num}: Found '.scaf' extension in '{full_file_name}' but this is not a scaffolding code block.", cell=cell_num)
                         )
                     else:    
                     # Unrecognized extension for this code block map
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Unrecognized file extension '.{extension}' in '{full_file_name}'. "
-                            "Cannot validate code block language."
+                            ValidationIssue("lwc.code.unknown_extension", f"❌ Cell {cell_num}: Unrecognized file extension '.{extension}' in '{full_file_name}'. "
+                            "Cannot validate code block language.", cell=cell_num)
                         )
 
                 # Find the closing fence
@@ -808,7 +854,7 @@ class NotebookValidator:
 
                 if not found_closing_fence:
                     self.errors.append(
-                        f"❌ Cell {cell_num}: Code block for file '{full_file_name}' is not closed with ```."
+                        ValidationIssue("lwc.code.unclosed_block", f"❌ Cell {cell_num}: Code block for file '{full_file_name}' is not closed with ```.", cell=cell_num)
                     )
                     i = k
                     continue
@@ -829,14 +875,14 @@ class NotebookValidator:
                     if not scaf_suffix_regex.search(loose_file_name):
                         # => error: ".scaf is missing in file name"
                         self.errors.append(
-                            f"❌ Cell {cell_num}: '.scaf' is missing in file name '{loose_file_name}'."
+                            ValidationIssue("lwc.code.missing_scaf", f"❌ Cell {cell_num}: '.scaf' is missing in file name '{loose_file_name}'.", cell=cell_num)
                         )
                     else:
                         # If they typed backticks but still didn't match the main pattern,
                         # it might be some other formatting issue.
                         self.errors.append(
-                            f"❌ Cell {cell_num}: File name was not formatted properly: '{loose_file_name}'. "
-                            "Expected e.g. `MyFile.html.scaf`."
+                            ValidationIssue("lwc.code.file_name_format", f"❌ Cell {cell_num}: File name was not formatted properly: '{loose_file_name}'. "
+                            "Expected e.g. `MyFile.html.scaf`.", cell=cell_num)
                         )
 
                     # Move forward by 1 line only
@@ -849,7 +895,7 @@ class NotebookValidator:
                     # something else. We could note a generic message.
                     file_name = loose_match.group(1).strip()
                     self.errors.append(
-                        f"❌ Cell {cell_num}: File name was not formatted properly: '{file_name}'. "
+                        ValidationIssue("lwc.code.file_name_format", f"❌ Cell {cell_num}: File name was not formatted properly: '{file_name}'. ", cell=cell_num)
                     )
                     i += 1
 
@@ -858,17 +904,17 @@ class NotebookValidator:
                     #     Could be code fences or partial backticks or plain text
                     if line.count("`") in [1,2]:
                         self.errors.append(
-                            f"❌ Cell {cell_num}: Found partial backticks '{line}'. Triple backticks (```lang) are required."
+                            ValidationIssue("lwc.code.partial_backticks", f"❌ Cell {cell_num}: Found partial backticks '{line}'. Triple backticks (```lang) are required.", cell=cell_num)
                         )
                     elif line.startswith("```"):
                         # It's a code fence but there's no preceding filename
                         if scaf_required:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: Expected a '.scaf' file name before starting a code fence, but found none. '{line}'"
+                                ValidationIssue("lwc.code.missing_scaf_file_name", f"❌ Cell {cell_num}: Expected a '.scaf' file name before starting a code fence, but found none. '{line}'", cell=cell_num)
                             )
                         else:
                             self.errors.append(
-                                f"❌ Cell {cell_num}: Found a code fence with no preceding filename. '{line}'"
+                                ValidationIssue("lwc.code.fence_without_file_name", f"❌ Cell {cell_num}: Found a code fence with no preceding filename. '{line}'", cell=cell_num)
                             )
                     # else no specific pattern => just continue scanning
                     i += 1
@@ -992,9 +1038,10 @@ class NotebookValidator:
         self.validate_structure()
         self.report_errors()
 
-def extract_markdown_from_ipynb(filepath: str) -> str:
+def extract_markdown_from_ipynb(filepath: str) -> Tuple[str, CellIndex]:
     """
     Extracts and concatenates all Markdown cells from a Jupyter Notebook (.ipynb) file.
+    Returns the markdown content and a CellIndex mapping it back to notebook cells.
     """
     try:
         nb = nbformat.read(filepath, as_version=4)
@@ -1002,9 +1049,7 @@ def extract_markdown_from_ipynb(filepath: str) -> str:
         print(f"🚫 Failed to read the notebook file: {e}")
         sys.exit(1)
 
-    markdown_cells = [cell['source'] for cell in nb.cells if cell['cell_type'] == 'markdown']
-    markdown_content = '\n\n'.join(markdown_cells)
-    return markdown_content
+    return join_markdown_cells(nb.cells)
 
 def validate_notebook(filepath: str):
     """Validates a single notebook file."""
@@ -1012,9 +1057,9 @@ def validate_notebook(filepath: str):
         print(f"🚫 Skipping {filepath}: Not a valid .ipynb file.")
         return
     
-    content = extract_markdown_from_ipynb(filepath)
+    content, cell_index = extract_markdown_from_ipynb(filepath)
     if content:
-        validator = NotebookValidator(content,filepath)
+        validator = NotebookValidator(content, filepath, cell_index)
         validator.validate()
 
 def validate_folder(folder_path: str):
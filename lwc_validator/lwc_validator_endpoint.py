@@ -1,77 +1,79 @@
-import re
-import io
-import os
-import json
 from io import StringIO
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaIoBaseDownload
+from typing import Callable, List, Optional, Tuple
 import nbformat
 from lwc_validator.lwc_validator import NotebookValidator
+from common.cell_index import join_markdown_cells
+import lwc_validator.lwc_validator as lwc_validator_module
+import common.cell_index as cell_index_module
+from common.validation_cache import validation_cache, validator_version, content_hash
+from common.validation_issue import ValidationIssue
+from common.notebook_fetch import extract_file_id, get_drive_service, fetch_metadata, download_notebook
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
-def validate_lwc_notebook(notebook_link: str) -> str:
-    output_buffer = StringIO()
+VALIDATOR_VERSION = "lwc-" + validator_version(lwc_validator_module, cell_index_module)
 
-    try:
-        # Extract file ID
-        file_id_match = re.search(r'/drive/([a-zA-Z0-9_-]+)', notebook_link) or \
-                        re.search(r'/file/d/([a-zA-Z0-9_-]+)', notebook_link) or \
-                        re.search(r'fileId=([a-zA-Z0-9_-]+)', notebook_link)
-        if not file_id_match:
-            raise ValueError("Invalid notebook link format. Could not extract file ID.")
-        file_id = file_id_match.group(1)
+def validate_lwc_content(content: str, file_id: str) -> Tuple[List[ValidationIssue], str]:
+    """
+    Parses the raw notebook JSON and validates it as an LWC notebook.
+    Returns the errors and the content hash they are cached under. Kept at module
+    level so bulk validation can run it in a process pool.
+    """
+    nb = nbformat.reads(content, as_version=4)
+    markdown_content, cell_index = join_markdown_cells(nb.cells)
+    markdown_hash = content_hash(markdown_content, cell_index.cell_numbers)
 
-        # Load credentials
-        credentials_json = os.getenv("GOOGLE_CREDENTIALS")
-        if not credentials_json:
-            raise ValueError("Google credentials not found in environment variables")
-        creds = service_account.Credentials.from_service_account_info(
-            json.loads(credentials_json),
-            scopes=['https://www.googleapis.com/auth/drive.readonly']
-        )
-        drive_service = build('drive', 'v3', credentials=creds)
+    errors = validation_cache.get(VALIDATOR_VERSION, markdown_hash)
+    if errors is None:
+        validator = NotebookValidator(markdown_content, f"{file_id}.ipynb", cell_index)
+        validator.validate_structure()
+        errors = validator.errors
+    return errors, markdown_hash
 
-        # Verify access
-        try:
-            drive_service.files().get(fileId=file_id).execute()
-        except Exception as e:
-            if "403" in str(e):
-                raise PermissionError("Permission denied: Share the notebook with the service account.")
-            elif "404" in str(e):
-                raise FileNotFoundError("Notebook not found.")
-            else:
-                raise Exception(f"Failed to verify notebook: {e}")
+def validate_lwc_link(notebook_link: str, progress: Optional[Callable[[int], None]] = None) -> Tuple[str, List[ValidationIssue], bool]:
+    """
+    Fetches the notebook behind a Colab/Drive link and validates it as an LWC notebook.
+    Returns (file_id, issues, cached). Raises ValueError, PermissionError or
+    FileNotFoundError when the link cannot be resolved or read.
+    """
+    file_id = extract_file_id(notebook_link)
+    drive_service = get_drive_service()
 
-        # Download file
-        request = drive_service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            output_buffer.write(f"Download progress: {int(status.progress() * 100)}%\n")
-        fh.seek(0)
-        content = fh.read().decode("utf-8")
+    # Single metadata request; also verifies access (md5Checksum lets unchanged notebooks skip the download)
+    metadata = fetch_metadata(drive_service, file_id)
+    md5_checksum = metadata.get("md5Checksum")
 
-        # Parse notebook
-        nb = nbformat.reads(content, as_version=4)
-        markdown_cells = [cell['source'] for cell in nb.cells if cell['cell_type'] == 'markdown']
-        markdown_content = "\n\n".join(markdown_cells)
+    markdown_hash = validation_cache.content_hash_for(VALIDATOR_VERSION, file_id, md5_checksum)
+    if markdown_hash:
+        errors = validation_cache.get(VALIDATOR_VERSION, markdown_hash)
+        if errors is not None:
+            return file_id, errors, True
 
-        # Validate
-        validator = NotebookValidator(markdown_content, f"{file_id}.ipynb")
-        validator.validate_structure()
+    content = download_notebook(drive_service, file_id, progress=progress).decode("utf-8")
+    errors, markdown_hash = validate_lwc_content(content, file_id)
+    validation_cache.remember_checksum(VALIDATOR_VERSION, file_id, md5_checksum, markdown_hash)
+    validation_cache.put(VALIDATOR_VERSION, markdown_hash, errors)
+    return file_id, errors, False
+
+def validate_lwc_notebook(notebook_link: str) -> str:
+    output_buffer = StringIO()
+
+    try:
+        file_id, errors, cached = validate_lwc_link(
+            notebook_link,
+            progress=lambda percent: output_buffer.write(f"Download progress: {percent}%\n")
+        )
+        if cached:
+            output_buffer.write("Notebook unchanged since last validation, using cached result.\n")
 
-        if not validator.errors:
+        if not errors:
             output_buffer.write(f"✅ {file_id}.ipynb is valid LWC notebook.\n")
             output_buffer.write('-' * 40 + "\n")
         else:
             output_buffer.write(f"❌ Errors in LWC notebook {file_id}.ipynb:\n")
-            for error in validator.errors:
+            for error in errors:
                 output_buffer.write(f"- {error}\n" + "-" * 40 + "\n")
 
     except ValueError as ve: